@@ -1,29 +1,414 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, Header, UploadFile, File
+# Import-time report: cumulative cost of each heavy dependency on its first import.
+# Logged at startup and served by /api/admin/diagnostics/startup; for a full tree
+# run `python -X importtime -c "import server"`.
+import sys
+import time
+import importlib
+import os
+from pathlib import Path
+SERVER_IMPORT_STARTED = time.perf_counter()
+import_costs = {}
+
+def timed_import(module: str):
+    """Import a module, recording how long its first import took."""
+    if module not in sys.modules:
+        start = time.perf_counter()
+        importlib.import_module(module)
+        import_costs[module] = time.perf_counter() - start
+    return sys.modules[module]
+
+ROOT_DIR = Path(__file__).parent
+# Loaded first: prometheus_client picks single- or multi-process metrics from
+# PROMETHEUS_MULTIPROC_DIR when it is imported, so .env has to be applied by then
+timed_import("dotenv").load_dotenv(ROOT_DIR / '.env')
+if not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+    # An empty value would still switch prometheus_client to multi-process mode
+    os.environ.pop("PROMETHEUS_MULTIPROC_DIR", None)
+
+# Dependencies pull each other in, so the order decides whose cost is whose
+for _module in ("pydantic", "starlette", "fastapi", "motor.motor_asyncio", "prometheus_client", "markdown_it"):
+    timed_import(_module)
+
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Header, UploadFile, File, Request, Query
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
-from dotenv import load_dotenv
+from fastapi.responses import FileResponse, Response
 from starlette.middleware.cors import CORSMiddleware
+from starlette.datastructures import Headers, MutableHeaders
 from motor.motor_asyncio import AsyncIOMotorClient
-import os
+from pymongo import ReturnDocument, monitoring
+from pymongo.errors import DuplicateKeyError, OperationFailure
+from pymongo.read_preferences import Nearest, Primary, PrimaryPreferred, Secondary, SecondaryPreferred
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+from markdown_it import MarkdownIt
+from mdit_py_plugins.tasklists import tasklists_plugin
 import logging
-from pathlib import Path
-from pydantic import BaseModel, Field, ConfigDict, EmailStr
-from typing import List, Optional
+from pydantic import BaseModel, Field, ConfigDict, EmailStr, TypeAdapter
+from typing import Callable, Dict, List, Optional
 import uuid
-from datetime import datetime, timezone
-import resend
+from datetime import datetime, timedelta, timezone
 import shutil
+import asyncio
+import re
+import gzip
+import hmac
+import html
+import ipaddress
+import math
+import bisect
+import base64
+import json
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
 
-ROOT_DIR = Path(__file__).parent
-load_dotenv(ROOT_DIR / '.env')
+try:
+    brotli = timed_import("brotli")
+except ImportError:  # Brotli is optional; responses fall back to gzip
+    brotli = None
+
+try:
+    pyinstrument = timed_import("pyinstrument")
+    from pyinstrument.renderers import ConsoleRenderer, HTMLRenderer, SpeedscopeRenderer
+except ImportError:  # Profiling is optional; X-Profile requests are served unprofiled
+    pyinstrument = None
+
+# Metrics
+# Exposed at /metrics. With several workers, set PROMETHEUS_MULTIPROC_DIR to a shared,
+# empty directory so every worker's samples are aggregated.
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')  # Bearer token for /metrics; unset = private addresses only
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP requests served", ["method", "route", "status"])
+HTTP_REQUEST_DURATION = Histogram("http_request_duration_seconds", "HTTP request latency", ["method", "route"], buckets=LATENCY_BUCKETS)
+HTTP_RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes", "HTTP response body size as sent", ["method", "route"],
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+)
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests being served", ["method"], multiprocess_mode="livesum")
+MONGO_COMMAND_DURATION = Histogram(
+    "mongodb_command_duration_seconds", "MongoDB command latency", ["collection", "command"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+)
+MONGO_COMMAND_FAILURES = Counter("mongodb_command_failures_total", "Failed MongoDB commands", ["collection", "command"])
+EXTERNAL_CALL_DURATION = Histogram("external_call_duration_seconds", "Latency of calls to Square/Resend", ["service", "operation"], buckets=LATENCY_BUCKETS)
+EXTERNAL_CALL_ERRORS = Counter("external_call_errors_total", "Failed calls to Square/Resend", ["service", "operation"])
+RATE_LIMITED = Counter("rate_limited_requests_total", "Requests rejected by a rate limit", ["endpoint", "scope"])
+# Connection handshakes and heartbeats, not application queries
+UNMONITORED_COMMANDS = {"hello", "ismaster", "isMaster", "ping", "saslStart", "saslContinue", "endSessions", "buildInfo"}
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Time every MongoDB command by collection and operation.
+
+    PyMongo calls these from whichever thread ran the command, so state is
+    kept per (connection, request id) and only touched with atomic dict ops.
+    """
+
+    def __init__(self):
+        self.pending: Dict[tuple, tuple] = {}
+
+    def started(self, event):
+        if event.command_name in UNMONITORED_COMMANDS:
+            return
+        target = event.command.get("collection") if event.command_name == "getMore" else event.command.get(event.command_name)
+        collection = target if isinstance(target, str) else "-"
+        self.pending[(event.connection_id, event.request_id)] = (collection, event.command_name)
+
+    def succeeded(self, event):
+        labels = self.pending.pop((event.connection_id, event.request_id), None)
+        if labels:
+            MONGO_COMMAND_DURATION.labels(*labels).observe(event.duration_micros / 1_000_000)
+
+    def failed(self, event):
+        labels = self.pending.pop((event.connection_id, event.request_id), None)
+        if labels:
+            MONGO_COMMAND_DURATION.labels(*labels).observe(event.duration_micros / 1_000_000)
+            MONGO_COMMAND_FAILURES.labels(*labels).inc()
+
+# Slow Query Log
+# Commands slower than SLOW_QUERY_THRESHOLD_MS are handed to the event loop and
+# recorded by record_slow_queries(); each new query shape also gets an explain plan.
+SLOW_QUERY_THRESHOLD_MS = float(os.environ.get('SLOW_QUERY_THRESHOLD_MS', '100'))
+SLOW_QUERY_COMMANDS = {"find", "aggregate", "count", "distinct", "update", "delete", "findAndModify"}
+SLOW_QUERY_COLLECTIONS = {"slow_queries", "slow_query_shapes"}  # Never log our own writes
+
+class SlowQueryListener(monitoring.CommandListener):
+    """Forward commands over the threshold to the event loop, from whichever thread ran them."""
+
+    def __init__(self, threshold_ms: float):
+        self.threshold_ms = threshold_ms
+        self.pending: Dict[tuple, dict] = {}
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.queue: Optional[asyncio.Queue] = None
+
+    def attach(self, loop: asyncio.AbstractEventLoop, queue: asyncio.Queue):
+        self.loop, self.queue = loop, queue
+
+    def started(self, event):
+        if self.loop is None or event.command_name not in SLOW_QUERY_COMMANDS:
+            return
+        collection = event.command.get(event.command_name)
+        if isinstance(collection, str) and collection not in SLOW_QUERY_COLLECTIONS:
+            self.pending[(event.connection_id, event.request_id)] = event.command
+
+    def succeeded(self, event):
+        command = self.pending.pop((event.connection_id, event.request_id), None)
+        duration_ms = event.duration_micros / 1000
+        if command is not None and duration_ms >= self.threshold_ms:
+            try:
+                self.loop.call_soon_threadsafe(self.enqueue, event.command_name, command, duration_ms)
+            except RuntimeError:
+                pass  # Loop already closed during shutdown
+
+    def failed(self, event):
+        self.pending.pop((event.connection_id, event.request_id), None)
+
+    def enqueue(self, command_name: str, command: dict, duration_ms: float):
+        try:
+            self.queue.put_nowait((command_name, command, duration_ms, datetime.now(timezone.utc)))
+        except asyncio.QueueFull:
+            pass  # Dropping a log entry beats blocking the loop during a slow spell
+
+slow_query_listener = SlowQueryListener(SLOW_QUERY_THRESHOLD_MS)
+
+# Request Timing
+# Handlers wrap their work in phase("db"), phase("pricing"), ... and
+# RequestContextMiddleware reports the totals in Server-Timing and the access log.
+TIMING_PHASES = ("db", "pricing", "validation", "serialization", "external")
+
+class RequestTiming:
+    __slots__ = ("phases", "cache")
+
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+        self.cache: Optional[str] = None  # "hit" / "miss" for cached endpoints
+
+request_timing: ContextVar[Optional[RequestTiming]] = ContextVar("request_timing", default=None)
+
+@contextmanager
+def phase(name: str):
+    """Add the time spent in the block to the current request's phase total."""
+    timing = request_timing.get()
+    if timing is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing.phases[name] = timing.phases.get(name, 0.0) + time.perf_counter() - start
+
+@contextmanager
+def external_call(service: str, operation: str):
+    """Time a call to an external API, counting it as an error if it raises."""
+    start = time.perf_counter()
+    try:
+        with phase("external"):
+            yield
+    except Exception:
+        EXTERNAL_CALL_ERRORS.labels(service, operation).inc()
+        raise
+    finally:
+        EXTERNAL_CALL_DURATION.labels(service, operation).observe(time.perf_counter() - start)
 
 # MongoDB connection
+# Pool, timeout and compression settings come from MONGO_* variables; anything
+# unset falls back to the connection string (or the driver default).
+MONGO_CLIENT_OPTIONS = {
+    "maxPoolSize": ("MONGO_MAX_POOL_SIZE", int),
+    "minPoolSize": ("MONGO_MIN_POOL_SIZE", int),
+    "maxIdleTimeMS": ("MONGO_MAX_IDLE_TIME_MS", int),
+    "waitQueueTimeoutMS": ("MONGO_WAIT_QUEUE_TIMEOUT_MS", int),
+    "serverSelectionTimeoutMS": ("MONGO_SERVER_SELECTION_TIMEOUT_MS", int),
+    "connectTimeoutMS": ("MONGO_CONNECT_TIMEOUT_MS", int),
+    "socketTimeoutMS": ("MONGO_SOCKET_TIMEOUT_MS", int),
+    "compressors": ("MONGO_COMPRESSORS", str),  # e.g. "zstd,snappy,zlib"; zstd/snappy need zstandard/python-snappy
+}
+READ_PREFERENCES = {
+    "primary": Primary,
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
+
+def mongo_client_options() -> dict:
+    options = {}
+    for option, (env_name, convert) in MONGO_CLIENT_OPTIONS.items():
+        value = os.environ.get(env_name)
+        if value:
+            options[option] = convert(value)
+    return options
+
+def catalog_read_preference():
+    """Read preference for public catalog reads (MONGO_CATALOG_READ_PREFERENCE)."""
+    mode = os.environ.get('MONGO_CATALOG_READ_PREFERENCE', 'primary')
+    if mode not in READ_PREFERENCES:
+        raise ValueError(f"MONGO_CATALOG_READ_PREFERENCE must be one of {', '.join(READ_PREFERENCES)}")
+    if mode == "primary":
+        return Primary()
+    max_staleness = int(os.environ.get('MONGO_MAX_STALENESS_SECONDS', '-1'))
+    return READ_PREFERENCES[mode](max_staleness=max_staleness)
+
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+mongo_listeners = [MongoCommandMetrics()]
+if SLOW_QUERY_THRESHOLD_MS > 0:
+    mongo_listeners.append(slow_query_listener)
+client = AsyncIOMotorClient(mongo_url, event_listeners=mongo_listeners, **mongo_client_options())
 db = client[os.environ['DB_NAME']]
+# Public catalog GETs read through catalog_db and may be served by secondaries;
+# admin routes, writes and the order/payment path always use db (the primary).
+catalog_db = client.get_database(os.environ['DB_NAME'], read_preference=catalog_read_preference())
+
+# Email / Payment Providers
+# The Resend and Square SDKs are imported on first use, so workers and test
+# processes that never send mail or take a payment don't pay to load them.
+class EmailProvider:
+    """Transactional email through Resend."""
+
+    def __init__(self, api_key: str):
+        self.api_key = api_key
+        self._sdk = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.api_key)
+
+    def sdk(self):
+        if self._sdk is None:
+            resend = timed_import("resend")
+            resend.api_key = self.api_key
+            self._sdk = resend
+        return self._sdk
+
+    async def send(self, operation: str, message: dict):
+        # The SDK is blocking; keep it off the event loop
+        with external_call("resend", operation):
+            return await asyncio.to_thread(self.sdk().Emails.send, message)
+
+class PaymentProvider:
+    """Card payments through Square."""
+
+    def __init__(self, access_token: str, environment: str, location_id: str):
+        self.access_token = access_token
+        self.environment = environment
+        self.location_id = location_id
+        self._client = None
+
+    def client(self):
+        if self._client is None:
+            square = timed_import("square")
+            self._client = square.Square(access_token=self.access_token, environment=self.environment)
+        return self._client
+
+    async def create_payment(self, body: dict):
+        # The SDK is blocking; keep it off the event loop
+        with external_call("square", "create_payment"):
+            return await asyncio.to_thread(self.client().payments.create_payment, body=body)
+
+email_provider = EmailProvider(os.environ.get('RESEND_API_KEY', ''))
+payment_provider = PaymentProvider(
+    access_token=os.environ.get('SQUARE_ACCESS_TOKEN', ''),
+    environment=os.environ.get('SQUARE_ENVIRONMENT', 'sandbox'),
+    location_id=os.environ.get('SQUARE_LOCATION_ID', '')
+)
+
+# Background Jobs
+# Work that outlives its request (emails, stock updates) runs as a job. On shutdown
+# the registry stops starting jobs, waits up to JOB_DRAIN_TIMEOUT_SECONDS for running
+# ones and persists the rest to pending_jobs, which every worker polls. Failed jobs are
+# retried with backoff, so delivery is at least once.
+JOB_DRAIN_TIMEOUT_SECONDS = float(os.environ.get('JOB_DRAIN_TIMEOUT_SECONDS', '20'))
+JOB_POLL_INTERVAL_SECONDS = float(os.environ.get('JOB_POLL_INTERVAL_SECONDS', '10'))
+JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', '5'))
+JOB_HANDLERS: Dict[str, Callable] = {}
+
+def job_handler(kind: str):
+    """Register an async function taking the job payload dict."""
+    def register(handler):
+        JOB_HANDLERS[kind] = handler
+        return handler
+    return register
+
+class BackgroundJobs:
+    """Registry of this worker's running jobs."""
+
+    def __init__(self):
+        self.running: Dict[asyncio.Task, dict] = {}
+        self.draining = False
+
+    async def submit(self, kind: str, payload: dict, attempts: int = 0):
+        job = {"id": str(uuid.uuid4()), "kind": kind, "payload": payload, "attempts": attempts}
+        if self.draining:
+            # Shutting down: hand it straight to a worker that is staying up
+            await self.persist([job])
+            return
+        task = asyncio.create_task(self.run(job))
+        self.running[task] = job
+        task.add_done_callback(self.running.pop)
+
+    async def run(self, job: dict):
+        # The task inherited the request's context; its time is not the request's
+        request_timing.set(None)
+        try:
+            await JOB_HANDLERS[job["kind"]](job["payload"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            attempts = job["attempts"] + 1
+            if attempts >= JOB_MAX_ATTEMPTS:
+                logger.error(f"Job {job['kind']} {job['id']} failed after {attempts} attempts: {str(e)}")
+                return
+            logger.warning(f"Job {job['kind']} {job['id']} failed (attempt {attempts}), will retry: {str(e)}")
+            await self.persist([{**job, "attempts": attempts}], delay=JOB_POLL_INTERVAL_SECONDS * 2 ** attempts)
+
+    async def persist(self, jobs: List[dict], delay: float = 0.0):
+        available_at = (datetime.now(timezone.utc) + timedelta(seconds=delay)).isoformat()
+        await db.pending_jobs.insert_many([{**job, "available_at": available_at} for job in jobs])
+
+    async def drain(self, timeout: float):
+        """Stop taking jobs, wait for the running ones, and persist whatever is left."""
+        self.draining = True
+        if self.running:
+            await asyncio.wait(list(self.running), timeout=timeout)
+        unfinished = list(self.running.items())
+        for task, _ in unfinished:
+            task.cancel()
+        await asyncio.gather(*(task for task, _ in unfinished), return_exceptions=True)
+        if unfinished:
+            await self.persist([job for _, job in unfinished])
+            logger.warning(f"Persisted {len(unfinished)} unfinished jobs to pending_jobs")
+
+    async def claim_pending(self):
+        """Start the due jobs that failed earlier or that other workers left behind."""
+        now = datetime.now(timezone.utc).isoformat()
+        while not self.draining:
+            job = await db.pending_jobs.find_one_and_delete(
+                {"available_at": {"$lte": now}},
+                {"_id": 0, "available_at": 0},
+                sort=[("available_at", 1)]
+            )
+            if job is None:
+                return
+            if job["kind"] not in JOB_HANDLERS:
+                logger.error(f"Dropping job {job['id']} of unknown kind {job['kind']}")
+                continue
+            await self.submit(job["kind"], job["payload"], job["attempts"])
+
+background_jobs = BackgroundJobs()
 
-# Resend configuration
-resend.api_key = os.environ.get('RESEND_API_KEY', '')
+async def pending_jobs_loop():
+    while True:
+        try:
+            await background_jobs.claim_pending()
+        except Exception as e:
+            logger.error(f"Claiming pending jobs failed: {str(e)}")
+        await asyncio.sleep(JOB_POLL_INTERVAL_SECONDS)
+
+@job_handler("email")
+async def send_email_job(payload: dict):
+    await email_provider.send(payload["operation"], payload["message"])
+
+async def queue_email(operation: str, message: dict):
+    await background_jobs.submit("email", {"operation": operation, "message": message})
 
 # Create the main app without a prefix
 app = FastAPI()
@@ -130,6 +515,14 @@ class CarPart(BaseModel):
     image_url: str
     stock: int = 1
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    fitment: List["FitmentRange"] = []  # Parsed from car_model/year at write time
+
+class FitmentRange(BaseModel):
+    model: str  # Normalized model key, e.g. "240sx", "s13"; "*" for universal parts
+    year_start: int
+    year_end: int
+
+CarPart.model_rebuild()
 
 class CarPartCreate(BaseModel):
     name: str
@@ -153,6 +546,99 @@ class CarPartUpdate(BaseModel):
     image_url: Optional[str] = None
     stock: Optional[int] = None
 
+class FacetCount(BaseModel):
+    value: str
+    count: int
+
+class PartsBrowseResponse(BaseModel):
+    items: List[CarPart]
+    total: int
+    page: int
+    page_size: int
+    facets: Dict[str, List[FacetCount]]  # car_model, year, category, condition
+
+class FitmentLookupResponse(BaseModel):
+    model: Optional[str] = None
+    year: Optional[int] = None
+    model_keys: List[str]  # The normalized keys (including aliases) that were matched
+    items: List[CarPart]
+    total: int
+    page: int
+    page_size: int
+
+# Admin Dashboard Models
+class RecentItem(BaseModel):
+    id: str
+    label: str
+    created_at: Optional[datetime] = None
+
+class LowStockItem(BaseModel):
+    type: str  # 'merch' or 'parts'
+    id: str
+    name: str
+    stock: int
+    low_sizes: Optional[Dict[str, int]] = None  # Sized merch: only the sizes at or under the threshold
+
+class AdminDashboard(BaseModel):
+    counts: Dict[str, int]
+    recent: Dict[str, List[RecentItem]]
+    pending_inquiries: int
+    inquiries_by_status: Dict[str, int]
+    pending_inquiries_by_type: Dict[str, int]
+    low_stock: List[LowStockItem]
+    sales_settings: SaleSettings
+    generated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+class AdminSectionPage(BaseModel):
+    section: str
+    items: List[dict]
+    next_cursor: Optional[str] = None
+
+# Page Bootstrap Models
+class FeaturedMerch(BaseModel):
+    id: str
+    name: str
+    price: float
+    category: str
+    image_urls: List[str] = []  # Only the main image
+    effective_price: Optional[float] = None
+    discount_percent: Optional[float] = None
+
+class HomePageData(BaseModel):
+    featured_merch: List[FeaturedMerch]
+
+class DriverProfile(BaseModel):
+    id: str
+    name: str
+    bio: str
+    car_name: Optional[str] = None
+    image_url: str
+
+class CarProfile(BaseModel):
+    id: str
+    name: str
+    year: str
+    make: str
+    model: str
+    specs: str
+    image_url: str
+    driver_name: Optional[str] = None
+    driver: Optional["DriverSummary"] = None
+
+class SponsorProfile(BaseModel):
+    id: str
+    name: str
+    logo_url: str
+    website_url: Optional[str] = None
+    instagram_url: Optional[str] = None
+    facebook_url: Optional[str] = None
+    description: Optional[str] = None
+
+class AboutPageData(BaseModel):
+    drivers: List[DriverProfile]
+    cars: List[CarProfile]
+    sponsors: List[SponsorProfile]
+
 class ContactInquiry(BaseModel):
     model_config = ConfigDict(extra="ignore")
     
@@ -181,6 +667,12 @@ class ContactInquiryCreate(BaseModel):
 class InquiryStatusUpdate(BaseModel):
     status: str
 
+class InquiryPage(BaseModel):
+    items: List[ContactInquiry]
+    next_cursor: Optional[str] = None
+    total: int  # Inquiries matching every filter
+    counts: Dict[str, int]  # Per-status counts under the non-status filters
+
 class AdminLogin(BaseModel):
     username: str
     password: str
@@ -198,6 +690,7 @@ class OrderLineItem(BaseModel):
     size: Optional[str] = None
     quantity: int
     unit_price: float
+    list_price: Optional[float] = None  # Catalog price when the order was placed, to measure discounts
 
 class OrderCreate(BaseModel):
     customer_email: EmailStr
@@ -215,11 +708,39 @@ class Order(BaseModel):
     status: str = "pending"  # pending, completed, failed, cancelled
     square_payment_id: Optional[str] = None
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    completed_at: Optional[datetime] = None
 
 class PaymentRequest(BaseModel):
     order_id: str
     source_id: str  # Token from Square Web Payments SDK
 
+# Sales Analytics Models
+class SalesTotals(BaseModel):
+    orders: int = 0
+    revenue: float = 0.0
+    units: int = 0
+    discounted_units: int = 0
+    discount_total: float = 0.0
+
+class DailySales(SalesTotals):
+    date: str
+
+class ProductSales(BaseModel):
+    product_id: str
+    product_name: str
+    units: int
+    revenue: float
+    discounted_units: int
+    discount_total: float
+    units_by_size: Dict[str, int] = {}
+
+class SalesAnalytics(BaseModel):
+    start: str
+    end: str
+    totals: SalesTotals
+    daily: List[DailySales]
+    products: List[ProductSales]
+
 # Driver Models
 class Driver(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -246,6 +767,15 @@ class DriverUpdate(BaseModel):
     image_url: Optional[str] = None
     email: Optional[str] = None
 
+class DriverSummary(BaseModel):
+    """Copy of a driver's display fields embedded in each car they drive."""
+    id: str
+    name: str
+    image_url: str
+
+CarProfile.model_rebuild()
+AboutPageData.model_rebuild()
+
 class DriverContactForm(BaseModel):
     driver_id: str
     sender_name: str
@@ -263,7 +793,9 @@ class Car(BaseModel):
     model: str
     specs: str
     image_url: str
-    driver_name: Optional[str] = None
+    driver_name: Optional[str] = None  # Free text for drivers without a profile; mirrors driver.name when linked
+    driver_id: Optional[str] = None
+    driver: Optional[DriverSummary] = None  # Maintained by the driver routes, never written by clients
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class CarCreate(BaseModel):
@@ -274,6 +806,7 @@ class CarCreate(BaseModel):
     specs: str
     image_url: str
     driver_name: Optional[str] = None
+    driver_id: Optional[str] = None
 
 class CarUpdate(BaseModel):
     name: Optional[str] = None
@@ -283,6 +816,7 @@ class CarUpdate(BaseModel):
     specs: Optional[str] = None
     image_url: Optional[str] = None
     driver_name: Optional[str] = None
+    driver_id: Optional[str] = None  # "" unlinks the driver
 
 # Blog Post Models
 class BlogPost(BaseModel):
@@ -295,6 +829,24 @@ class BlogPost(BaseModel):
     images: List[str] = []
     author: str
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    # Derived at write time from content/images
+    content_html: Optional[str] = None  # Sanitized HTML rendering of content
+    excerpt: Optional[str] = None
+    reading_time_minutes: int = 1
+    cover_image: Optional[str] = None
+
+class BlogPostSummary(BaseModel):
+    """List view of a blog post - everything but the body and gallery."""
+    model_config = ConfigDict(extra="ignore")
+    
+    id: str
+    title: str
+    category: str
+    author: str
+    excerpt: Optional[str] = None
+    reading_time_minutes: int = 1
+    cover_image: Optional[str] = None
+    created_at: datetime
 
 class BlogPostCreate(BaseModel):
     title: str
@@ -359,6 +911,617 @@ async def verify_admin(authorization: Optional[str] = Header(None)):
     raise HTTPException(status_code=401, detail="Invalid authentication")
 
 
+# Rate Limiting
+# Token buckets per client IP and per email on the unauthenticated write endpoints.
+# A limit "5/300" allows a burst of 5 and refills the bucket completely over 300s;
+# "0" disables it. Behind a proxy, run uvicorn with --proxy-headers so the client IP is real.
+RATE_LIMIT_DEFAULTS = {
+    "contact": {"ip": "5/300", "email": "3/600"},
+    "driver_contact": {"ip": "5/300", "email": "3/600"},
+    "orders": {"ip": "20/600", "email": "10/600"},
+}
+RATE_LIMIT_STORE = os.environ.get('RATE_LIMIT_STORE', 'memory')  # memory (per worker) | mongo (shared)
+RATE_LIMIT_MAX_KEYS = int(os.environ.get('RATE_LIMIT_MAX_KEYS', '100000'))
+
+def parse_rate_limit(value: str) -> Optional[tuple]:
+    """'burst/seconds' -> (capacity, tokens per second), or None when disabled.
+
+    Raises ValueError for a non-numeric value or a window that is not positive.
+    """
+    burst, _, seconds = value.partition("/")
+    try:
+        capacity = float(burst) if burst.strip() else 0.0
+        window = float(seconds) if seconds.strip() else 1.0
+    except ValueError:
+        raise ValueError(f"rate limit {value!r} is not 'burst/seconds'")
+    if capacity <= 0:
+        return None
+    if window <= 0:
+        raise ValueError(f"rate limit {value!r} needs a window above 0 seconds")
+    return capacity, capacity / window
+
+def configured_rate_limit(name: str, default: str) -> Optional[tuple]:
+    """The limit set in environment variable `name`, falling back to the default when it is invalid."""
+    try:
+        return parse_rate_limit(os.environ.get(name, default))
+    except ValueError as e:
+        # Logging is configured later in this module; this still reaches stderr
+        logging.getLogger(__name__).warning(f"Ignoring {name}: {e}; using {default}")
+        return parse_rate_limit(default)
+
+RATE_LIMITS = {
+    endpoint: {
+        scope: configured_rate_limit(f"RATE_LIMIT_{endpoint.upper()}_{scope.upper()}", default)
+        for scope, default in scopes.items()
+    }
+    for endpoint, scopes in RATE_LIMIT_DEFAULTS.items()
+}
+
+class TokenBuckets:
+    """In-memory token buckets: O(1) per check, least recently used keys evicted past max_keys."""
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self.buckets: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (tokens, updated_at)
+
+    def take(self, key: str, capacity: float, rate: float) -> float:
+        """Take one token; return 0 if granted, otherwise seconds until one is available."""
+        now = time.monotonic()
+        tokens, updated_at = self.buckets.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated_at) * rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / rate
+        self.buckets[key] = (tokens, now)
+        self.buckets.move_to_end(key)
+        while len(self.buckets) > self.max_keys:
+            self.buckets.popitem(last=False)
+        return wait
+
+    def refund(self, key: str, capacity: float):
+        """Give back a token taken for a request that another limit then rejected."""
+        if key in self.buckets:
+            tokens, updated_at = self.buckets[key]
+            self.buckets[key] = (min(capacity, tokens + 1), updated_at)
+
+async def take_shared_token(key: str, capacity: float, rate: float) -> float:
+    """The same bucket kept in Mongo, updated atomically so every worker shares it."""
+    now = time.time()
+    doc = await db.rate_limits.find_one_and_update(
+        {"_id": key},
+        [
+            {"$set": {
+                "tokens": {"$min": [capacity, {"$add": [
+                    {"$ifNull": ["$tokens", capacity]},
+                    {"$multiply": [{"$subtract": [now, {"$ifNull": ["$updated_at", now]}]}, rate]}
+                ]}]},
+                "updated_at": now
+            }},
+            {"$set": {"granted": {"$gte": ["$tokens", 1]}}},
+            {"$set": {
+                "tokens": {"$cond": ["$granted", {"$subtract": ["$tokens", 1]}, "$tokens"]},
+                # Past this a bucket is full again, so the TTL index can drop it
+                "expires_at": datetime.now(timezone.utc) + timedelta(seconds=capacity / rate)
+            }}
+        ],
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return 0.0 if doc["granted"] else (1 - doc["tokens"]) / rate
+
+async def refund_shared_token(key: str, capacity: float):
+    await db.rate_limits.update_one({"_id": key}, [{"$set": {"tokens": {"$min": [capacity, {"$add": ["$tokens", 1]}]}}}])
+
+rate_limit_buckets = TokenBuckets(RATE_LIMIT_MAX_KEYS)
+
+async def enforce_rate_limit(endpoint: str, request: Request, email: Optional[str] = None):
+    """Raise 429 with Retry-After when the client IP or the email is over the endpoint's limit.
+
+    A request only costs tokens when every limit grants it: tokens already taken
+    for one scope are given back when a later scope rejects the request.
+    """
+    keys = {"ip": request.client.host if request.client else "unknown", "email": email.strip().lower() if email else None}
+    taken = []
+    for scope, limit in RATE_LIMITS[endpoint].items():
+        if limit is None or not keys[scope]:
+            continue
+        key = f"{endpoint}:{scope}:{keys[scope]}"
+        if RATE_LIMIT_STORE == "mongo":
+            try:
+                wait = await take_shared_token(key, *limit)
+            except Exception as e:
+                # Fail open: a rate limiter outage must not take the forms down
+                logger.error(f"Rate limit check failed for {key}: {str(e)}")
+                wait = 0.0
+        else:
+            wait = rate_limit_buckets.take(key, *limit)
+        if wait <= 0:
+            taken.append((key, limit[0]))
+            continue
+        for taken_key, capacity in taken:
+            if RATE_LIMIT_STORE == "mongo":
+                try:
+                    await refund_shared_token(taken_key, capacity)
+                except Exception as e:
+                    logger.error(f"Rate limit refund failed for {taken_key}: {str(e)}")
+            else:
+                rate_limit_buckets.refund(taken_key, capacity)
+        RATE_LIMITED.labels(endpoint, scope).inc()
+        raise HTTPException(
+            status_code=429,
+            detail="Too many requests, please try again later",
+            headers={"Retry-After": str(math.ceil(wait))}
+        )
+
+
+# Response Cache & Compression
+# Every write handler bumps the version of the collections it touches; cached
+# responses remember the versions they were built from and are rebuilt on mismatch.
+RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', '256'))
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', '1024'))
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "image/svg+xml")
+
+collection_versions: dict = {}
+collection_invalidated_at: dict = {}
+# A secondary can briefly lag a write, so responses built this soon after one are served but not cached
+CATALOG_REPLICATION_GRACE_SECONDS = float(os.environ.get('CATALOG_REPLICATION_GRACE_SECONDS', '5'))
+
+# Cross-worker invalidation: invalidate() also bumps a per-collection counter in
+# cache_versions, and every worker applies bumps made by the others, from a change
+# stream or, on a standalone mongod, by polling every CACHE_POLL_INTERVAL_SECONDS.
+CACHE_INVALIDATION = os.environ.get('CACHE_INVALIDATION', 'auto')  # auto | poll | off (single worker)
+CACHE_POLL_INTERVAL_SECONDS = float(os.environ.get('CACHE_POLL_INTERVAL_SECONDS', '1'))
+CACHE_CHANGE_LOG_SIZE = 100  # Recent bumps whose document ids are kept, so other workers re-index only those
+WORKER_ID = uuid.uuid4().hex[:12]
+shared_versions: dict = {}  # Collection -> latest cache_versions counter applied on this worker
+
+def mark_stale(collections):
+    for name in collections:
+        collection_versions[name] = collection_versions.get(name, 0) + 1
+        collection_invalidated_at[name] = time.monotonic()
+
+async def invalidate(*collections: str, ids: Optional[List[str]] = None):
+    """Mark cached responses built from these collections as stale, on every worker.
+
+    `ids` lists the documents written, so other workers can re-index just those;
+    without it they reload the whole collection into their search indexes.
+    """
+    mark_stale(collections)
+    if CACHE_INVALIDATION == "off":
+        return
+    for name in collections:
+        try:
+            # $inc and $push land together, so changes[-1] always describes the new version
+            doc = await db.cache_versions.find_one_and_update(
+                {"_id": name},
+                {
+                    "$inc": {"version": 1},
+                    "$set": {"worker": WORKER_ID, "updated_at": datetime.now(timezone.utc).isoformat()},
+                    "$push": {"changes": {"$each": [{"ids": ids}], "$slice": -CACHE_CHANGE_LOG_SIZE}}
+                },
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except Exception as e:
+            logger.error(f"Failed to publish invalidation of {name}: {str(e)}")
+            continue
+        if doc["version"] > shared_versions.get(name, 0) + 1:
+            # Another worker bumped it too since we last looked
+            await apply_shared_versions({name: doc})
+        else:
+            shared_versions[name] = max(shared_versions.get(name, 0), doc["version"])
+
+async def load_shared_versions() -> dict:
+    return {doc["_id"]: doc async for doc in db.cache_versions.find({}, {"version": 1, "changes": 1})}
+
+def changed_ids(doc: dict, seen: int) -> Optional[set]:
+    """Ids written since version `seen`, or None when the change log can't say."""
+    missing = doc["version"] - seen
+    changes = doc.get("changes") or []
+    if missing > len(changes):
+        return None
+    ids = set()
+    for change in changes[len(changes) - missing:]:
+        if change.get("ids") is None:
+            return None
+        ids.update(change["ids"])
+    return ids
+
+async def apply_shared_versions(docs: dict):
+    """Invalidate locally every collection whose shared counter moved past what this worker has applied."""
+    changed = {}
+    for name, doc in docs.items():
+        seen = shared_versions.get(name, 0)
+        if doc["version"] > seen:
+            changed[name] = changed_ids(doc, seen)
+            shared_versions[name] = doc["version"]
+    if not changed:
+        return
+    mark_stale(changed)
+    # The search/autocomplete indexes only see this worker's writes, so catch up on the rest
+    for name, ids in changed.items():
+        if name not in SEARCH_KIND_BY_COLLECTION:
+            continue
+        if ids is None:
+            await build_catalog_indexes([name])
+        else:
+            await reindex_documents(name, ids)
+
+async def watch_cache_versions():
+    """Apply other workers' invalidations as they happen."""
+    use_stream = CACHE_INVALIDATION == "auto"
+    while True:
+        opened = False
+        try:
+            if use_stream:
+                async with db.cache_versions.watch(full_document="updateLookup") as stream:
+                    opened = True
+                    # Catch bumps made before the stream was open
+                    await apply_shared_versions(await load_shared_versions())
+                    async for change in stream:
+                        doc = change.get("fullDocument")
+                        if doc:
+                            await apply_shared_versions({doc["_id"]: doc})
+            else:
+                await asyncio.sleep(CACHE_POLL_INTERVAL_SECONDS)
+                await apply_shared_versions(await load_shared_versions())
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if use_stream and not opened:
+                # Standalone mongod: change streams need a replica set
+                logger.info(f"Change streams unavailable ({str(e)}); polling cache_versions every {CACHE_POLL_INTERVAL_SECONDS}s")
+                use_stream = False
+            else:
+                logger.error(f"Cache invalidation watcher failed: {str(e)}")
+                await asyncio.sleep(CACHE_POLL_INTERVAL_SECONDS)
+
+def recently_written(collections: tuple) -> bool:
+    if catalog_db.read_preference == Primary():
+        return False
+    cutoff = time.monotonic() - CATALOG_REPLICATION_GRACE_SECONDS
+    return any(collection_invalidated_at.get(name, float("-inf")) > cutoff for name in collections)
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick the best supported content-coding from an Accept-Encoding header."""
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        if coding:
+            accepted[coding] = quality
+    if brotli is not None and accepted.get("br", 0) > 0:
+        return "br"
+    if accepted.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+def compress_body(body: bytes, encoding: str, thorough: bool = False) -> bytes:
+    """Compress a response body. Cached bodies are compressed once, so they get a slower, denser level."""
+    if encoding == "br":
+        return brotli.compress(body, quality=9 if thorough else 5)
+    return gzip.compress(body, compresslevel=9 if thorough else 6)
+
+class CachedPayload:
+    """A pre-encoded JSON body plus its compressed variants, built lazily per encoding."""
+    __slots__ = ("versions", "body", "encoded")
+
+    def __init__(self, versions: tuple, body: bytes):
+        self.versions = versions
+        self.body = body
+        self.encoded = {}
+
+    def to_response(self, request: Request) -> Response:
+        headers = {"Vary": "Accept-Encoding"}
+        body = self.body
+        encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+        if encoding and len(body) >= COMPRESSION_MIN_SIZE:
+            if encoding not in self.encoded:
+                with phase("serialization"):
+                    self.encoded[encoding] = compress_body(body, encoding, thorough=True)
+            body = self.encoded[encoding]
+            headers["Content-Encoding"] = encoding
+        return Response(content=body, media_type="application/json", headers=headers)
+
+response_cache: "OrderedDict[str, CachedPayload]" = OrderedDict()
+_type_adapters: dict = {}
+
+def encode_json(model_type, data) -> bytes:
+    """Validate data against a response model and encode it the way FastAPI would."""
+    adapter = _type_adapters.get(model_type)
+    if adapter is None:
+        adapter = _type_adapters[model_type] = TypeAdapter(model_type)
+    with phase("validation"):
+        validated = adapter.validate_python(data)
+    with phase("serialization"):
+        return adapter.dump_json(validated)
+
+async def cached_json_response(request: Request, collections: tuple, build, params: Optional[dict] = None) -> Response:
+    """Serve a JSON response from the cache, rebuilding it when any source collection changed.
+
+    `build` is an async callable returning the encoded body. The cache key is the path
+    plus `params`, the parsed query parameters the endpoint actually reads; anything
+    else in the query string is ignored, so made-up parameters cannot add entries.
+    """
+    query = "&".join(f"{k}={v}" for k, v in sorted((params or {}).items()) if v is not None)
+    key = f"{request.url.path}?{query}"
+    # Read the versions before building so a write racing the build leaves the entry stale
+    versions = tuple(collection_versions.get(name, 0) for name in collections)
+    if profiling_request.get():
+        # A profile of a cache hit says nothing about the endpoint, so always rebuild
+        return CachedPayload(versions, await build()).to_response(request)
+    entry = response_cache.get(key)
+    timing = request_timing.get()
+    if timing is not None:
+        timing.cache = "hit" if entry is not None and entry.versions == versions else "miss"
+    if entry is None or entry.versions != versions:
+        entry = CachedPayload(versions, await build())
+        if recently_written(collections):
+            return entry.to_response(request)
+        response_cache[key] = entry
+        while len(response_cache) > RESPONSE_CACHE_MAX_ENTRIES:
+            response_cache.popitem(last=False)
+    response_cache.move_to_end(key)
+    return entry.to_response(request)
+
+class MetricsMiddleware:
+    """Record request count, latency, response size and in-flight requests per route.
+
+    Routes are labelled by their template (/api/merch/{item_id}), never the raw
+    path, so label cardinality stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        method = scope["method"]
+        root_path = scope.get("root_path", "")
+        status_code = 500
+        response_size = 0
+        
+        async def send_wrapper(message):
+            nonlocal status_code, response_size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            await send(message)
+        
+        HTTP_IN_FLIGHT.labels(method).inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_FLIGHT.labels(method).dec()
+            # The router records the matched route in the scope; mounts only extend root_path
+            route = scope.get("route")
+            label = route.path if route is not None else scope.get("root_path", "")[len(root_path):] or "unmatched"
+            HTTP_REQUESTS.labels(method, label, str(status_code)).inc()
+            HTTP_REQUEST_DURATION.labels(method, label).observe(time.perf_counter() - start)
+            HTTP_RESPONSE_SIZE.labels(method, label).observe(response_size)
+
+# Request Context
+# Every response carries X-Request-ID (the caller's, if it sent a sane one) and a
+# Server-Timing header with the per-phase breakdown, which also goes to the access log.
+REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9._-]{1,128}$")
+TIMING_ALLOW_ORIGIN = ", ".join(origin.strip() for origin in os.environ.get('CORS_ORIGINS', '*').split(','))
+access_logger = logging.getLogger("access")
+
+def server_timing_header(timing: RequestTiming, total: float) -> str:
+    metrics = [f"{name};dur={timing.phases[name] * 1000:.2f}" for name in TIMING_PHASES if name in timing.phases]
+    if timing.cache:
+        metrics.append(f'cache;desc="{timing.cache}"')
+    metrics.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(metrics)
+
+class RequestContextMiddleware:
+    """Assign request IDs, emit Server-Timing and write one structured access log line per request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        incoming = Headers(scope=scope).get("x-request-id", "")
+        request_id = incoming if REQUEST_ID_PATTERN.match(incoming) else uuid.uuid4().hex
+        timing = RequestTiming()
+        token = request_timing.set(timing)
+        start = time.perf_counter()
+        status_code = 500
+        response_size = 0
+        
+        async def send_wrapper(message):
+            nonlocal status_code, response_size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("X-Request-ID", request_id)
+                headers.append("Server-Timing", server_timing_header(timing, time.perf_counter() - start))
+                headers.append("Timing-Allow-Origin", TIMING_ALLOW_ORIGIN)
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_timing.reset(token)
+            route = scope.get("route")
+            access_logger.info(json.dumps({
+                "request_id": request_id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": route.path if route is not None else None,
+                "status": status_code,
+                "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+                "bytes": response_size,
+                "cache": timing.cache,
+                "phases_ms": {name: round(seconds * 1000, 2) for name, seconds in timing.phases.items()}
+            }))
+
+# Request Profiling
+# Admins add "X-Profile: 1" (or ?profile=1) to any request to run it under a
+# sampling profiler. The response carries X-Profile-Id; reports are kept in memory
+# (slowest PROFILE_STORE_SIZE plus the most recent few) and rendered on demand.
+PROFILE_STORE_SIZE = int(os.environ.get('PROFILE_STORE_SIZE', '20'))
+PROFILE_RECENT_SIZE = 5
+PROFILE_INTERVAL_SECONDS = float(os.environ.get('PROFILE_INTERVAL_SECONDS', '0.001'))
+profiling_request: ContextVar[bool] = ContextVar("profiling_request", default=False)
+
+class ProfileRecord:
+    __slots__ = ("id", "method", "path", "route", "status", "duration_ms", "created_at", "session")
+
+    def __init__(self, method: str, path: str):
+        self.id = str(uuid.uuid4())
+        self.method = method
+        self.path = path
+        self.route = None
+        self.status = None
+        self.duration_ms = 0.0
+        self.created_at = datetime.now(timezone.utc)
+        self.session = None
+
+    def summary(self) -> dict:
+        return {field: getattr(self, field) for field in self.__slots__ if field != "session"}
+
+class ProfileStore:
+    """Keep the slowest profiled requests, plus the latest ones so a fresh X-Profile-Id always resolves."""
+
+    def __init__(self, size: int, recent_size: int):
+        self.size = size
+        self.slowest: List[ProfileRecord] = []
+        self.recent: deque = deque(maxlen=recent_size)
+
+    def add(self, record: ProfileRecord):
+        self.recent.append(record)
+        self.slowest.append(record)
+        self.slowest.sort(key=lambda r: r.duration_ms, reverse=True)
+        del self.slowest[self.size:]
+
+    def get(self, profile_id: str) -> Optional[ProfileRecord]:
+        return next((r for r in [*self.slowest, *self.recent] if r.id == profile_id), None)
+
+profile_store = ProfileStore(PROFILE_STORE_SIZE, PROFILE_RECENT_SIZE)
+
+class ProfilingMiddleware:
+    """Profile single requests for authenticated admins."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or pyinstrument is None:
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        requested = headers.get("x-profile") == "1" or b"profile=1" in scope.get("query_string", b"").split(b"&")
+        if not requested:
+            await self.app(scope, receive, send)
+            return
+        try:
+            await verify_admin(headers.get("authorization"))
+        except HTTPException:
+            # Never reveal the switch to non-admins; just serve the request
+            await self.app(scope, receive, send)
+            return
+        
+        record = ProfileRecord(scope["method"], scope["path"])
+        
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                record.status = message["status"]
+                MutableHeaders(scope=message).append("X-Profile-Id", record.id)
+            await send(message)
+        
+        profiler = pyinstrument.Profiler(interval=PROFILE_INTERVAL_SECONDS, async_mode="enabled")
+        token = profiling_request.set(True)
+        start = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            record.session = profiler.stop()
+            record.duration_ms = round((time.perf_counter() - start) * 1000, 2)
+            profiling_request.reset(token)
+            route = scope.get("route")
+            record.route = route.path if route is not None else None
+            profile_store.add(record)
+
+class CompressionMiddleware:
+    """Negotiate gzip/Brotli for buffered responses above a size threshold.
+
+    Responses that already carry a Content-Encoding (cached payloads) and
+    streamed responses (file downloads) pass through untouched.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+        chunks = []
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+            if message.get("more_body", False) and not chunks:
+                # Streaming response - don't buffer it
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            body = b"".join(chunks)
+            headers = MutableHeaders(raw=start_message["headers"])
+            content_type = headers.get("content-type", "")
+            if (
+                len(body) >= self.minimum_size
+                and "content-encoding" not in headers
+                and content_type.startswith(COMPRESSIBLE_TYPES)
+            ):
+                body = compress_body(body, encoding)
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(body))
+                headers.add_vary_header("Accept-Encoding")
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_wrapper)
+
+
 # Routes
 @api_router.get("/")
 async def root():
@@ -381,48 +1544,55 @@ async def admin_login(credentials: AdminLogin):
     raise HTTPException(status_code=401, detail="Invalid credentials")
 
 # Merch Routes
-@api_router.get("/merch", response_model=List[MerchItem])
-async def get_merch():
-    items = await db.merch.find({}, {"_id": 0}).to_list(1000)
+def apply_sale_pricing(item: dict, sales_settings: Optional[dict]):
+    """Set effective_price and discount_percent on a merch document.
+
+    Used by every merch response so list, detail and page prices always agree.
+    """
+    sales_settings = sales_settings or {}
+    original_price = item['price']
+    applied_discount = 0
     
-    # Get sales settings
-    sales_settings = await db.sales_settings.find_one({"id": "sales_settings"}, {"_id": 0})
+    # Check individual item sale percent first (highest priority)
+    if item.get('sale_percent') and item['sale_percent'] > 0:
+        applied_discount = item['sale_percent']
+    # Check category sale
+    elif sales_settings.get('category_sales', {}).get(item['category']):
+        applied_discount = sales_settings['category_sales'][item['category']]
+    # Check site-wide sale
+    elif sales_settings.get('site_wide_sale') and sales_settings.get('site_wide_discount_percent'):
+        applied_discount = sales_settings['site_wide_discount_percent']
     
-    for item in items:
-        if isinstance(item.get('created_at'), str):
-            item['created_at'] = datetime.fromisoformat(item['created_at'])
+    # Add computed effective price and discount to response
+    item['effective_price'] = round(original_price * (1 - applied_discount / 100), 2)
+    item['discount_percent'] = applied_discount
+
+async def load_merch_items() -> List[dict]:
+    """Load all merch with sale pricing applied."""
+    with phase("db"):
+        items = await catalog_db.merch.find({}, {"_id": 0}).to_list(1000)
         
-        # Calculate effective price based on sales
-        if sales_settings:
-            original_price = item['price']
-            effective_price = original_price
-            applied_discount = 0
-            
-            # Check individual item sale percent first (highest priority)
-            if item.get('sale_percent') and item['sale_percent'] > 0:
-                applied_discount = item['sale_percent']
-                effective_price = original_price * (1 - applied_discount / 100)
-            # Check category sale
-            elif sales_settings.get('category_sales', {}).get(item['category']):
-                applied_discount = sales_settings['category_sales'][item['category']]
-                effective_price = original_price * (1 - applied_discount / 100)
-            # Check site-wide sale
-            elif sales_settings.get('site_wide_sale') and sales_settings.get('site_wide_discount_percent'):
-                applied_discount = sales_settings['site_wide_discount_percent']
-                effective_price = original_price * (1 - applied_discount / 100)
-            
-            # Add computed effective price and discount to response
-            item['effective_price'] = round(effective_price, 2)
-            item['discount_percent'] = applied_discount
-        else:
-            item['effective_price'] = item['price']
-            item['discount_percent'] = 0
+        # Get sales settings
+        sales_settings = await catalog_db.sales_settings.find_one({"id": "sales_settings"}, {"_id": 0})
+    
+    with phase("pricing"):
+        for item in items:
+            if isinstance(item.get('created_at'), str):
+                item['created_at'] = datetime.fromisoformat(item['created_at'])
+            apply_sale_pricing(item, sales_settings)
     
     return items
 
-@api_router.get("/merch/{item_id}", response_model=MerchItem)
-async def get_merch_item(item_id: str):
-    item = await db.merch.find_one({"id": item_id}, {"_id": 0})
+@api_router.get("/merch", response_model=List[MerchItem])
+async def get_merch(request: Request):
+    async def build():
+        return encode_json(List[MerchItem], await load_merch_items())
+    return await cached_json_response(request, ("merch", "sales_settings"), build)
+
+async def load_merch_item(item_id: str) -> dict:
+    """Load a single merch item with sale pricing applied."""
+    with phase("db"):
+        item = await catalog_db.merch.find_one({"id": item_id}, {"_id": 0})
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
     
@@ -430,31 +1600,21 @@ async def get_merch_item(item_id: str):
         item['created_at'] = datetime.fromisoformat(item['created_at'])
     
     # Get sales settings
-    sales_settings = await db.sales_settings.find_one({"id": "sales_settings"}, {"_id": 0})
+    with phase("db"):
+        sales_settings = await catalog_db.sales_settings.find_one({"id": "sales_settings"}, {"_id": 0})
     
-    # Calculate effective price with sales priority
-    original_price = item['price']
-    effective_price = original_price
-    applied_discount = 0
-    
-    if item.get('sale_percent'):
-        # Individual item sale has highest priority
-        applied_discount = item['sale_percent']
-        effective_price = original_price * (1 - applied_discount / 100)
-    elif sales_settings and sales_settings.get('category_sales', {}).get(item['category']):
-        # Category sale
-        applied_discount = sales_settings['category_sales'][item['category']]
-        effective_price = original_price * (1 - applied_discount / 100)
-    elif sales_settings and sales_settings.get('site_wide_sale') and sales_settings.get('site_wide_discount_percent'):
-        # Site-wide sale
-        applied_discount = sales_settings['site_wide_discount_percent']
-        effective_price = original_price * (1 - applied_discount / 100)
-    
-    # Add computed effective price and discount to response
-    item['effective_price'] = round(effective_price, 2)
-    item['discount_percent'] = applied_discount
+    with phase("pricing"):
+        apply_sale_pricing(item, sales_settings)
     
-    return MerchItem(**item)
+    return item
+
+@api_router.get("/merch/{item_id}", response_model=MerchItem)
+async def get_merch_item(request: Request, item_id: str):
+    async def build():
+        return encode_json(MerchItem, await load_merch_item(item_id))
+    response = await cached_json_response(request, ("merch", "sales_settings"), build)
+    autocomplete_index.record_view(f"merch:{item_id}")
+    return response
 
 @api_router.post("/merch", response_model=MerchItem)
 async def create_merch(item: MerchItemCreate, admin: bool = Depends(verify_admin)):
@@ -462,6 +1622,8 @@ async def create_merch(item: MerchItemCreate, admin: bool = Depends(verify_admin
     doc = merch_obj.model_dump()
     doc['created_at'] = doc['created_at'].isoformat()
     await db.merch.insert_one(doc)
+    await invalidate("merch", ids=[doc["id"]])
+    index_document("merch", doc)
     return merch_obj
 
 @api_router.put("/merch/{item_id}", response_model=MerchItem)
@@ -473,8 +1635,10 @@ async def update_merch(item_id: str, item_update: MerchItemUpdate, admin: bool =
     update_data = {k: v for k, v in item_update.model_dump().items() if v is not None}
     if update_data:
         await db.merch.update_one({"id": item_id}, {"$set": update_data})
+        await invalidate("merch", ids=[item_id])
     
     updated = await db.merch.find_one({"id": item_id}, {"_id": 0})
+    index_document("merch", updated)
     if isinstance(updated.get('created_at'), str):
         updated['created_at'] = datetime.fromisoformat(updated['created_at'])
     return MerchItem(**updated)
@@ -484,16 +1648,21 @@ async def delete_merch(item_id: str, admin: bool = Depends(verify_admin)):
     result = await db.merch.delete_one({"id": item_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Item not found")
+    await invalidate("merch", ids=[item_id])
+    unindex_document("merch", item_id)
     return {"message": "Item deleted successfully"}
 
 # Event Routes
 @api_router.get("/events", response_model=List[Event])
-async def get_events():
-    events = await db.events.find({}, {"_id": 0}).to_list(1000)
-    for event in events:
-        if isinstance(event.get('created_at'), str):
-            event['created_at'] = datetime.fromisoformat(event['created_at'])
-    return events
+async def get_events(request: Request):
+    async def build():
+        with phase("db"):
+            events = await catalog_db.events.find({}, {"_id": 0}).to_list(1000)
+        for event in events:
+            if isinstance(event.get('created_at'), str):
+                event['created_at'] = datetime.fromisoformat(event['created_at'])
+        return encode_json(List[Event], events)
+    return await cached_json_response(request, ("events",), build)
 
 @api_router.post("/events", response_model=Event)
 async def create_event(event: EventCreate, admin: bool = Depends(verify_admin)):
@@ -501,6 +1670,7 @@ async def create_event(event: EventCreate, admin: bool = Depends(verify_admin)):
     doc = event_obj.model_dump()
     doc['created_at'] = doc['created_at'].isoformat()
     await db.events.insert_one(doc)
+    await invalidate("events")
     return event_obj
 
 @api_router.put("/events/{event_id}", response_model=Event)
@@ -512,35 +1682,278 @@ async def update_event(event_id: str, event_update: EventUpdate, admin: bool = D
     update_data = {k: v for k, v in event_update.model_dump().items() if v is not None}
     if update_data:
         await db.events.update_one({"id": event_id}, {"$set": update_data})
+        await invalidate("events")
     
     updated = await db.events.find_one({"id": event_id}, {"_id": 0})
     if isinstance(updated.get('created_at'), str):
         updated['created_at'] = datetime.fromisoformat(updated['created_at'])
     return Event(**updated)
 
-@api_router.delete("/events/{event_id}")
-async def delete_event(event_id: str, admin: bool = Depends(verify_admin)):
-    result = await db.events.delete_one({"id": event_id})
-    if result.deleted_count == 0:
-        raise HTTPException(status_code=404, detail="Event not found")
-    return {"message": "Event deleted successfully"}
+@api_router.delete("/events/{event_id}")
+async def delete_event(event_id: str, admin: bool = Depends(verify_admin)):
+    result = await db.events.delete_one({"id": event_id})
+    if result.deleted_count == 0:
+        raise HTTPException(status_code=404, detail="Event not found")
+    await invalidate("events")
+    return {"message": "Event deleted successfully"}
+
+
+# Car Parts Routes
+PART_FACETS = ["car_model", "year", "category", "condition"]
+PART_SORTS = {
+    "newest": [("created_at", -1), ("id", 1)],
+    "price_asc": [("price", 1), ("id", 1)],
+    "price_desc": [("price", -1), ("id", 1)],
+    "name": [("name", 1), ("id", 1)],
+}
+
+def build_parts_filter(car_model, year, category, condition, min_price, max_price, in_stock) -> tuple:
+    """Split the filters into the facet selections and the rest.
+
+    Facet counts for a field apply every filter except that field's own, so the
+    other values stay visible and selectable while one is chosen.
+    """
+    selected = {}
+    for field, values in zip(PART_FACETS, (car_model, year, category, condition)):
+        if values:
+            selected[field] = values[0] if len(values) == 1 else {"$in": values}
+    query = {}
+    if min_price is not None or max_price is not None:
+        query["price"] = {}
+        if min_price is not None:
+            query["price"]["$gte"] = min_price
+        if max_price is not None:
+            query["price"]["$lte"] = max_price
+    if in_stock is not None:
+        query["stock"] = {"$gt": 0} if in_stock else {"$lte": 0}
+    return query, selected
+
+def build_parts_pipeline(query: dict, selected: dict, sort: str, page: int, page_size: int) -> list:
+    """One round trip for a parts page, its total and every facet's counts.
+
+    The leading $match is served by the parts indexes, then the page and total
+    apply every facet selection while each facet applies all of them but its own.
+    """
+    facet_stages = {
+        field: [
+            {"$match": {other: value for other, value in selected.items() if other != field}},
+            {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+            {"$sort": {"count": -1, "_id": 1}}
+        ]
+        for field in PART_FACETS
+    }
+    return [
+        {"$match": query},
+        {"$facet": {
+            "items": [
+                {"$match": selected},
+                {"$sort": dict(PART_SORTS[sort])},
+                {"$skip": (page - 1) * page_size},
+                {"$limit": page_size},
+                {"$project": {"_id": 0}}
+            ],
+            "total": [{"$match": selected}, {"$count": "count"}],
+            **facet_stages
+        }}
+    ]
+
+@api_router.get("/parts", response_model=PartsBrowseResponse)
+async def get_parts(
+    request: Request,
+    car_model: Optional[List[str]] = Query(None),
+    year: Optional[List[str]] = Query(None),
+    category: Optional[List[str]] = Query(None),
+    condition: Optional[List[str]] = Query(None),
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    in_stock: Optional[bool] = None,
+    q: Optional[str] = None,
+    sort: str = "newest",
+    page: int = 1,
+    page_size: int = 24
+):
+    """Browse parts with optional filters and text search, returning one page plus facet counts."""
+    if sort not in PART_SORTS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of: {', '.join(PART_SORTS)}")
+    if page < 1 or not 1 <= page_size <= 1000:
+        raise HTTPException(status_code=400, detail="page must be >= 1 and page_size between 1 and 1000")
+    
+    async def build():
+        query, selected = build_parts_filter(car_model, year, category, condition, min_price, max_price, in_stock)
+        if q and q.strip():
+            query["id"] = {"$in": [key[1] for _, key in search_index.search(q, {"part"})]}
+        pipeline = build_parts_pipeline(query, selected, sort, page, page_size)
+        with phase("db"):
+            result = (await catalog_db.parts.aggregate(pipeline).to_list(1))[0]
+        
+        for part in result["items"]:
+            if isinstance(part.get('created_at'), str):
+                part['created_at'] = datetime.fromisoformat(part['created_at'])
+        return encode_json(PartsBrowseResponse, {
+            "items": result["items"],
+            "total": result["total"][0]["count"] if result["total"] else 0,
+            "page": page,
+            "page_size": page_size,
+            "facets": {
+                field: [{"value": str(bucket["_id"]), "count": bucket["count"]} for bucket in result[field] if bucket["_id"] is not None]
+                for field in PART_FACETS
+            }
+        })
+    return await cached_json_response(request, ("parts",), build, {
+        "car_model": car_model, "year": year, "category": category, "condition": condition,
+        "min_price": min_price, "max_price": max_price, "in_stock": in_stock, "q": q,
+        "sort": sort, "page": page, "page_size": page_size
+    })
+
+# Part Fitment
+# car_model and year are free text ("Nissan 240SX S13/S14", "95-98"); they are parsed
+# into (model key, year range) pairs on write so fitment questions become index lookups.
+CAR_MAKES = {
+    "nissan", "toyota", "mazda", "honda", "subaru", "mitsubishi", "lexus", "infiniti",
+    "bmw", "ford", "chevrolet", "chevy", "dodge", "scion", "acura", "hyundai", "kia"
+}
+UNIVERSAL_MARKERS = {"universal", "all", "any"}
+# Common names mapped to the chassis codes parts are usually listed under
+MODEL_ALIASES = {
+    "240sx": ["s13", "s14"],
+    "180sx": ["s13"],
+    "200sx": ["s13", "s14", "s15"],
+    "silvia": ["s13", "s14", "s15"],
+    "300zx": ["z32"],
+    "350z": ["z33"],
+    "370z": ["z34"],
+    "skyline": ["r32", "r33", "r34"],
+    "rx7": ["fc", "fd"],
+    "supra": ["a70", "a80"],
+    "86": ["zn6"],
+    "gt86": ["zn6"],
+    "frs": ["zn6"],
+    "brz": ["zn6"],
+}
+MIN_FITMENT_YEAR = 0
+MAX_FITMENT_YEAR = 9999
+FITMENT_VERSION = 1  # Bump when parsing changes so stored parts are re-parsed on startup
+YEAR_RANGE_PATTERN = re.compile(r"^(\d{2}|\d{4})\s*(?:-|\u2013|\u2014|to)\s*(\d{2}|\d{4}|present|current|now)?$|^(\d{2}|\d{4})\s*\+?$")
 
+def _full_year(value: str) -> int:
+    year = int(value)
+    if len(value) == 2:
+        year += 1900 if year >= 50 else 2000
+    return year
 
-# Car Parts Routes
-@api_router.get("/parts", response_model=List[CarPart])
-async def get_parts():
-    parts = await db.parts.find({}, {"_id": 0}).to_list(1000)
-    for part in parts:
-        if isinstance(part.get('created_at'), str):
-            part['created_at'] = datetime.fromisoformat(part['created_at'])
-    return parts
+def parse_model_keys(car_model: str) -> List[str]:
+    """Split a free-text model string into normalized model keys ('*' = fits anything)."""
+    keys = []
+    for segment in re.split(r"[/,&|]|\bor\b|\band\b", car_model.lower()):
+        tokens = [token for token in tokenize(segment.replace("-", "")) if token not in CAR_MAKES]
+        if not tokens:
+            continue
+        if UNIVERSAL_MARKERS.intersection(tokens):
+            return ["*"]
+        keys.extend(token for token in tokens if token not in keys)
+    return keys or ["*"]
+
+def parse_year_ranges(year: str) -> List[tuple]:
+    """Parse '1995-1998', '95-98', '1997', '2003+', '89-94/95-98' into (start, end) ranges."""
+    text = year.strip().lower()
+    if not text or text in UNIVERSAL_MARKERS:
+        return [(MIN_FITMENT_YEAR, MAX_FITMENT_YEAR)]
+    ranges = []
+    for segment in re.split(r"[/,&]", text):
+        match = YEAR_RANGE_PATTERN.match(segment.strip())
+        if not match:
+            continue
+        start_text, end_text, single_text = match.groups()
+        if single_text:
+            start = _full_year(single_text)
+            end = MAX_FITMENT_YEAR if segment.strip().endswith("+") else start
+        else:
+            start = _full_year(start_text)
+            end = MAX_FITMENT_YEAR if end_text in (None, "present", "current", "now") else _full_year(end_text)
+        ranges.append((min(start, end), max(start, end)))
+    # Unparseable years shouldn't hide a part from model lookups
+    return ranges or [(MIN_FITMENT_YEAR, MAX_FITMENT_YEAR)]
+
+def build_fitment(car_model: str, year: str) -> List[dict]:
+    return [
+        {"model": key, "year_start": start, "year_end": end}
+        for key in parse_model_keys(car_model)
+        for start, end in parse_year_ranges(year)
+    ]
+
+def expand_model_key(model: str) -> List[str]:
+    """A query model plus its aliases in both directions (240sx <-> s13/s14)."""
+    keys = [key for key in parse_model_keys(model) if key != "*"]
+    expanded = list(keys)
+    for key in keys:
+        for alias in MODEL_ALIASES.get(key, []):
+            if alias not in expanded:
+                expanded.append(alias)
+        for common_name, chassis_codes in MODEL_ALIASES.items():
+            if key in chassis_codes and common_name not in expanded:
+                expanded.append(common_name)
+    return expanded
+
+async def backfill_part_fitment():
+    """Parse fitment for parts stored before it existed, or with an older parser."""
+    stale = {"$or": [{"fitment_version": {"$exists": False}}, {"fitment_version": {"$lt": FITMENT_VERSION}}]}
+    count = 0
+    async for part in db.parts.find(stale, {"_id": 0, "id": 1, "car_model": 1, "year": 1}):
+        await db.parts.update_one({"id": part["id"]}, {"$set": {
+            "fitment": build_fitment(part.get("car_model", ""), part.get("year", "")),
+            "fitment_version": FITMENT_VERSION
+        }})
+        count += 1
+    if count:
+        await invalidate("parts")
+        logger.info(f"Parsed fitment for {count} parts")
+
+@api_router.get("/parts/fitment", response_model=FitmentLookupResponse)
+async def get_parts_by_fitment(request: Request, model: Optional[str] = None, year: Optional[int] = None, page: int = 1, page_size: int = 24):
+    """Parts that fit a model and/or model year, e.g. ?model=240sx&year=1997."""
+    if not model and year is None:
+        raise HTTPException(status_code=400, detail="Provide a model, a year, or both")
+    if page < 1 or not 1 <= page_size <= 1000:
+        raise HTTPException(status_code=400, detail="page must be >= 1 and page_size between 1 and 1000")
+    model_keys = expand_model_key(model) if model else []
+    if model and not model_keys:
+        raise HTTPException(status_code=400, detail="Model not recognized")
+    
+    async def build():
+        criteria = {}
+        if model_keys:
+            criteria["model"] = {"$in": model_keys + ["*"]}
+        if year is not None:
+            criteria["year_start"] = {"$lte": year}
+            criteria["year_end"] = {"$gte": year}
+        # $elemMatch keeps model and year on the same fitment entry
+        query = {"fitment": {"$elemMatch": criteria}}
+        with phase("db"):
+            total = await catalog_db.parts.count_documents(query)
+            parts = await catalog_db.parts.find(query, {"_id": 0}).sort([("created_at", -1), ("id", 1)]).skip((page - 1) * page_size).limit(page_size).to_list(page_size)
+        for part in parts:
+            if isinstance(part.get('created_at'), str):
+                part['created_at'] = datetime.fromisoformat(part['created_at'])
+        return encode_json(FitmentLookupResponse, {
+            "model": model,
+            "year": year,
+            "model_keys": model_keys,
+            "items": parts,
+            "total": total,
+            "page": page,
+            "page_size": page_size
+        })
+    return await cached_json_response(request, ("parts",), build, {"model": model, "year": year, "page": page, "page_size": page_size})
 
 @api_router.post("/parts", response_model=CarPart)
 async def create_part(part: CarPartCreate, admin: bool = Depends(verify_admin)):
-    part_obj = CarPart(**part.model_dump())
+    part_obj = CarPart(**part.model_dump(), fitment=build_fitment(part.car_model, part.year))
     doc = part_obj.model_dump()
+    doc['fitment_version'] = FITMENT_VERSION
     doc['created_at'] = doc['created_at'].isoformat()
     await db.parts.insert_one(doc)
+    await invalidate("parts", ids=[doc["id"]])
+    index_document("parts", doc)
     return part_obj
 
 @api_router.put("/parts/{part_id}", response_model=CarPart)
@@ -550,10 +1963,16 @@ async def update_part(part_id: str, part_update: CarPartUpdate, admin: bool = De
         raise HTTPException(status_code=404, detail="Part not found")
     
     update_data = {k: v for k, v in part_update.model_dump().items() if v is not None}
+    if 'car_model' in update_data or 'year' in update_data:
+        merged = {**existing, **update_data}
+        update_data['fitment'] = build_fitment(merged.get('car_model', ''), merged.get('year', ''))
+        update_data['fitment_version'] = FITMENT_VERSION
     if update_data:
         await db.parts.update_one({"id": part_id}, {"$set": update_data})
+        await invalidate("parts", ids=[part_id])
     
     updated = await db.parts.find_one({"id": part_id}, {"_id": 0})
+    index_document("parts", updated)
     if isinstance(updated.get('created_at'), str):
         updated['created_at'] = datetime.fromisoformat(updated['created_at'])
     return CarPart(**updated)
@@ -563,6 +1982,8 @@ async def delete_part(part_id: str, admin: bool = Depends(verify_admin)):
     result = await db.parts.delete_one({"id": part_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Part not found")
+    await invalidate("parts", ids=[part_id])
+    unindex_document("parts", part_id)
     return {"message": "Part deleted successfully"}
 
 
@@ -570,7 +1991,7 @@ async def delete_part(part_id: str, admin: bool = Depends(verify_admin)):
 async def send_customer_confirmation_email(inquiry: ContactInquiry):
     """Send confirmation email to customer"""
     try:
-        if not resend.api_key:
+        if not email_provider.enabled:
             return
         
         from_email = os.environ.get('FROM_EMAIL', 'Triple Barrel Racing <onboarding@resend.dev>')
@@ -625,20 +2046,20 @@ async def send_customer_confirmation_email(inquiry: ContactInquiry):
             </div>
             """
         
-        resend.Emails.send({
+        await queue_email("customer_confirmation", {
             "from": from_email,
             "to": [inquiry.email],
             "subject": subject,
             "html": html
         })
-        logger.info(f"Confirmation email sent to {inquiry.email}")
+        logger.info(f"Confirmation email queued for {inquiry.email}")
     except Exception as e:
-        logger.error(f"Failed to send customer confirmation email: {str(e)}")
+        logger.error(f"Failed to queue customer confirmation email: {str(e)}")
 
 async def send_admin_notification_email(inquiry: ContactInquiry):
     """Send notification email to admin"""
     try:
-        if not resend.api_key:
+        if not email_provider.enabled:
             return
         
         from_email = os.environ.get('FROM_EMAIL', 'Triple Barrel Racing <onboarding@resend.dev>')
@@ -671,20 +2092,20 @@ async def send_admin_notification_email(inquiry: ContactInquiry):
         </div>
         """
         
-        resend.Emails.send({
+        await queue_email("admin_notification", {
             "from": from_email,
             "to": [admin_email],
             "subject": subject,
             "html": html
         })
-        logger.info(f"Admin notification sent for inquiry {inquiry.id}")
+        logger.info(f"Admin notification queued for inquiry {inquiry.id}")
     except Exception as e:
-        logger.error(f"Failed to send admin notification email: {str(e)}")
+        logger.error(f"Failed to queue admin notification email: {str(e)}")
 
 async def send_order_status_email(inquiry: ContactInquiry, old_status: str, new_status: str):
     """Send email to customer when order status changes"""
     try:
-        if not resend.api_key or inquiry.inquiry_type not in ['order', 'parts']:
+        if not email_provider.enabled or inquiry.inquiry_type not in ['order', 'parts']:
             return
         
         from_email = os.environ.get('FROM_EMAIL', 'Triple Barrel Racing <onboarding@resend.dev>')
@@ -745,23 +2166,25 @@ async def send_order_status_email(inquiry: ContactInquiry, old_status: str, new_
         </div>
         """
         
-        resend.Emails.send({
+        await queue_email("order_status", {
             "from": from_email,
             "to": [inquiry.email],
             "subject": status_info['subject'],
             "html": html
         })
-        logger.info(f"Status update email sent to {inquiry.email} for order {inquiry.id}")
+        logger.info(f"Status update email queued for {inquiry.email} for order {inquiry.id}")
     except Exception as e:
-        logger.error(f"Failed to send status update email: {str(e)}")
+        logger.error(f"Failed to queue status update email: {str(e)}")
 
 # Contact/Inquiry Routes
 @api_router.post("/contact")
-async def submit_contact(inquiry: ContactInquiryCreate):
+async def submit_contact(request: Request, inquiry: ContactInquiryCreate):
+    await enforce_rate_limit("contact", request, inquiry.email)
     inquiry_obj = ContactInquiry(**inquiry.model_dump())
     doc = inquiry_obj.model_dump()
     doc['created_at'] = doc['created_at'].isoformat()
-    await db.inquiries.insert_one(doc)
+    with phase("db"):
+        await db.inquiries.insert_one(doc)
     
     # Send emails asynchronously
     await send_customer_confirmation_email(inquiry_obj)
@@ -769,13 +2192,55 @@ async def submit_contact(inquiry: ContactInquiryCreate):
     
     return {"message": "Inquiry submitted successfully", "id": inquiry_obj.id}
 
-@api_router.get("/inquiries", response_model=List[ContactInquiry])
-async def get_inquiries(admin: bool = Depends(verify_admin)):
-    inquiries = await db.inquiries.find({}, {"_id": 0}).to_list(1000)
-    for inquiry in inquiries:
+def parse_day(value: str, name: str) -> datetime:
+    try:
+        return datetime.fromisoformat(value).replace(tzinfo=timezone.utc)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"{name} must be a YYYY-MM-DD date")
+
+@api_router.get("/inquiries", response_model=InquiryPage)
+async def get_inquiries(
+    status: Optional[str] = None,
+    inquiry_type: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    q: Optional[str] = None,
+    sort: str = "newest",
+    cursor: Optional[str] = None,
+    limit: int = 50,
+    admin: bool = Depends(verify_admin)
+):
+    """Filtered inbox page. status and inquiry_type take comma-separated values; since/until are inclusive UTC dates."""
+    if sort not in ("newest", "oldest"):
+        raise HTTPException(status_code=400, detail="sort must be 'newest' or 'oldest'")
+    if not 1 <= limit <= 200:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 200")
+    
+    query = {}
+    if q and q.strip():
+        query["$text"] = {"$search": q.strip()}
+    if inquiry_type:
+        query["inquiry_type"] = {"$in": inquiry_type.split(",")}
+    created_at = {}
+    if since:
+        created_at["$gte"] = parse_day(since, "since").isoformat()
+    if until:
+        created_at["$lt"] = (parse_day(until, "until") + timedelta(days=1)).isoformat()
+    if created_at:
+        query["created_at"] = created_at
+    
+    # Counts ignore the status filter so the inbox can show every status tab
+    filtered = {**query, "status": {"$in": status.split(",")}} if status else query
+    with phase("db"):
+        (items, next_cursor), counts, total = await asyncio.gather(
+            fetch_cursor_page(db.inquiries, filtered, cursor, limit, direction=-1 if sort == "newest" else 1),
+            count_by(db.inquiries, "status", query),
+            db.inquiries.count_documents(filtered)
+        )
+    for inquiry in items:
         if isinstance(inquiry.get('created_at'), str):
             inquiry['created_at'] = datetime.fromisoformat(inquiry['created_at'])
-    return inquiries
+    return InquiryPage(items=items, next_cursor=next_cursor, total=total, counts=counts)
 
 @api_router.patch("/inquiries/{inquiry_id}/status")
 async def update_inquiry_status(inquiry_id: str, status_update: InquiryStatusUpdate, admin: bool = Depends(verify_admin)):
@@ -805,23 +2270,24 @@ async def update_inquiry_status(inquiry_id: str, status_update: InquiryStatusUpd
     
     return {"message": "Status updated successfully"}
 
-# Square Client Setup
-from square import Square
-
-def get_square_client():
-    """Initialize Square client with environment credentials."""
-    return Square(
-        access_token=os.environ.get('SQUARE_ACCESS_TOKEN', ''),
-        environment=os.environ.get('SQUARE_ENVIRONMENT', 'sandbox')
-    )
-
 # Order Routes
 @api_router.post("/orders", response_model=Order)
-async def create_order(order_data: OrderCreate):
+async def create_order(request: Request, order_data: OrderCreate):
     """Create an order before payment processing."""
+    await enforce_rate_limit("orders", request, order_data.customer_email)
     # Calculate total amount
     total_amount = sum(item.unit_price * item.quantity for item in order_data.line_items)
     
+    # Snapshot catalog prices so analytics can tell sale units from full-price units
+    product_ids = [item.product_id for item in order_data.line_items]
+    catalog_prices = {}
+    with phase("db"):
+        for collection in (db.parts, db.merch):
+            async for doc in collection.find({"id": {"$in": product_ids}}, {"_id": 0, "id": 1, "price": 1}):
+                catalog_prices[doc["id"]] = doc["price"]
+    for item in order_data.line_items:
+        item.list_price = catalog_prices.get(item.product_id, item.unit_price)
+    
     # Create order object
     order = Order(
         customer_email=order_data.customer_email,
@@ -835,16 +2301,71 @@ async def create_order(order_data: OrderCreate):
     order_doc['created_at'] = order_doc['created_at'].isoformat()
     order_doc['line_items'] = [item.model_dump() for item in order.line_items]
     
-    await db.orders.insert_one(order_doc)
+    with phase("db"):
+        await db.orders.insert_one(order_doc)
     
     logger.info(f"Order created: {order.id} for {order.customer_email}")
     return order
 
+STOCK_LEDGER_SIZE = 200  # Recent order line keys kept on each merch document to make stock updates idempotent
+
+async def take_stock(product_id: str, field: str, quantity: int, key: str):
+    """Take quantity out of a merch stock field once per key, never going below zero.
+
+    Each update checks and records the key on the merch document itself, so it is
+    atomic with the stock change: concurrent orders cannot lose a decrement and a
+    re-run after a crash cannot take the same line item out twice.
+    """
+    applied = {"$push": {"stock_ledger": {"$each": [key], "$slice": -STOCK_LEDGER_SIZE}}}
+    for _ in range(3):
+        result = await db.merch.update_one(
+            {"id": product_id, field: {"$gte": quantity}, "stock_ledger": {"$ne": key}},
+            {"$inc": {field: -quantity}, **applied}
+        )
+        if result.matched_count:
+            return
+        # Less left than ordered (or none recorded): clamp at zero as before
+        result = await db.merch.update_one(
+            {"id": product_id, field: {"$not": {"$gte": quantity}}, "stock_ledger": {"$ne": key}},
+            {"$set": {field: 0}, **applied}
+        )
+        if result.matched_count or await db.merch.count_documents({"id": product_id, "stock_ledger": key}, limit=1):
+            return
+        # Stock moved between the two guarded updates; try again
+
+@job_handler("stock")
+async def apply_order_stock(payload: dict):
+    """Take a completed order's line items out of merch stock.
+
+    Every line item is applied through take_stock, keyed by order and position,
+    so a job re-run after a shutdown or failure skips the ones already taken out.
+    """
+    order_id = payload["order_id"]
+    order_doc = await db.orders.find_one({"id": order_id}, {"_id": 0, "line_items": 1, "stock_applied": 1})
+    if not order_doc:
+        return
+    applied = set(order_doc.get("stock_applied", []))
+    for index, line_item in enumerate(order_doc["line_items"]):
+        if index in applied:
+            continue
+        merch = await db.merch.find_one({"id": line_item["product_id"]}, {"_id": 0, "sizes": 1})
+        if merch is not None and merch.get('sizes'):
+            # Update size-specific stock
+            if line_item.get("size") in merch['sizes']:
+                await take_stock(line_item["product_id"], f"sizes.{line_item['size']}", line_item["quantity"], f"{order_id}:{index}")
+        elif merch is not None:
+            # Update regular stock for non-sized items
+            await take_stock(line_item["product_id"], "stock", line_item["quantity"], f"{order_id}:{index}")
+        # Lets later re-runs skip the merch lookup; take_stock is what guarantees a single decrement
+        await db.orders.update_one({"id": order_id}, {"$addToSet": {"stock_applied": index}})
+    await invalidate("merch", ids=[line_item["product_id"] for line_item in order_doc["line_items"]])
+
 @api_router.post("/payments/process")
 async def process_payment(payment_request: PaymentRequest):
     """Process a payment using Square Payments API."""
     # Retrieve order from database
-    order_doc = await db.orders.find_one({"id": payment_request.order_id}, {"_id": 0})
+    with phase("db"):
+        order_doc = await db.orders.find_one({"id": payment_request.order_id}, {"_id": 0})
     if not order_doc:
         raise HTTPException(status_code=404, detail="Order not found")
     
@@ -854,12 +2375,10 @@ async def process_payment(payment_request: PaymentRequest):
     # Reconstruct order object
     if isinstance(order_doc.get('created_at'), str):
         order_doc['created_at'] = datetime.fromisoformat(order_doc['created_at'])
-    order = Order(**order_doc)
+    with phase("validation"):
+        order = Order(**order_doc)
     
     try:
-        # Initialize Square client
-        square_client = get_square_client()
-        
         # Create payment with Square Payments API
         amount_money = {
             "amount": int(order.total_amount * 100),  # Convert to cents
@@ -870,43 +2389,40 @@ async def process_payment(payment_request: PaymentRequest):
             "source_id": payment_request.source_id,
             "idempotency_key": str(uuid.uuid4()),
             "amount_money": amount_money,
-            "location_id": os.environ.get('SQUARE_LOCATION_ID', ''),
+            "location_id": payment_provider.location_id,
             "reference_id": order.id,
             "note": f"Order {order.id} - {order.customer_name}"
         }
         
-        result = square_client.payments.create_payment(body=body)
+        square_result = await payment_provider.create_payment(body)
+        if square_result.is_error():
+            EXTERNAL_CALL_ERRORS.labels("square", "create_payment").inc()
         
-        if result.is_success():
-            payment = result.body['payment']
+        if square_result.is_success():
+            payment = square_result.body['payment']
             
-            # Update order with payment information
-            await db.orders.update_one(
-                {"id": order.id},
-                {"$set": {
-                    "square_payment_id": payment['id'],
-                    "status": "completed"
-                }}
-            )
+            with phase("db"):
+                # Update order with payment information
+                completed_at = datetime.now(timezone.utc)
+                order_update = await db.orders.update_one(
+                    {"id": order.id, "status": "pending"},
+                    {"$set": {
+                        "square_payment_id": payment['id'],
+                        "status": "completed",
+                        "completed_at": completed_at.isoformat()
+                    }}
+                )
+                # Only the request that completed the order counts it; a failed rollup is
+                # repaired by POST /admin/analytics/rebuild and must not fail a paid order
+                if order_update.modified_count:
+                    try:
+                        await record_sale(order, completed_at)
+                    except Exception as e:
+                        logger.error(f"Failed to record sale rollup for order {order.id}: {str(e)}")
             
-            # Update inventory - reduce stock for each line item
-            for line_item in order.line_items:
-                merch = await db.merch.find_one({"id": line_item.product_id}, {"_id": 0})
-                if merch and merch.get('sizes'):
-                    # Update size-specific stock
-                    if line_item.size in merch['sizes']:
-                        new_stock = max(0, merch['sizes'][line_item.size] - line_item.quantity)
-                        await db.merch.update_one(
-                            {"id": line_item.product_id},
-                            {"$set": {f"sizes.{line_item.size}": new_stock}}
-                        )
-                elif merch:
-                    # Update regular stock for non-sized items
-                    new_stock = max(0, merch.get('stock', 0) - line_item.quantity)
-                    await db.merch.update_one(
-                        {"id": line_item.product_id},
-                        {"$set": {"stock": new_stock}}
-                    )
+            if order_update.modified_count:
+                # Update inventory - reduce stock for each line item
+                await background_jobs.submit("stock", {"order_id": order.id})
             
             logger.info(f"Payment {payment['id']} processed successfully for order {order.id}")
             
@@ -918,8 +2434,8 @@ async def process_payment(payment_request: PaymentRequest):
                 "status": payment['status']
             }
         
-        elif result.is_error():
-            error_detail = result.errors[0]['detail'] if result.errors else "Unknown error"
+        elif square_result.is_error():
+            error_detail = square_result.errors[0]['detail'] if square_result.errors else "Unknown error"
             logger.warning(f"Error processing payment: {error_detail}")
             
             # Update order status to failed
@@ -946,32 +2462,291 @@ async def get_order(order_id: str):
     
     return order_doc
 
+# Sales Analytics
+# Completed orders are rolled up per day (sales_daily) and per day/product/size
+# (sales_daily_products). process_payment adds each sale with $inc upserts; the
+# rebuild pipelines recompute both collections from the orders collection.
+# sales_rollup_state coordinates the two across workers so no sale is lost or
+# counted twice while a rebuild replaces the collections.
+SALES_APPLYING_TIMEOUT_SECONDS = 30  # A sale still "applying" after this was left by a crashed worker
+SALES_REBUILD_STALE_SECONDS = 600  # A rebuild flag older than this is left over from a crash and may be taken over
+SALES_DAY = {"$substrBytes": [{"$ifNull": ["$completed_at", "$created_at"]}, 0, 10]}
+
+def round_money(row: dict) -> dict:
+    return {**row, "revenue": round(row["revenue"], 2), "discount_total": round(row.get("discount_total", 0.0), 2)}
+
+def line_item_discount(item: OrderLineItem) -> float:
+    list_price = item.list_price if item.list_price is not None else item.unit_price
+    return max(0.0, list_price - item.unit_price) * item.quantity
+
+async def record_sale(order: Order, completed_at: datetime):
+    """Add one completed order to the daily rollups, at most once.
+
+    The order is marked "applying" before the rebuild state is read, and a rebuild
+    waits for applying orders to finish before it replaces the collections, so no
+    $inc can land after the replace. Held off while a rebuild runs and skipped for
+    orders before the last rebuild's cutoff: the rebuild counts those itself and
+    replays the ones after it.
+    """
+    claimed = await db.orders.update_one(
+        {"id": order.id, "rollup_state": None},
+        {"$set": {"rollup_state": "applying", "rollup_claimed_at": datetime.now(timezone.utc).isoformat()}}
+    )
+    if not claimed.modified_count:
+        return
+    state = await db.sales_rollup_state.find_one({"_id": "sales"}) or {}
+    if state.get("rebuilding") or completed_at.isoformat() < state.get("cutoff", ""):
+        await db.orders.update_one({"id": order.id}, {"$unset": {"rollup_state": "", "rollup_claimed_at": ""}})
+        return
+    day = completed_at.date().isoformat()
+    discounted = [item for item in order.line_items if line_item_discount(item) > 0]
+    await db.sales_daily.update_one(
+        {"date": day},
+        {"$inc": {
+            "orders": 1,
+            "revenue": order.total_amount,
+            "units": sum(item.quantity for item in order.line_items),
+            "discounted_units": sum(item.quantity for item in discounted),
+            "discount_total": sum(line_item_discount(item) for item in discounted)
+        }},
+        upsert=True
+    )
+    for item in order.line_items:
+        await db.sales_daily_products.update_one(
+            {"date": day, "product_id": item.product_id, "size": item.size},
+            {
+                "$set": {"product_name": item.product_name},
+                "$inc": {
+                    "units": item.quantity,
+                    "revenue": item.unit_price * item.quantity,
+                    "discounted_units": item.quantity if line_item_discount(item) > 0 else 0,
+                    "discount_total": line_item_discount(item)
+                }
+            },
+            upsert=True
+        )
+    await db.orders.update_one({"id": order.id}, {"$set": {"rollup_state": "applied"}})
+
+async def wait_for_applying_sales():
+    """Wait until no record_sale that started before the rebuild flag is still writing."""
+    while True:
+        since = (datetime.now(timezone.utc) - timedelta(seconds=SALES_APPLYING_TIMEOUT_SECONDS)).isoformat()
+        if not await db.orders.count_documents({"rollup_state": "applying", "rollup_claimed_at": {"$gt": since}}, limit=1):
+            return
+        await asyncio.sleep(0.05)
+
+async def rebuild_sales_rollups():
+    """Recompute both rollup collections from completed orders.
+
+    record_sale is held off and the sales it was already applying are waited for, so
+    no $inc lands in a collection while it is replaced. Orders completed before the
+    cutoff are counted by the pipelines; the rest are replayed through record_sale after.
+    """
+    started_at = datetime.now(timezone.utc)
+    stale = (started_at - timedelta(seconds=SALES_REBUILD_STALE_SECONDS)).isoformat()
+    try:
+        await db.sales_rollup_state.update_one(
+            {"_id": "sales", "$or": [{"rebuilding": {"$ne": True}}, {"started_at": {"$lt": stale}}]},
+            {"$set": {"rebuilding": True, "started_at": started_at.isoformat()}},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail="A sales rollup rebuild is already running")
+    try:
+        await wait_for_applying_sales()
+        cutoff = datetime.now(timezone.utc).isoformat()
+        await build_sales_rollups(cutoff)
+    except BaseException:
+        # Orders held off so far are counted by the next successful rebuild
+        await db.sales_rollup_state.update_one({"_id": "sales"}, {"$set": {"rebuilding": False}})
+        raise
+    await db.sales_rollup_state.update_one({"_id": "sales"}, {"$set": {"rebuilding": False, "cutoff": cutoff}})
+    async for order_doc in db.orders.find(
+        {"status": "completed", "completed_at": {"$gte": cutoff}, "rollup_state": None}, {"_id": 0}
+    ):
+        await record_sale(Order(**order_doc), datetime.fromisoformat(order_doc["completed_at"]))
+
+async def build_sales_rollups(cutoff: str):
+    """Replace both rollup collections with totals for orders completed before cutoff."""
+    line_discount = {"$multiply": [
+        {"$max": [0, {"$subtract": [{"$ifNull": ["$line_items.list_price", "$line_items.unit_price"]}, "$line_items.unit_price"]}]},
+        "$line_items.quantity"
+    ]}
+    completed = {"$match": {"status": "completed", "$or": [{"completed_at": {"$lt": cutoff}}, {"completed_at": None}]}}
+    await db.orders.aggregate([
+        completed,
+        {"$unwind": "$line_items"},
+        {"$group": {
+            "_id": {"date": SALES_DAY, "product_id": "$line_items.product_id", "size": "$line_items.size"},
+            "product_name": {"$last": "$line_items.product_name"},
+            "units": {"$sum": "$line_items.quantity"},
+            "revenue": {"$sum": {"$multiply": ["$line_items.unit_price", "$line_items.quantity"]}},
+            "discounted_units": {"$sum": {"$cond": [{"$gt": [line_discount, 0]}, "$line_items.quantity", 0]}},
+            "discount_total": {"$sum": line_discount}
+        }},
+        {"$project": {
+            "_id": 0, "date": "$_id.date", "product_id": "$_id.product_id", "size": "$_id.size",
+            "product_name": 1, "units": 1, "revenue": 1, "discounted_units": 1, "discount_total": 1
+        }},
+        {"$out": "sales_daily_products"}
+    ]).to_list(None)
+    await db.orders.aggregate([
+        completed,
+        {"$project": {
+            "date": SALES_DAY,
+            "total_amount": 1,
+            "units": {"$sum": "$line_items.quantity"}
+        }},
+        {"$group": {"_id": "$date", "orders": {"$sum": 1}, "revenue": {"$sum": "$total_amount"}, "units": {"$sum": "$units"}}},
+        {"$project": {"_id": 0, "date": "$_id", "orders": 1, "revenue": 1, "units": 1}},
+        {"$out": "sales_daily"}
+    ]).to_list(None)
+    # Discount figures per day come from the product rollup just built
+    async for row in db.sales_daily_products.aggregate([
+        {"$group": {"_id": "$date", "discounted_units": {"$sum": "$discounted_units"}, "discount_total": {"$sum": "$discount_total"}}}
+    ]):
+        await db.sales_daily.update_one(
+            {"date": row["_id"]},
+            {"$set": {"discounted_units": row["discounted_units"], "discount_total": row["discount_total"]}}
+        )
+
+@api_router.get("/admin/analytics/sales", response_model=SalesAnalytics)
+async def get_sales_analytics(
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    admin: bool = Depends(verify_admin)
+):
+    """Revenue, units and discount totals between two dates (inclusive, YYYY-MM-DD, UTC)."""
+    today = datetime.now(timezone.utc).date()
+    try:
+        end_date = datetime.fromisoformat(end).date() if end else today
+        start_date = datetime.fromisoformat(start).date() if start else end_date - timedelta(days=29)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="start and end must be YYYY-MM-DD dates")
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    date_range = {"date": {"$gte": start_date.isoformat(), "$lte": end_date.isoformat()}}
+    
+    daily_docs, product_rows = await asyncio.gather(
+        db.sales_daily.find(date_range, {"_id": 0}).sort("date", 1).to_list(None),
+        db.sales_daily_products.aggregate([
+            {"$match": date_range},
+            {"$group": {
+                "_id": {"product_id": "$product_id", "size": "$size"},
+                "product_name": {"$last": "$product_name"},
+                "units": {"$sum": "$units"},
+                "revenue": {"$sum": "$revenue"},
+                "discounted_units": {"$sum": "$discounted_units"},
+                "discount_total": {"$sum": "$discount_total"}
+            }}
+        ]).to_list(None)
+    )
+    
+    daily = [DailySales(**round_money(doc)) for doc in daily_docs]
+    totals = {field: 0 for field in SalesTotals.model_fields}
+    for day in daily:
+        for field in totals:
+            totals[field] += getattr(day, field)
+    
+    products: Dict[str, dict] = {}
+    for row in product_rows:
+        product_id = row["_id"]["product_id"]
+        product = products.setdefault(product_id, {
+            "product_id": product_id, "product_name": row["product_name"], "units": 0, "revenue": 0.0,
+            "discounted_units": 0, "discount_total": 0.0, "units_by_size": {}
+        })
+        for field in ("units", "revenue", "discounted_units", "discount_total"):
+            product[field] += row[field]
+        if row["_id"]["size"]:
+            product["units_by_size"][row["_id"]["size"]] = row["units"]
+    
+    return SalesAnalytics(
+        start=start_date.isoformat(),
+        end=end_date.isoformat(),
+        totals=SalesTotals(**round_money(totals)),
+        daily=daily,
+        products=sorted((ProductSales(**round_money(product)) for product in products.values()), key=lambda p: p.revenue, reverse=True)
+    )
+
+@api_router.post("/admin/analytics/rebuild")
+async def rebuild_sales_analytics(admin: bool = Depends(verify_admin)):
+    """Recompute the sales rollups from the orders collection."""
+    await rebuild_sales_rollups()
+    return {"message": "Sales rollups rebuilt", "days": await db.sales_daily.count_documents({})}
+
 # File Upload Endpoint
 UPLOAD_DIR = ROOT_DIR / "uploads"
 UPLOAD_DIR.mkdir(exist_ok=True)
 
-@api_router.post("/upload")
-async def upload_file(file: UploadFile = File(...), admin: bool = Depends(verify_admin)):
-    """Upload an image file and return its URL."""
-    # Validate file type
-    allowed_types = ["image/jpeg", "image/png", "image/jpg", "image/webp", "image/gif"]
-    if file.content_type not in allowed_types:
-        raise HTTPException(status_code=400, detail="Only image files are allowed")
+ALLOWED_IMAGE_TYPES = ["image/jpeg", "image/png", "image/jpg", "image/webp", "image/gif"]
+# Leading bytes of each accepted image format, checked so a renamed non-image is rejected
+IMAGE_SIGNATURES = [b"\xff\xd8\xff", b"\x89PNG\r\n\x1a\n", b"GIF87a", b"GIF89a"]
+UPLOAD_CONCURRENCY = int(os.environ.get('UPLOAD_CONCURRENCY', '4'))
+UPLOAD_BATCH_MAX_FILES = int(os.environ.get('UPLOAD_BATCH_MAX_FILES', '50'))
+upload_semaphore = asyncio.Semaphore(UPLOAD_CONCURRENCY)
+
+def _is_image_header(header: bytes) -> bool:
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return True
+    return any(header.startswith(signature) for signature in IMAGE_SIGNATURES)
+
+def _write_upload(source, file_path: Path):
+    """Validate the image header and copy the upload to disk. Runs in a worker thread."""
+    header = source.read(12)
+    source.seek(0)
+    if not _is_image_header(header):
+        raise ValueError("File content is not a supported image")
+    with open(file_path, "wb") as buffer:
+        shutil.copyfileobj(source, buffer)
+
+async def save_upload(file: UploadFile) -> str:
+    """Validate and store one uploaded image, returning its public URL."""
+    if file.content_type not in ALLOWED_IMAGE_TYPES:
+        raise HTTPException(status_code=400, detail=f"Only image files are allowed ({file.filename})")
     
     # Generate unique filename
     file_extension = file.filename.split(".")[-1]
     unique_filename = f"{uuid.uuid4()}.{file_extension}"
     file_path = UPLOAD_DIR / unique_filename
     
-    # Save file
-    try:
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to upload file: {str(e)}")
+    # Save file off the event loop, bounded so a large batch can't exhaust the thread pool
+    async with upload_semaphore:
+        try:
+            await asyncio.to_thread(_write_upload, file.file, file_path)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"{str(e)} ({file.filename})")
+        except Exception as e:
+            file_path.unlink(missing_ok=True)
+            raise HTTPException(status_code=500, detail=f"Failed to upload file: {str(e)}")
     
     # Return the URL path (with /api prefix for proper routing)
-    return {"image_url": f"/api/uploads/{unique_filename}"}
+    return f"/api/uploads/{unique_filename}"
+
+@api_router.post("/upload")
+async def upload_file(file: UploadFile = File(...), admin: bool = Depends(verify_admin)):
+    """Upload an image file and return its URL."""
+    return {"image_url": await save_upload(file)}
+
+@api_router.post("/upload/batch")
+async def upload_files(files: List[UploadFile] = File(...), admin: bool = Depends(verify_admin)):
+    """Upload several image files in one request and return their URLs in the order sent."""
+    if len(files) > UPLOAD_BATCH_MAX_FILES:
+        raise HTTPException(status_code=400, detail=f"At most {UPLOAD_BATCH_MAX_FILES} files per batch")
+    
+    results = await asyncio.gather(*(save_upload(file) for file in files), return_exceptions=True)
+    
+    failures = [result for result in results if isinstance(result, Exception)]
+    if failures:
+        # All-or-nothing: drop the files that did succeed so a half-saved gallery isn't left behind
+        for result in results:
+            if isinstance(result, str):
+                (UPLOAD_DIR / result.rsplit("/", 1)[-1]).unlink(missing_ok=True)
+        first = failures[0]
+        if isinstance(first, HTTPException):
+            raise first
+        raise HTTPException(status_code=500, detail=f"Failed to upload files: {str(first)}")
+    
+    return {"image_urls": results}
 
 @api_router.get("/uploads/{filename}")
 async def get_uploaded_file(filename: str):
@@ -981,14 +2756,127 @@ async def get_uploaded_file(filename: str):
         raise HTTPException(status_code=404, detail="File not found")
     return FileResponse(file_path)
 
+# Upload Garbage Collection
+# Fields that may point at files in UPLOAD_DIR, per collection. Blog content is
+# scanned too since markdown bodies can embed uploaded images inline.
+UPLOAD_REFERENCE_FIELDS = {
+    "merch": ["image_urls"],
+    "events": ["image_url"],
+    "parts": ["image_url"],
+    "drivers": ["image_url"],
+    "cars": ["image_url"],
+    "blog_posts": ["images", "content"],
+    "sponsors": ["logo_url"],
+}
+UPLOAD_URL_PATTERN = re.compile(r"/uploads/([^/?#\s\"')]+)")
+UPLOAD_GC_GRACE_HOURS = float(os.environ.get('UPLOAD_GC_GRACE_HOURS', '24'))
+UPLOAD_GC_INTERVAL_HOURS = float(os.environ.get('UPLOAD_GC_INTERVAL_HOURS', '0'))
+
+class UploadGCReport(BaseModel):
+    dry_run: bool
+    grace_hours: float
+    scanned_files: int
+    referenced_files: int
+    deleted_files: List[str] = []
+    reclaimed_bytes: int = 0
+
+def _extract_upload_names(value) -> List[str]:
+    """Return upload filenames referenced by a field value (string or list of strings)."""
+    if isinstance(value, str):
+        return UPLOAD_URL_PATTERN.findall(value)
+    if isinstance(value, list):
+        names = []
+        for entry in value:
+            if isinstance(entry, str):
+                names.extend(UPLOAD_URL_PATTERN.findall(entry))
+        return names
+    return []
+
+async def collect_referenced_uploads() -> set:
+    """Stream every collection that stores image URLs and collect the referenced filenames."""
+    referenced = set()
+    for collection_name, fields in UPLOAD_REFERENCE_FIELDS.items():
+        projection = {"_id": 0, **{field: 1 for field in fields}}
+        async for doc in db[collection_name].find({}, projection, batch_size=500):
+            for field in fields:
+                referenced.update(_extract_upload_names(doc.get(field)))
+    return referenced
+
+def _sweep_upload_dir(referenced: set, cutoff: float, dry_run: bool):
+    """Delete unreferenced files older than cutoff. Runs in a worker thread."""
+    scanned = 0
+    deleted = []
+    reclaimed = 0
+    with os.scandir(UPLOAD_DIR) as entries:
+        for entry in entries:
+            if not entry.is_file():
+                continue
+            scanned += 1
+            if entry.name in referenced:
+                continue
+            stat = entry.stat()
+            if stat.st_mtime > cutoff:
+                # Still within the grace period - may belong to an admin form in progress
+                continue
+            if not dry_run:
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    continue
+            deleted.append(entry.name)
+            reclaimed += stat.st_size
+    return scanned, deleted, reclaimed
+
+async def collect_orphaned_uploads(grace_hours: float = UPLOAD_GC_GRACE_HOURS, dry_run: bool = False) -> UploadGCReport:
+    """Remove uploaded files no document references anymore."""
+    # Take the cutoff before reading references so a file uploaded and saved
+    # mid-scan is always protected by the grace period
+    cutoff = time.time() - grace_hours * 3600
+    referenced = await collect_referenced_uploads()
+    scanned, deleted, reclaimed = await asyncio.to_thread(_sweep_upload_dir, referenced, cutoff, dry_run)
+
+    logger.info(
+        f"Upload GC {'(dry run) ' if dry_run else ''}scanned {scanned} files, "
+        f"{'would delete' if dry_run else 'deleted'} {len(deleted)}, reclaimed {reclaimed} bytes"
+    )
+    return UploadGCReport(
+        dry_run=dry_run,
+        grace_hours=grace_hours,
+        scanned_files=scanned,
+        referenced_files=len(referenced),
+        deleted_files=deleted,
+        reclaimed_bytes=reclaimed
+    )
+
+async def upload_gc_loop():
+    """Periodically collect orphaned uploads when UPLOAD_GC_INTERVAL_HOURS is set."""
+    while True:
+        await asyncio.sleep(UPLOAD_GC_INTERVAL_HOURS * 3600)
+        try:
+            await collect_orphaned_uploads()
+        except Exception as e:
+            logger.error(f"Upload GC failed: {str(e)}")
+
+@api_router.post("/admin/uploads/gc", response_model=UploadGCReport)
+async def run_upload_gc(dry_run: bool = True, grace_hours: Optional[float] = None, admin: bool = Depends(verify_admin)):
+    """Delete (or with dry_run, just list) uploads that are no longer referenced."""
+    if grace_hours is None:
+        grace_hours = UPLOAD_GC_GRACE_HOURS
+    if grace_hours < 0:
+        raise HTTPException(status_code=400, detail="grace_hours must not be negative")
+    return await collect_orphaned_uploads(grace_hours=grace_hours, dry_run=dry_run)
+
 # Driver Routes
 @api_router.get("/drivers", response_model=List[Driver])
-async def get_drivers():
-    drivers = await db.drivers.find({}, {"_id": 0}).to_list(1000)
-    for driver in drivers:
-        if isinstance(driver.get('created_at'), str):
-            driver['created_at'] = datetime.fromisoformat(driver['created_at'])
-    return drivers
+async def get_drivers(request: Request):
+    async def build():
+        with phase("db"):
+            drivers = await catalog_db.drivers.find({}, {"_id": 0}).to_list(1000)
+        for driver in drivers:
+            if isinstance(driver.get('created_at'), str):
+                driver['created_at'] = datetime.fromisoformat(driver['created_at'])
+        return encode_json(List[Driver], drivers)
+    return await cached_json_response(request, ("drivers",), build)
 
 @api_router.post("/drivers", response_model=Driver)
 async def create_driver(driver: DriverCreate, admin: bool = Depends(verify_admin)):
@@ -996,6 +2884,7 @@ async def create_driver(driver: DriverCreate, admin: bool = Depends(verify_admin
     doc = driver_obj.model_dump()
     doc['created_at'] = doc['created_at'].isoformat()
     await db.drivers.insert_one(doc)
+    await invalidate("drivers")
     return driver_obj
 
 @api_router.put("/drivers/{driver_id}", response_model=Driver)
@@ -1007,6 +2896,15 @@ async def update_driver(driver_id: str, driver_update: DriverUpdate, admin: bool
     update_data = {k: v for k, v in driver_update.model_dump().items() if v is not None}
     if update_data:
         await db.drivers.update_one({"id": driver_id}, {"$set": update_data})
+        await invalidate("drivers")
+        # Fan the new summary out to the cars that embed it
+        if update_data.keys() & DriverSummary.model_fields.keys():
+            summary = driver_summary({**existing, **update_data})
+            await db.cars.update_many(
+                {"driver_id": driver_id},
+                {"$set": {"driver": summary, "driver_name": summary["name"]}}
+            )
+            await invalidate("cars")
     
     updated = await db.drivers.find_one({"id": driver_id}, {"_id": 0})
     if isinstance(updated.get('created_at'), str):
@@ -1018,21 +2916,25 @@ async def delete_driver(driver_id: str, admin: bool = Depends(verify_admin)):
     result = await db.drivers.delete_one({"id": driver_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Driver not found")
+    # Cars keep the driver's name as plain text once the profile is gone
+    await db.cars.update_many({"driver_id": driver_id}, {"$set": {"driver_id": None, "driver": None}})
+    await invalidate("drivers", "cars")
     return {"message": "Driver deleted successfully"}
 
 @api_router.post("/drivers/contact")
-async def contact_driver(contact_form: DriverContactForm):
+async def contact_driver(request: Request, contact_form: DriverContactForm):
     """Send an inquiry to a specific driver."""
+    await enforce_rate_limit("driver_contact", request, contact_form.sender_email)
     driver = await db.drivers.find_one({"id": contact_form.driver_id}, {"_id": 0})
     if not driver:
         raise HTTPException(status_code=404, detail="Driver not found")
     
     # Send email to driver
-    if resend.api_key:
+    if email_provider.enabled:
         try:
             from_email = os.environ.get('FROM_EMAIL', 'Triple Barrel Racing <noreply@triplebarrelracing.com>')
             
-            resend.Emails.send({
+            await queue_email("driver_contact", {
                 "from": from_email,
                 "to": [driver['email']],
                 "subject": f"New Question from {contact_form.sender_name}",
@@ -1048,25 +2950,67 @@ async def contact_driver(contact_form: DriverContactForm):
                 """
             })
         except Exception as e:
-            logger.error(f"Failed to send driver contact email: {str(e)}")
+            logger.error(f"Failed to queue driver contact email: {str(e)}")
     
     return {"message": "Message sent successfully"}
 
 # Car Routes
-@api_router.get("/cars", response_model=List[Car])
-async def get_cars():
-    cars = await db.cars.find({}, {"_id": 0}).to_list(1000)
+def driver_summary(driver: dict) -> dict:
+    return {field: driver[field] for field in DriverSummary.model_fields}
+
+async def link_driver(doc: dict):
+    """Embed the summary of doc['driver_id'] (or clear the link when it is empty)."""
+    if not doc.get("driver_id"):
+        doc.update(driver_id=None, driver=None)
+        return
+    driver = await db.drivers.find_one({"id": doc["driver_id"]}, projection_for(DriverSummary))
+    if not driver:
+        raise HTTPException(status_code=400, detail="Driver not found")
+    doc.update(driver=driver_summary(driver), driver_name=driver["name"])
+
+async def backfill_car_drivers():
+    """Link cars saved before driver_id existed to the driver profile named in driver_name.
+
+    Each car is looked at once: unmatched cars get an explicit driver_id of None, so a
+    car unlinked later (or whose driver was deleted) is never re-linked by name.
+    """
+    drivers = {driver["name"].strip().lower(): driver async for driver in db.drivers.find({}, projection_for(DriverSummary))}
+    cars = await db.cars.find({"driver_id": {"$exists": False}}, {"_id": 0, "id": 1, "driver_name": 1}).to_list(None)
+    linked = 0
     for car in cars:
-        if isinstance(car.get('created_at'), str):
-            car['created_at'] = datetime.fromisoformat(car['created_at'])
-    return cars
+        driver = drivers.get((car.get("driver_name") or "").strip().lower())
+        if driver:
+            await db.cars.update_one(
+                {"id": car["id"]},
+                {"$set": {"driver_id": driver["id"], "driver": driver_summary(driver), "driver_name": driver["name"]}}
+            )
+            linked += 1
+        else:
+            await db.cars.update_one({"id": car["id"]}, {"$set": {"driver_id": None, "driver": None}})
+    if linked:
+        await invalidate("cars")
+        logger.info(f"Linked {linked} cars to driver profiles")
+
+@api_router.get("/cars", response_model=List[Car])
+async def get_cars(request: Request):
+    async def build():
+        with phase("db"):
+            cars = await catalog_db.cars.find({}, {"_id": 0}).to_list(1000)
+        for car in cars:
+            if isinstance(car.get('created_at'), str):
+                car['created_at'] = datetime.fromisoformat(car['created_at'])
+        return encode_json(List[Car], cars)
+    return await cached_json_response(request, ("cars",), build)
 
 @api_router.post("/cars", response_model=Car)
 async def create_car(car: CarCreate, admin: bool = Depends(verify_admin)):
-    car_obj = Car(**car.model_dump())
+    car_data = car.model_dump()
+    await link_driver(car_data)
+    car_obj = Car(**car_data)
     doc = car_obj.model_dump()
     doc['created_at'] = doc['created_at'].isoformat()
     await db.cars.insert_one(doc)
+    await invalidate("cars")
     return car_obj
 
 @api_router.put("/cars/{car_id}", response_model=Car)
@@ -1076,8 +3020,18 @@ async def update_car(car_id: str, car_update: CarUpdate, admin: bool = Depends(v
         raise HTTPException(status_code=404, detail="Car not found")
     
     update_data = {k: v for k, v in car_update.model_dump().items() if v is not None}
+    if "driver_id" in update_data:
+        unlinking = not update_data["driver_id"]
+        await link_driver(update_data)
+        if unlinking and "driver_name" not in update_data:
+            update_data["driver_name"] = None
+    elif "driver_name" in update_data and existing.get("driver_id"):
+        # A different free-text name replaces the linked profile rather than contradicting it
+        if update_data["driver_name"] != (existing.get("driver") or {}).get("name"):
+            update_data.update(driver_id=None, driver=None)
     if update_data:
         await db.cars.update_one({"id": car_id}, {"$set": update_data})
+        await invalidate("cars")
     
     updated = await db.cars.find_one({"id": car_id}, {"_id": 0})
     if isinstance(updated.get('created_at'), str):
@@ -1089,33 +3043,100 @@ async def delete_car(car_id: str, admin: bool = Depends(verify_admin)):
     result = await db.cars.delete_one({"id": car_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Car not found")
+    await invalidate("cars")
     return {"message": "Car deleted successfully"}
 
+# Blog Post Rendering
+# The gfm-like preset plus task lists matches what remark-gfm rendered in the browser
+# (tables, strikethrough, bare URLs as links). Raw HTML in markdown is escaped rather
+# than passed through, and markdown-it's link validation drops javascript:/vbscript:/file:
+# URLs, so the output is safe to inject.
+blog_markdown = MarkdownIt("gfm-like", {"html": False}).use(tasklists_plugin)
+BLOG_RENDER_VERSION = 2  # Bump when rendering changes so stored posts are re-rendered on startup
+BLOG_EXCERPT_CHARS = 200
+BLOG_WORDS_PER_MINUTE = 200
+BLOG_SUMMARY_FIELDS = {field: 1 for field in BlogPostSummary.model_fields}
+
+def render_blog_derivatives(content: str, images: List[str]) -> dict:
+    """Render markdown once and derive the fields the list and detail views need."""
+    tokens = blog_markdown.parse(content)
+    text_parts = []
+    inline_images = []
+    for token in tokens:
+        if token.type != "inline":
+            continue
+        block_text = []
+        for child in token.children or []:
+            if child.type in ("text", "code_inline"):
+                block_text.append(child.content)
+            elif child.type in ("softbreak", "hardbreak"):
+                block_text.append(" ")
+            elif child.type == "image":
+                inline_images.append(child.attrGet("src"))
+        text_parts.append("".join(block_text))
+    plain_text = " ".join(part.strip() for part in text_parts if part.strip())
+    
+    excerpt = plain_text
+    if len(excerpt) > BLOG_EXCERPT_CHARS:
+        excerpt = excerpt[:BLOG_EXCERPT_CHARS].rsplit(" ", 1)[0].rstrip(",.;:") + "\u2026"
+    
+    cover_candidates = [url for url in list(images) + inline_images if url]
+    return {
+        "content_html": blog_markdown.renderer.render(tokens, blog_markdown.options, {}),
+        "excerpt": excerpt,
+        "reading_time_minutes": max(1, math.ceil(len(plain_text.split()) / BLOG_WORDS_PER_MINUTE)),
+        "cover_image": cover_candidates[0] if cover_candidates else None,
+        "render_version": BLOG_RENDER_VERSION
+    }
+
+async def backfill_blog_derivatives():
+    """Render posts stored before derivatives existed, or with an older renderer."""
+    stale = {"$or": [{"render_version": {"$exists": False}}, {"render_version": {"$lt": BLOG_RENDER_VERSION}}]}
+    count = 0
+    async for post in db.blog_posts.find(stale, {"_id": 0, "id": 1, "content": 1, "images": 1}):
+        derived = render_blog_derivatives(post.get("content", ""), post.get("images") or [])
+        await db.blog_posts.update_one({"id": post["id"]}, {"$set": derived})
+        count += 1
+    if count:
+        await invalidate("blog_posts")
+        logger.info(f"Rendered derivatives for {count} blog posts")
+
 # Blog Post Routes
-@api_router.get("/blog", response_model=List[BlogPost])
-async def get_blog_posts(category: Optional[str] = None):
-    query = {"category": category} if category else {}
-    posts = await db.blog_posts.find(query, {"_id": 0}).sort("created_at", -1).to_list(1000)
-    for post in posts:
-        if isinstance(post.get('created_at'), str):
-            post['created_at'] = datetime.fromisoformat(post['created_at'])
-    return posts
+@api_router.get("/blog", response_model=List[BlogPostSummary])
+async def get_blog_posts(request: Request, category: Optional[str] = None):
+    async def build():
+        query = {"category": category} if category else {}
+        with phase("db"):
+            posts = await catalog_db.blog_posts.find(query, {"_id": 0, **BLOG_SUMMARY_FIELDS}).sort("created_at", -1).to_list(1000)
+        for post in posts:
+            if isinstance(post.get('created_at'), str):
+                post['created_at'] = datetime.fromisoformat(post['created_at'])
+        return encode_json(List[BlogPostSummary], posts)
+    return await cached_json_response(request, ("blog_posts",), build, {"category": category})
 
 @api_router.get("/blog/{post_id}", response_model=BlogPost)
-async def get_blog_post(post_id: str):
-    post = await db.blog_posts.find_one({"id": post_id}, {"_id": 0})
-    if not post:
-        raise HTTPException(status_code=404, detail="Blog post not found")
-    if isinstance(post.get('created_at'), str):
-        post['created_at'] = datetime.fromisoformat(post['created_at'])
-    return BlogPost(**post)
+async def get_blog_post(request: Request, post_id: str):
+    async def build():
+        with phase("db"):
+            post = await catalog_db.blog_posts.find_one({"id": post_id}, {"_id": 0})
+        if not post:
+            raise HTTPException(status_code=404, detail="Blog post not found")
+        if isinstance(post.get('created_at'), str):
+            post['created_at'] = datetime.fromisoformat(post['created_at'])
+        return encode_json(BlogPost, post)
+    response = await cached_json_response(request, ("blog_posts",), build)
+    autocomplete_index.record_view(f"blog:{post_id}")
+    return response
 
 @api_router.post("/blog", response_model=BlogPost)
 async def create_blog_post(post: BlogPostCreate, admin: bool = Depends(verify_admin)):
-    post_obj = BlogPost(**post.model_dump())
+    post_obj = BlogPost(**post.model_dump(), **render_blog_derivatives(post.content, post.images))
     doc = post_obj.model_dump()
+    doc['render_version'] = BLOG_RENDER_VERSION
     doc['created_at'] = doc['created_at'].isoformat()
     await db.blog_posts.insert_one(doc)
+    await invalidate("blog_posts", ids=[doc["id"]])
+    index_document("blog_posts", doc)
     return post_obj
 
 @api_router.put("/blog/{post_id}", response_model=BlogPost)
@@ -1125,10 +3146,15 @@ async def update_blog_post(post_id: str, post_update: BlogPostUpdate, admin: boo
         raise HTTPException(status_code=404, detail="Blog post not found")
     
     update_data = {k: v for k, v in post_update.model_dump().items() if v is not None}
+    if 'content' in update_data or 'images' in update_data:
+        merged = {**existing, **update_data}
+        update_data.update(render_blog_derivatives(merged.get('content', ''), merged.get('images') or []))
     if update_data:
         await db.blog_posts.update_one({"id": post_id}, {"$set": update_data})
+        await invalidate("blog_posts", ids=[post_id])
     
     updated = await db.blog_posts.find_one({"id": post_id}, {"_id": 0})
+    index_document("blog_posts", updated)
     if isinstance(updated.get('created_at'), str):
         updated['created_at'] = datetime.fromisoformat(updated['created_at'])
     return BlogPost(**updated)
@@ -1138,16 +3164,21 @@ async def delete_blog_post(post_id: str, admin: bool = Depends(verify_admin)):
     result = await db.blog_posts.delete_one({"id": post_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Blog post not found")
+    await invalidate("blog_posts", ids=[post_id])
+    unindex_document("blog_posts", post_id)
     return {"message": "Blog post deleted successfully"}
 
 # Sponsor Routes
 @api_router.get("/sponsors", response_model=List[Sponsor])
-async def get_sponsors():
-    sponsors = await db.sponsors.find({}, {"_id": 0}).to_list(1000)
-    for sponsor in sponsors:
-        if isinstance(sponsor.get('created_at'), str):
-            sponsor['created_at'] = datetime.fromisoformat(sponsor['created_at'])
-    return sponsors
+async def get_sponsors(request: Request):
+    async def build():
+        with phase("db"):
+            sponsors = await catalog_db.sponsors.find({}, {"_id": 0}).to_list(1000)
+        for sponsor in sponsors:
+            if isinstance(sponsor.get('created_at'), str):
+                sponsor['created_at'] = datetime.fromisoformat(sponsor['created_at'])
+        return encode_json(List[Sponsor], sponsors)
+    return await cached_json_response(request, ("sponsors",), build)
 
 @api_router.post("/sponsors", response_model=Sponsor)
 async def create_sponsor(sponsor: SponsorCreate, admin: bool = Depends(verify_admin)):
@@ -1155,6 +3186,7 @@ async def create_sponsor(sponsor: SponsorCreate, admin: bool = Depends(verify_ad
     doc = sponsor_obj.model_dump()
     doc['created_at'] = doc['created_at'].isoformat()
     await db.sponsors.insert_one(doc)
+    await invalidate("sponsors")
     return sponsor_obj
 
 @api_router.put("/sponsors/{sponsor_id}", response_model=Sponsor)
@@ -1166,6 +3198,7 @@ async def update_sponsor(sponsor_id: str, sponsor_update: SponsorUpdate, admin:
     update_data = {k: v for k, v in sponsor_update.model_dump().items() if v is not None}
     if update_data:
         await db.sponsors.update_one({"id": sponsor_id}, {"$set": update_data})
+        await invalidate("sponsors")
     
     updated = await db.sponsors.find_one({"id": sponsor_id}, {"_id": 0})
     if isinstance(updated.get('created_at'), str):
@@ -1177,24 +3210,389 @@ async def delete_sponsor(sponsor_id: str, admin: bool = Depends(verify_admin)):
     result = await db.sponsors.delete_one({"id": sponsor_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Sponsor not found")
+    await invalidate("sponsors")
     return {"message": "Sponsor deleted successfully"}
 
+# Catalog Search
+# Searchable text fields per index kind, with a boost applied to term frequencies
+SEARCH_FIELDS = {
+    "merch": {"name": 3.0, "category": 2.0, "description": 1.0},
+    "part": {"name": 3.0, "car_model": 2.0, "category": 2.0, "description": 1.0},
+    "blog": {"title": 3.0, "category": 2.0, "content": 1.0},
+}
+SEARCH_COLLECTIONS = {"merch": "merch", "part": "parts", "blog": "blog_posts"}  # Kinds match the autocomplete types
+SEARCH_KIND_BY_COLLECTION = {collection: kind for kind, collection in SEARCH_COLLECTIONS.items()}
+SEARCH_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+SEARCH_SNIPPET_CHARS = 160
+
+def tokenize(text: str) -> List[str]:
+    return SEARCH_TOKEN_PATTERN.findall(text.lower())
+
+def highlight(text: str, terms: set, max_chars: Optional[int] = None) -> str:
+    """HTML-escape text and wrap query terms in <mark>, optionally trimmed to a window around the first match."""
+    matches = [m for m in SEARCH_TOKEN_PATTERN.finditer(text.lower()) if m.group() in terms]
+    start, end = 0, len(text)
+    if max_chars and len(text) > max_chars:
+        first = matches[0].start() if matches else 0
+        start = max(0, first - max_chars // 4)
+        end = min(len(text), start + max_chars)
+    parts = ["\u2026" if start > 0 else ""]
+    cursor = start
+    for match in matches:
+        if match.start() < start or match.end() > end:
+            continue
+        parts.append(html.escape(text[cursor:match.start()]))
+        parts.append(f"<mark>{html.escape(text[match.start():match.end()])}</mark>")
+        cursor = match.end()
+    parts.append(html.escape(text[cursor:end]))
+    if end < len(text):
+        parts.append("\u2026")
+    return "".join(parts)
+
+class SearchIndex:
+    """In-process inverted index over merch, parts and blog posts, ranked with BM25."""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: dict = {}  # term -> {doc_key: boosted term frequency}
+        self.doc_lengths: dict = {}  # doc_key -> boosted document length
+        self.documents: dict = {}  # doc_key -> stored fields used to render hits
+        self.total_length = 0.0
+
+    def upsert(self, kind: str, doc: dict):
+        key = (kind, doc["id"])
+        self.remove(kind, doc["id"])
+        frequencies = {}
+        length = 0.0
+        for field, boost in SEARCH_FIELDS[kind].items():
+            for term in tokenize(str(doc.get(field) or "")):
+                frequencies[term] = frequencies.get(term, 0.0) + boost
+                length += boost
+        for term, frequency in frequencies.items():
+            self.postings.setdefault(term, {})[key] = frequency
+        self.doc_lengths[key] = length
+        self.total_length += length
+        stored = {field: doc.get(field) for field in SEARCH_FIELDS[kind]}
+        stored["_terms"] = list(frequencies)
+        for extra in ("price", "image_url", "image_urls", "images"):
+            if extra in doc:
+                stored[extra] = doc[extra]
+        self.documents[key] = stored
+
+    def remove(self, kind: str, doc_id: str):
+        key = (kind, doc_id)
+        stored = self.documents.pop(key, None)
+        if stored is None:
+            return
+        for term in stored["_terms"]:
+            postings = self.postings.get(term)
+            if postings is not None:
+                postings.pop(key, None)
+                if not postings:
+                    del self.postings[term]
+        self.total_length -= self.doc_lengths.pop(key, 0.0)
+
+    def clear(self, kind: str):
+        for key in [key for key in self.documents if key[0] == kind]:
+            self.remove(*key)
+
+    def search(self, query: str, kinds: Optional[set] = None) -> List[tuple]:
+        """Return (score, doc_key) pairs sorted by descending BM25 score."""
+        doc_count = len(self.documents)
+        if not doc_count:
+            return []
+        average_length = self.total_length / doc_count or 1.0
+        scores = {}
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for key, frequency in postings.items():
+                if kinds and key[0] not in kinds:
+                    continue
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[key] / average_length)
+                scores[key] = scores.get(key, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+        return sorted(((score, key) for key, score in scores.items()), key=lambda hit: (-hit[0], hit[1]))
+
+search_index = SearchIndex()
+
+# Autocomplete
+AUTOCOMPLETE_SCAN_LIMIT = 500  # Prefix matches examined per keystroke before ranking
+FEATURED_SUGGESTION_BOOST = 5.0
+
+def normalize_phrase(text: str) -> str:
+    return " ".join(tokenize(text))
+
+class PrefixIndex:
+    """Typeahead suggestions kept in a sorted array of (key, suggestion_id) searched with bisect.
+
+    Every word-start suffix of a suggestion is a key, so "240" finds "Nissan 240SX".
+    Suggestions shared by several documents (car models) are reference counted.
+    """
+
+    def __init__(self):
+        self.keys: List[tuple] = []
+        self.suggestions: dict = {}  # suggestion_id -> {"text", "type", "id", "refs", "weight"}
+        self.sources: dict = {}  # (collection, doc_id) -> [(suggestion_id, weight)]
+        self.popularity: dict = {}  # suggestion_id -> view count
+
+    def _keys_for(self, text: str) -> List[str]:
+        words = normalize_phrase(text).split(" ")
+        return [" ".join(words[i:]) for i in range(len(words)) if words[i]]
+
+    def _add(self, suggestion_id: str, text: str, kind: str, doc_id: Optional[str], weight: float):
+        suggestion = self.suggestions.get(suggestion_id)
+        if suggestion is None:
+            suggestion = self.suggestions[suggestion_id] = {"text": text, "type": kind, "id": doc_id, "refs": 0, "weight": 0.0}
+            for key in self._keys_for(text):
+                bisect.insort(self.keys, (key, suggestion_id))
+        suggestion["refs"] += 1
+        suggestion["weight"] += weight
+
+    def _release(self, suggestion_id: str, weight: float):
+        suggestion = self.suggestions[suggestion_id]
+        suggestion["refs"] -= 1
+        suggestion["weight"] -= weight
+        if suggestion["refs"] > 0:
+            return
+        for key in self._keys_for(suggestion["text"]):
+            position = bisect.bisect_left(self.keys, (key, suggestion_id))
+            if position < len(self.keys) and self.keys[position] == (key, suggestion_id):
+                del self.keys[position]
+        del self.suggestions[suggestion_id]
+
+    def upsert(self, collection: str, doc: dict):
+        self.remove(collection, doc["id"])
+        contributed = []
+        if collection == "parts":
+            contributed.append((f"part:{doc['id']}", doc.get("name"), "part", doc["id"], 1.0))
+            if doc.get("car_model"):
+                contributed.append((f"car_model:{normalize_phrase(doc['car_model'])}", doc["car_model"], "car_model", None, 1.0))
+        elif collection == "merch":
+            weight = 1.0 + (FEATURED_SUGGESTION_BOOST if doc.get("featured") else 0.0)
+            contributed.append((f"merch:{doc['id']}", doc.get("name"), "merch", doc["id"], weight))
+        elif collection == "blog_posts":
+            contributed.append((f"blog:{doc['id']}", doc.get("title"), "blog", doc["id"], 1.0))
+        contributed = [entry for entry in contributed if entry[1]]
+        for suggestion_id, text, kind, doc_id, weight in contributed:
+            self._add(suggestion_id, text, kind, doc_id, weight)
+        self.sources[(collection, doc["id"])] = [(entry[0], entry[4]) for entry in contributed]
+
+    def remove(self, collection: str, doc_id: str):
+        for suggestion_id, weight in self.sources.pop((collection, doc_id), []):
+            self._release(suggestion_id, weight)
+
+    def clear(self, collection: str):
+        for source in [source for source in self.sources if source[0] == collection]:
+            self.remove(*source)
+
+    def record_view(self, suggestion_id: str):
+        # Only indexed suggestions are counted, so requests for made-up ids cannot grow the map
+        if suggestion_id in self.suggestions:
+            self.popularity[suggestion_id] = self.popularity.get(suggestion_id, 0) + 1
+
+    def complete(self, prefix: str, limit: int, kinds: Optional[set] = None) -> List[dict]:
+        prefix = normalize_phrase(prefix)
+        if not prefix:
+            return []
+        position = bisect.bisect_left(self.keys, (prefix,))
+        matched = set()
+        for key, suggestion_id in self.keys[position:position + AUTOCOMPLETE_SCAN_LIMIT]:
+            if not key.startswith(prefix):
+                break
+            matched.add(suggestion_id)
+        ranked = []
+        for suggestion_id in matched:
+            suggestion = self.suggestions[suggestion_id]
+            if kinds and suggestion["type"] not in kinds:
+                continue
+            # Views are damped so a handful of clicks can't bury an exact name match
+            score = suggestion["weight"] + math.log1p(self.popularity.get(suggestion_id, 0))
+            ranked.append((-score, suggestion["text"].lower(), suggestion_id))
+        ranked.sort()
+        return [
+            {**{k: self.suggestions[sid][k] for k in ("text", "type", "id")}, "score": round(-neg_score, 3)}
+            for neg_score, _, sid in ranked[:limit]
+        ]
+
+autocomplete_index = PrefixIndex()
+
+def index_document(collection: str, doc: dict):
+    """Reflect a created or updated document in the in-memory catalog indexes."""
+    kind = SEARCH_KIND_BY_COLLECTION.get(collection)
+    if kind:
+        search_index.upsert(kind, doc)
+        autocomplete_index.upsert(collection, doc)
+
+def unindex_document(collection: str, doc_id: str):
+    """Drop a deleted document from the in-memory catalog indexes."""
+    kind = SEARCH_KIND_BY_COLLECTION.get(collection)
+    if kind:
+        search_index.remove(kind, doc_id)
+        autocomplete_index.remove(collection, doc_id)
+
+async def reindex_documents(collection: str, ids: set):
+    """Bring the given documents' index entries in line with Mongo, dropping deleted ones."""
+    docs = await db[collection].find({"id": {"$in": list(ids)}}, {"_id": 0}).to_list(None)
+    for doc in docs:
+        index_document(collection, doc)
+    for doc_id in ids - {doc["id"] for doc in docs}:
+        unindex_document(collection, doc_id)
+
+async def build_catalog_indexes(collections=SEARCH_COLLECTIONS.values()):
+    """(Re)load documents from Mongo into the search and autocomplete indexes.
+
+    A collection is read in full before its entries are replaced, with no await
+    in between, so concurrent searches never see it half loaded.
+    """
+    for collection in collections:
+        docs = await db[collection].find({}, {"_id": 0}).to_list(None)
+        kind = SEARCH_KIND_BY_COLLECTION[collection]
+        search_index.clear(kind)
+        autocomplete_index.clear(collection)
+        for doc in docs:
+            index_document(collection, doc)
+    logger.info(
+        f"Catalog indexes built with {len(search_index.documents)} documents, "
+        f"{len(autocomplete_index.suggestions)} suggestions"
+    )
+
+class SearchHit(BaseModel):
+    type: str  # 'merch', 'part' or 'blog'
+    id: str
+    title: str
+    title_highlight: str
+    snippet: str
+    score: float
+    category: Optional[str] = None
+    price: Optional[float] = None
+    image_url: Optional[str] = None
+
+class SearchResults(BaseModel):
+    query: str
+    total: int
+    page: int
+    page_size: int
+    results: List[SearchHit]
+
+def build_search_hit(score: float, key: tuple, terms: set) -> SearchHit:
+    kind, doc_id = key
+    stored = search_index.documents[key]
+    title = stored.get("name") or stored.get("title") or ""
+    body = stored.get("description") or stored.get("content") or ""
+    images = stored.get("image_urls") or stored.get("images") or []
+    return SearchHit(
+        type=kind,
+        id=doc_id,
+        title=title,
+        title_highlight=highlight(title, terms),
+        snippet=highlight(body, terms, max_chars=SEARCH_SNIPPET_CHARS),
+        score=round(score, 4),
+        category=stored.get("category"),
+        price=stored.get("price"),
+        image_url=stored.get("image_url") or (images[0] if images else None)
+    )
+
+@api_router.get("/search", response_model=SearchResults)
+async def search_catalog(q: str, types: Optional[str] = None, page: int = 1, page_size: int = 20):
+    """Full-text search across merch, parts and blog posts."""
+    if page < 1 or not 1 <= page_size <= 100:
+        raise HTTPException(status_code=400, detail="page must be >= 1 and page_size between 1 and 100")
+    kinds = None
+    if types:
+        kinds = {kind.strip() for kind in types.split(",") if kind.strip()}
+        unknown = kinds - set(SEARCH_FIELDS)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown search types: {', '.join(sorted(unknown))}")
+    
+    hits = search_index.search(q, kinds)
+    terms = set(tokenize(q))
+    start = (page - 1) * page_size
+    return SearchResults(
+        query=q,
+        total=len(hits),
+        page=page,
+        page_size=page_size,
+        results=[build_search_hit(score, key, terms) for score, key in hits[start:start + page_size]]
+    )
+
+class AutocompleteSuggestion(BaseModel):
+    text: str
+    type: str  # 'merch', 'part', 'car_model' or 'blog'
+    id: Optional[str] = None  # Document id; car models have none
+    score: float
+
+class AutocompleteResponse(BaseModel):
+    query: str
+    suggestions: List[AutocompleteSuggestion]
+
+@api_router.get("/autocomplete", response_model=AutocompleteResponse)
+async def autocomplete(q: str, limit: int = 8, types: Optional[str] = None):
+    """Typeahead suggestions for part names, car models, merch names and blog titles."""
+    if not 1 <= limit <= 25:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 25")
+    kinds = {kind.strip() for kind in types.split(",") if kind.strip()} if types else None
+    return AutocompleteResponse(query=q, suggestions=autocomplete_index.complete(q, limit, kinds))
+
+# Page Bootstrap Routes
+# One pre-encoded document per page, built from concurrent projected reads and
+# cached under the same collection versions as the individual resources.
+HOME_FEATURED_LIMIT = 3
+
+def projection_for(model) -> dict:
+    return {"_id": 0, **{field: 1 for field in model.model_fields}}
+
+@api_router.get("/pages/home", response_model=HomePageData)
+async def get_home_page(request: Request):
+    async def build():
+        with phase("db"):
+            featured, sales_settings = await asyncio.gather(
+                catalog_db.merch.find(
+                    {"featured": True},
+                    {**projection_for(FeaturedMerch), "sale_percent": 1, "image_urls": {"$slice": 1}}
+                ).sort("created_at", -1).to_list(HOME_FEATURED_LIMIT),
+                catalog_db.sales_settings.find_one({"id": "sales_settings"}, {"_id": 0})
+            )
+        with phase("pricing"):
+            for item in featured:
+                apply_sale_pricing(item, sales_settings)
+        return encode_json(HomePageData, {"featured_merch": featured})
+    return await cached_json_response(request, ("merch", "sales_settings"), build)
+
+@api_router.get("/pages/about", response_model=AboutPageData)
+async def get_about_page(request: Request):
+    async def build():
+        with phase("db"):
+            drivers, cars, sponsors = await asyncio.gather(
+                catalog_db.drivers.find({}, projection_for(DriverProfile)).to_list(1000),
+                catalog_db.cars.find({}, projection_for(CarProfile)).to_list(1000),
+                catalog_db.sponsors.find({}, projection_for(SponsorProfile)).to_list(1000)
+            )
+        return encode_json(AboutPageData, {"drivers": drivers, "cars": cars, "sponsors": sponsors})
+    return await cached_json_response(request, ("drivers", "cars", "sponsors"), build)
+
 # Sales Settings Routes
 @api_router.get("/sales-settings", response_model=SaleSettings)
-async def get_sales_settings():
+async def get_sales_settings(request: Request):
     """Get current sales settings."""
-    settings = await db.sales_settings.find_one({"id": "sales_settings"}, {"_id": 0})
-    if not settings:
-        # Create default settings if not exists
-        default_settings = SaleSettings()
-        doc = default_settings.model_dump()
-        doc['updated_at'] = doc['updated_at'].isoformat()
-        await db.sales_settings.insert_one(doc)
-        return default_settings
-    
-    if isinstance(settings.get('updated_at'), str):
-        settings['updated_at'] = datetime.fromisoformat(settings['updated_at'])
-    return SaleSettings(**settings)
+    async def build():
+        with phase("db"):
+            settings = await db.sales_settings.find_one({"id": "sales_settings"}, {"_id": 0})
+        if not settings:
+            # Create default settings if not exists
+            default_settings = SaleSettings()
+            doc = default_settings.model_dump()
+            doc['updated_at'] = doc['updated_at'].isoformat()
+            await db.sales_settings.insert_one(doc)
+            await invalidate("sales_settings")
+            return encode_json(SaleSettings, default_settings)
+        
+        if isinstance(settings.get('updated_at'), str):
+            settings['updated_at'] = datetime.fromisoformat(settings['updated_at'])
+        return encode_json(SaleSettings, settings)
+    return await cached_json_response(request, ("sales_settings",), build)
 
 @api_router.put("/sales-settings", response_model=SaleSettings)
 async def update_sales_settings(settings_update: SaleSettingsUpdate, admin: bool = Depends(verify_admin)):
@@ -1206,32 +3604,422 @@ async def update_sales_settings(settings_update: SaleSettingsUpdate, admin: bool
         doc = default_settings.model_dump()
         doc['updated_at'] = datetime.now(timezone.utc).isoformat()
         await db.sales_settings.insert_one(doc)
+        await invalidate("sales_settings")
         existing = doc
     
     update_data = {k: v for k, v in settings_update.model_dump().items() if v is not None}
     if update_data:
         update_data['updated_at'] = datetime.now(timezone.utc).isoformat()
         await db.sales_settings.update_one({"id": "sales_settings"}, {"$set": update_data})
+        await invalidate("sales_settings")
     
     updated = await db.sales_settings.find_one({"id": "sales_settings"}, {"_id": 0})
     if isinstance(updated.get('updated_at'), str):
         updated['updated_at'] = datetime.fromisoformat(updated['updated_at'])
     return SaleSettings(**updated)
 
+# Cursor Pagination
+# Keyset pagination over (created_at, id), both in the same direction so one
+# index serves newest-first and oldest-first; the cursor is the last row's sort key.
+def cursor_sort(direction: int = -1):
+    return [("created_at", direction), ("id", direction)]
+
+def encode_cursor(doc: dict) -> str:
+    created_at = doc.get("created_at")
+    if isinstance(created_at, datetime):
+        created_at = created_at.isoformat()
+    return base64.urlsafe_b64encode(json.dumps([created_at, doc["id"]]).encode()).decode()
+
+def decode_cursor(cursor: str, direction: int = -1) -> dict:
+    """Turn a cursor into the filter selecting rows after it."""
+    try:
+        created_at, last_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    after = "$lt" if direction < 0 else "$gt"
+    return {"$or": [
+        {"created_at": {after: created_at}},
+        {"created_at": created_at, "id": {after: last_id}}
+    ]}
+
+async def fetch_cursor_page(collection, query: dict, cursor: Optional[str], limit: int, projection: Optional[dict] = None, direction: int = -1):
+    """Return (items, next_cursor) for one keyset page."""
+    if cursor:
+        query = {"$and": [query, decode_cursor(cursor, direction)]} if query else decode_cursor(cursor, direction)
+    items = await collection.find(query, projection or {"_id": 0}).sort(cursor_sort(direction)).limit(limit + 1).to_list(limit + 1)
+    next_cursor = encode_cursor(items[limit - 1]) if len(items) > limit else None
+    return items[:limit], next_cursor
+
+# Admin Dashboard Routes
+# Sections map to collections; each pages lazily through /admin/dashboard/{section}
+ADMIN_SECTIONS = {
+    "merch": "merch",
+    "events": "events",
+    "parts": "parts",
+    "drivers": "drivers",
+    "cars": "cars",
+    "blog": "blog_posts",
+    "sponsors": "sponsors",
+    "inquiries": "inquiries",
+    "orders": "orders",
+}
+ADMIN_SECTION_LABELS = {"blog": "title", "inquiries": "name", "orders": "customer_name"}
+DASHBOARD_RECENT_LIMIT = 5
+LOW_STOCK_THRESHOLD = int(os.environ.get('LOW_STOCK_THRESHOLD', '3'))
+
+async def load_recent(section: str) -> List[dict]:
+    label_field = ADMIN_SECTION_LABELS.get(section, "name")
+    docs = await db[ADMIN_SECTIONS[section]].find(
+        {}, {"_id": 0, "id": 1, "created_at": 1, label_field: 1}
+    ).sort(cursor_sort()).limit(DASHBOARD_RECENT_LIMIT).to_list(DASHBOARD_RECENT_LIMIT)
+    return [{"id": doc["id"], "label": doc.get(label_field) or "", "created_at": doc.get("created_at")} for doc in docs]
+
+async def load_low_stock() -> List[dict]:
+    merch_pipeline = [
+        {"$addFields": {"size_stock": {"$objectToArray": {"$ifNull": ["$sizes", {}]}}}},
+        {"$match": {"$or": [
+            {"size_stock.v": {"$lte": LOW_STOCK_THRESHOLD}},
+            {"size_stock": {"$size": 0}, "stock": {"$lte": LOW_STOCK_THRESHOLD}}
+        ]}},
+        {"$project": {"_id": 0, "id": 1, "name": 1, "stock": 1, "size_stock": 1}}
+    ]
+    merch, parts = await asyncio.gather(
+        db.merch.aggregate(merch_pipeline).to_list(1000),
+        db.parts.find({"stock": {"$lte": LOW_STOCK_THRESHOLD}}, {"_id": 0, "id": 1, "name": 1, "stock": 1}).to_list(1000)
+    )
+    low_stock = []
+    for item in merch:
+        low_sizes = {entry["k"]: entry["v"] for entry in item["size_stock"] if entry["v"] <= LOW_STOCK_THRESHOLD}
+        low_stock.append({
+            "type": "merch",
+            "id": item["id"],
+            "name": item["name"],
+            "stock": sum(entry["v"] for entry in item["size_stock"]) if item["size_stock"] else item.get("stock", 0),
+            "low_sizes": low_sizes or None
+        })
+    low_stock.extend({"type": "parts", **part} for part in parts)
+    return sorted(low_stock, key=lambda entry: entry["stock"])
+
+async def count_by(collection, field: str, query: Optional[dict] = None) -> Dict[str, int]:
+    pipeline = ([{"$match": query}] if query else []) + [{"$group": {"_id": f"${field}", "count": {"$sum": 1}}}]
+    return {str(row["_id"]): row["count"] async for row in collection.aggregate(pipeline)}
+
+@api_router.get("/admin/dashboard", response_model=AdminDashboard)
+async def get_admin_dashboard(admin: bool = Depends(verify_admin)):
+    """Counts, recent items, inquiry totals and low stock, computed concurrently."""
+    sections = list(ADMIN_SECTIONS)
+    results = await asyncio.gather(
+        *(db[ADMIN_SECTIONS[section]].count_documents({}) for section in sections),
+        *(load_recent(section) for section in sections),
+        count_by(db.inquiries, "status"),
+        count_by(db.inquiries, "inquiry_type", {"status": "pending"}),
+        load_low_stock(),
+        db.sales_settings.find_one({"id": "sales_settings"}, {"_id": 0})
+    )
+    counts = results[:len(sections)]
+    recent = results[len(sections):2 * len(sections)]
+    by_status, pending_by_type, low_stock, sales_settings = results[2 * len(sections):]
+    
+    return AdminDashboard(
+        counts=dict(zip(sections, counts)),
+        recent={section: [RecentItem(**item) for item in items] for section, items in zip(sections, recent)},
+        pending_inquiries=by_status.get("pending", 0),
+        inquiries_by_status=by_status,
+        pending_inquiries_by_type=pending_by_type,
+        low_stock=[LowStockItem(**item) for item in low_stock],
+        sales_settings=SaleSettings(**sales_settings) if sales_settings else SaleSettings()
+    )
+
+@api_router.get("/admin/dashboard/{section}", response_model=AdminSectionPage)
+async def get_admin_dashboard_section(section: str, cursor: Optional[str] = None, limit: int = 50, admin: bool = Depends(verify_admin)):
+    """One page of a dashboard section, newest first."""
+    if section not in ADMIN_SECTIONS:
+        raise HTTPException(status_code=404, detail="Unknown dashboard section")
+    if not 1 <= limit <= 200:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 200")
+    items, next_cursor = await fetch_cursor_page(db[ADMIN_SECTIONS[section]], {}, cursor, limit)
+    return AdminSectionPage(section=section, items=items, next_cursor=next_cursor)
+
+def metrics_allowed(request: Request) -> bool:
+    """With METRICS_TOKEN set, require it as a bearer token; otherwise allow only loopback and private clients."""
+    if METRICS_TOKEN:
+        return hmac.compare_digest(request.headers.get("authorization", ""), f"Bearer {METRICS_TOKEN}")
+    try:
+        address = ipaddress.ip_address(request.client.host if request.client else "")
+    except ValueError:
+        return False
+    return address.is_loopback or address.is_private
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    """Prometheus scrape endpoint (outside /api; keep it off the public ingress)."""
+    if not metrics_allowed(request):
+        raise HTTPException(status_code=404, detail="Not Found")
+    registry = REGISTRY
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+
+# Slow Query Recording
+SLOW_QUERY_LOG_BYTES = int(os.environ.get('SLOW_QUERY_LOG_MB', '16')) * 1024 * 1024
+# Session and routing fields the driver adds; an explain must not replay them
+COMMAND_ENVELOPE_FIELDS = {"lsid", "$db", "$clusterTime", "$readPreference", "txnNumber", "readConcern", "writeConcern", "cursor"}
+
+def value_shape(value):
+    """Replace literal values with 1, keeping field names and operators."""
+    if isinstance(value, dict):
+        return {key: value_shape(item) for key, item in value.items()}
+    if isinstance(value, list):
+        shapes = [value_shape(item) for item in value]
+        # $in-style lists of literals collapse to one entry; lists of clauses keep their structure
+        return shapes if any(isinstance(item, (dict, list)) for item in value) else [1]
+    return 1
+
+def query_shape(command_name: str, command: dict) -> dict:
+    if command_name == "find":
+        return {"filter": value_shape(command.get("filter", {})), "sort": command.get("sort")}
+    if command_name == "aggregate":
+        return {"pipeline": [
+            {stage: value_shape(body) if stage in ("$match", "$sort") else 1}
+            for step in command.get("pipeline", []) for stage, body in step.items()
+        ]}
+    if command_name == "update":
+        return {"filter": value_shape(command["updates"][0].get("q", {}))} if command.get("updates") else {}
+    if command_name == "delete":
+        return {"filter": value_shape(command["deletes"][0].get("q", {}))} if command.get("deletes") else {}
+    return {"filter": value_shape(command.get("query", {})), "sort": command.get("sort")}
+
+def plan_stages(plan: dict):
+    """Yield every stage of an explain plan tree."""
+    yield plan
+    for child in plan.get("inputStages", []) + [plan[key] for key in ("inputStage", "queryPlan") if key in plan]:
+        yield from plan_stages(child)
+
+async def explain_plan(command: dict) -> dict:
+    explained = {key: value for key, value in command.items() if key not in COMMAND_ENVELOPE_FIELDS}
+    if "pipeline" in explained:
+        explained["cursor"] = {}
+    result = await db.command("explain", explained, verbosity="queryPlanner")
+    planner = result.get("queryPlanner") or next(
+        (stage["$cursor"]["queryPlanner"] for stage in result.get("stages", []) if "$cursor" in stage), {}
+    )
+    winning = planner.get("winningPlan", {})
+    stages = list(plan_stages(winning))
+    return {
+        "collscan": any(stage.get("stage") == "COLLSCAN" for stage in stages),
+        "indexes": sorted({stage["indexName"] for stage in stages if "indexName" in stage}),
+        "stages": [stage["stage"] for stage in stages if "stage" in stage],
+    }
+
+async def ensure_slow_query_log():
+    if "slow_queries" not in await db.list_collection_names(filter={"name": "slow_queries"}):
+        await db.create_collection("slow_queries", capped=True, size=SLOW_QUERY_LOG_BYTES)
+    await db.slow_query_shapes.create_index([("collscan", -1), ("total_ms", -1)])
+
+async def record_slow_queries(queue: asyncio.Queue):
+    """Write slow commands to the capped log, explaining each shape the first time it is seen."""
+    explained_shapes = set()
+    while True:
+        command_name, command, duration_ms, at = await queue.get()
+        try:
+            collection = command[command_name]
+            shape = query_shape(command_name, command)
+            shape_id = f"{collection}.{command_name}:{json.dumps(shape, sort_keys=True, default=str)}"
+            plan = None
+            if shape_id not in explained_shapes:
+                explained_shapes.add(shape_id)
+                if not await db.slow_query_shapes.find_one({"id": shape_id, "plan": {"$ne": None}}, {"_id": 1}):
+                    try:
+                        plan = await explain_plan(command)
+                    except Exception as e:
+                        logger.warning(f"Could not explain slow {collection}.{command_name}: {str(e)}")
+            await db.slow_queries.insert_one({
+                "shape_id": shape_id,
+                "collection": collection,
+                "command": command_name,
+                "shape": shape,
+                "duration_ms": round(duration_ms, 2),
+                "at": at.isoformat()
+            })
+            shape_update = {
+                "$set": {"collection": collection, "command": command_name, "shape": shape, "last_seen": at.isoformat()},
+                "$inc": {"count": 1, "total_ms": duration_ms},
+                "$max": {"max_ms": duration_ms}
+            }
+            if plan is not None:
+                shape_update["$set"].update(plan=plan, collscan=plan["collscan"])
+            await db.slow_query_shapes.update_one({"id": shape_id}, shape_update, upsert=True)
+            if plan and plan["collscan"]:
+                logger.warning(f"Slow query shape scans {collection}: {command_name} {shape}")
+        except Exception as e:
+            logger.error(f"Failed to record slow query: {str(e)}")
+
+class SlowQueryEntry(BaseModel):
+    collection: str
+    command: str
+    shape: dict
+    duration_ms: float
+    at: datetime
+
+class SlowQueryShape(BaseModel):
+    id: str
+    collection: str
+    command: str
+    shape: dict
+    count: int
+    total_ms: float
+    max_ms: float
+    last_seen: datetime
+    collscan: Optional[bool] = None  # None until an explain has run
+    plan: Optional[dict] = None
+
+class SlowQueryReport(BaseModel):
+    threshold_ms: float
+    shapes: List[SlowQueryShape]
+    recent: List[SlowQueryEntry]
+
+@api_router.get("/admin/slow-queries", response_model=SlowQueryReport)
+async def get_slow_queries(limit: int = 50, admin: bool = Depends(verify_admin)):
+    """Query shapes over the slow threshold (collection scans first, then by total time) and the latest slow commands."""
+    if not 1 <= limit <= 500:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 500")
+    shapes, recent = await asyncio.gather(
+        db.slow_query_shapes.find({}, {"_id": 0}).sort([("collscan", -1), ("total_ms", -1)]).to_list(limit),
+        db.slow_queries.find({}, {"_id": 0}).sort("$natural", -1).to_list(limit)
+    )
+    return SlowQueryReport(threshold_ms=SLOW_QUERY_THRESHOLD_MS, shapes=shapes, recent=recent)
+
+# Profiling Routes
+class ProfileSummary(BaseModel):
+    id: str
+    method: str
+    path: str
+    route: Optional[str] = None
+    status: Optional[int] = None
+    duration_ms: float
+    created_at: datetime
+
+class ProfileList(BaseModel):
+    enabled: bool
+    slowest: List[ProfileSummary]
+    recent: List[ProfileSummary]
+
+PROFILE_RENDERERS = {
+    "html": (lambda: HTMLRenderer(), "text/html"),
+    "text": (lambda: ConsoleRenderer(unicode=True), "text/plain"),
+    "speedscope": (lambda: SpeedscopeRenderer(), "application/json"),  # Flame graph for speedscope.app
+}
+
+@api_router.get("/admin/profiles", response_model=ProfileList)
+async def list_profiles(admin: bool = Depends(verify_admin)):
+    """Slowest and most recent profiled requests."""
+    return ProfileList(
+        enabled=pyinstrument is not None,
+        slowest=[record.summary() for record in profile_store.slowest],
+        recent=[record.summary() for record in reversed(profile_store.recent)]
+    )
+
+@api_router.get("/admin/profiles/{profile_id}")
+async def get_profile(profile_id: str, format: str = "html", admin: bool = Depends(verify_admin)):
+    """Render one profile as an HTML call tree, plain text, or a speedscope flame graph."""
+    if format not in PROFILE_RENDERERS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(PROFILE_RENDERERS)}")
+    record = profile_store.get(profile_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    renderer, media_type = PROFILE_RENDERERS[format]
+    return Response(renderer().render(record.session), media_type=media_type)
+
+# Startup Diagnostics
+LAZY_MODULES = ("resend", "square")  # Loaded by the email/payment providers on first use
+
+class ImportCost(BaseModel):
+    module: str
+    ms: float
+
+class StartupDiagnostics(BaseModel):
+    server_import_ms: float
+    imports: List[ImportCost]  # Slowest first; lazy SDKs appear once they have been used
+    lazy_modules: Dict[str, bool]  # Module -> loaded yet
+
+def startup_diagnostics() -> StartupDiagnostics:
+    return StartupDiagnostics(
+        server_import_ms=round(server_import_seconds * 1000, 1),
+        imports=[
+            ImportCost(module=module, ms=round(seconds * 1000, 1))
+            for module, seconds in sorted(import_costs.items(), key=lambda item: -item[1])
+        ],
+        lazy_modules={module: module in sys.modules for module in LAZY_MODULES}
+    )
+
+@api_router.get("/admin/diagnostics/startup", response_model=StartupDiagnostics)
+async def get_startup_diagnostics(admin: bool = Depends(verify_admin)):
+    """Import cost of server.py and its heavy dependencies."""
+    return startup_diagnostics()
+
+# Health Routes
+# Liveness only says the process is serving; readiness stays false until warm_up()
+# has pinged Mongo, ensured indexes and primed the hot caches, and while Mongo is unreachable.
+HEALTH_PING_TIMEOUT_SECONDS = float(os.environ.get('HEALTH_PING_TIMEOUT_SECONDS', '2'))
+
+class WarmUpState:
+    def __init__(self):
+        self.ready = False
+        self.phase: Optional[str] = None
+        self.phase_ms: Dict[str, float] = {}
+        self.error: Optional[str] = None
+
+warm_up_state = WarmUpState()
+
+class HealthStatus(BaseModel):
+    status: str  # 'ok', 'warming', 'unavailable' or 'shutting_down'
+    phase: Optional[str] = None  # Warm-up step in progress
+    warm_up_ms: Dict[str, float] = {}
+    error: Optional[str] = None
+
+@api_router.get("/health/live", response_model=HealthStatus)
+async def liveness():
+    return HealthStatus(status="ok")
+
+@api_router.get("/health/ready", response_model=HealthStatus)
+async def readiness(response: Response):
+    health = HealthStatus(status="ok", phase=warm_up_state.phase, warm_up_ms=warm_up_state.phase_ms, error=warm_up_state.error)
+    if not warm_up_state.ready:
+        health.status = "shutting_down" if warm_up_state.phase == "shutdown" else "warming"
+    else:
+        try:
+            await asyncio.wait_for(db.command("ping"), HEALTH_PING_TIMEOUT_SECONDS)
+        except Exception as e:
+            health.status, health.error = "unavailable", str(e) or type(e).__name__
+    if health.status != "ok":
+        response.status_code = 503
+    return health
+
 # Include the router in the main app
 app.include_router(api_router)
 
 # Mount uploads directory for static file serving
 app.mount("/uploads", StaticFiles(directory=str(UPLOAD_DIR)), name="uploads")
 
+app.add_middleware(CompressionMiddleware, minimum_size=COMPRESSION_MIN_SIZE)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Request-ID", "X-Profile-Id", "Retry-After"],
 )
 
+app.add_middleware(ProfilingMiddleware)
+
+app.add_middleware(RequestContextMiddleware)
+
+# Outermost, so latency and size cover CORS and compression too
+app.add_middleware(MetricsMiddleware)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -1239,6 +4027,134 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+background_loops: List[asyncio.Task] = []
+
+async def ensure_indexes():
+    """Create the indexes the query paths rely on. Safe to run on every startup."""
+    # Every handler looks documents up by their UUID id
+    for collection in ("merch", "events", "parts", "inquiries", "orders", "drivers", "cars", "blog_posts", "sponsors"):
+        try:
+            await db[collection].create_index([("id", 1)], unique=True)
+        except OperationFailure as e:
+            # Legacy documents with a repeated or missing id (a missing field indexes as null) can't
+            # take a unique index; index the lookups anyway rather than keep the worker from ever being ready
+            logger.error(f"Unique id index on {collection} failed, using a non-unique one; fix duplicate or missing ids: {str(e)}")
+            await db[collection].create_index([("id", 1)])
+    await db.parts.create_index([("category", 1), ("created_at", -1)])
+    await db.parts.create_index([("car_model", 1), ("created_at", -1)])
+    await db.parts.create_index([("condition", 1), ("created_at", -1)])
+    await db.parts.create_index([("year", 1), ("created_at", -1)])
+    await db.parts.create_index([("price", 1)])
+    await db.parts.create_index([("stock", 1)])
+    await db.parts.create_index([("created_at", -1)])
+    await db.parts.create_index([("fitment.model", 1), ("fitment.year_start", 1), ("fitment.year_end", 1)])
+    await db.blog_posts.create_index([("category", 1), ("created_at", -1)])
+    await db.blog_posts.create_index([("created_at", -1)])
+    await db.merch.create_index([("featured", 1), ("created_at", -1)])
+    for collection in ADMIN_SECTIONS.values():
+        await db[collection].create_index(cursor_sort())
+    await db.merch.create_index([("stock", 1)])
+    # Inbox filters: equality fields first, then the (created_at, id) sort keys
+    await db.inquiries.create_index([("status", 1), ("inquiry_type", 1), ("created_at", -1), ("id", -1)])
+    await db.inquiries.create_index([("inquiry_type", 1), ("created_at", -1), ("id", -1)])
+    await db.inquiries.create_index([("name", "text"), ("email", "text"), ("message", "text")])
+    await db.cars.create_index([("driver_id", 1)])
+    await db.sales_daily.create_index([("date", 1)], unique=True)
+    await db.sales_daily_products.create_index([("date", 1), ("product_id", 1), ("size", 1)], unique=True)
+    await db.pending_jobs.create_index([("available_at", 1)])
+    await db.orders.create_index([("rollup_state", 1)])
+    if RATE_LIMIT_STORE == "mongo":
+        await db.rate_limits.create_index([("expires_at", 1)], expireAfterSeconds=0)
+
+@app.on_event("startup")
+async def log_startup_report():
+    report = startup_diagnostics()
+    costs = ", ".join(f"{cost.module} {cost.ms:.0f}ms" for cost in report.imports)
+    logger.info(f"server.py imported in {report.server_import_ms:.0f}ms ({costs})")
+
+async def load_catalog_indexes():
+    await backfill_blog_derivatives()
+    await backfill_part_fitment()
+    await backfill_car_drivers()
+    await build_catalog_indexes()
+
+def internal_request(path: str) -> Request:
+    return Request({"type": "http", "method": "GET", "path": path, "query_string": b"", "headers": []})
+
+async def warm_response_cache():
+    """Build the responses nearly every visitor needs, so a new worker's first requests are cache hits."""
+    await get_sales_settings(internal_request("/api/sales-settings"))
+    await get_merch(internal_request("/api/merch"))
+    await get_home_page(internal_request("/api/pages/home"))
+    await get_events(internal_request("/api/events"))
+    await get_sponsors(internal_request("/api/sponsors"))
+
+async def start_cache_sync():
+    if CACHE_INVALIDATION != "off":
+        shared_versions.update({name: doc["version"] for name, doc in (await load_shared_versions()).items()})
+        background_loops.append(asyncio.create_task(watch_cache_versions()))
+
+async def start_slow_query_log():
+    if SLOW_QUERY_THRESHOLD_MS > 0:
+        await ensure_slow_query_log()
+        slow_queries: asyncio.Queue = asyncio.Queue(maxsize=1000)
+        slow_query_listener.attach(asyncio.get_running_loop(), slow_queries)
+        background_loops.append(asyncio.create_task(record_slow_queries(slow_queries)))
+
+# Everything that needs Mongo runs here rather than in a startup hook, so an
+# unreachable database delays readiness instead of keeping the worker from starting
+WARM_UP_STEPS = (
+    ("ping", lambda: db.command("ping")),
+    ("indexes", ensure_indexes),
+    ("cache_sync", start_cache_sync),
+    ("slow_query_log", start_slow_query_log),
+    ("catalog", load_catalog_indexes),
+    ("cache", warm_response_cache),
+)
+WARM_UP_RETRY_SECONDS = float(os.environ.get('WARM_UP_RETRY_SECONDS', '5'))
+
+async def warm_up():
+    """Run the warm-up steps in order, retrying a failed step until they have all succeeded.
+
+    Finished steps are never re-run, so steps that start a loop start it once.
+    """
+    while not warm_up_state.ready:
+        try:
+            for name, step in WARM_UP_STEPS:
+                if name in warm_up_state.phase_ms:
+                    continue
+                warm_up_state.phase = name
+                start = time.perf_counter()
+                await step()
+                warm_up_state.phase_ms[name] = round((time.perf_counter() - start) * 1000, 1)
+            warm_up_state.phase, warm_up_state.error, warm_up_state.ready = None, None, True
+            logger.info(f"Warm-up finished, ready to serve ({warm_up_state.phase_ms})")
+        except Exception as e:
+            warm_up_state.error = f"{warm_up_state.phase}: {str(e)}"
+            logger.error(f"Warm-up failed at {warm_up_state.phase}, retrying in {WARM_UP_RETRY_SECONDS}s: {str(e)}")
+            await asyncio.sleep(WARM_UP_RETRY_SECONDS)
+
+@app.on_event("startup")
+async def start_warm_up():
+    background_loops.append(asyncio.create_task(warm_up()))
+
+@app.on_event("startup")
+async def start_background_loops():
+    # These loops catch their own Mongo errors, so they can start before warm-up finishes
+    background_loops.append(asyncio.create_task(pending_jobs_loop()))
+    if UPLOAD_GC_INTERVAL_HOURS > 0:
+        background_loops.append(asyncio.create_task(upload_gc_loop()))
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    warm_up_state.ready, warm_up_state.phase = False, "shutdown"
+    # Jobs may still need the database, so drain them before closing it
+    await background_jobs.drain(JOB_DRAIN_TIMEOUT_SECONDS)
+    for task in background_loops:
+        task.cancel()
     client.close()
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        # Drop this worker's live gauge files so /metrics stops summing them
+        multiprocess.mark_process_dead(os.getpid())
+
+server_import_seconds = time.perf_counter() - SERVER_IMPORT_STARTED
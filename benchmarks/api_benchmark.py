@@ -0,0 +1,452 @@
+#!/usr/bin/env python3
+"""
+In-process API benchmark for the Triple Barrel Racing backend.
+
+Drives the FastAPI app through httpx's ASGI transport (no network, no uvicorn)
+against a disposable database seeded with a realistic catalog, and reports
+p50/p95/p99 latency and throughput per endpoint. Results can be saved as a
+baseline and later runs compared against it to catch regressions before deploy.
+
+Database backends:
+  mongod  - start a throwaway local mongod (needs the binary on PATH)
+  url     - use an existing server from --mongo-url / MONGO_URL, in a scratch database
+  memory  - in-memory Motor stand-in (pip install mongomock-motor); no indexes or
+            query planner, so only compare memory baselines with memory runs
+  auto    - mongod if available, otherwise memory
+
+Examples:
+  python benchmarks/api_benchmark.py --save-baseline main
+  python benchmarks/api_benchmark.py --compare main --threshold 0.2
+  python benchmarks/api_benchmark.py --only merch_list,parts_filtered --cold
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+BACKEND_DIR = ROOT_DIR / "backend"
+BASELINE_DIR = Path(__file__).resolve().parent / "baselines"
+ADMIN_HEADERS = {"Authorization": "Bearer admin:admin123"}
+
+# Catalog sizes roughly matching production, scaled with --scale
+CATALOG_SIZES = {
+    "merch": 150,
+    "parts": 3000,
+    "events": 40,
+    "drivers": 12,
+    "cars": 20,
+    "blog_posts": 120,
+    "sponsors": 15,
+    "inquiries": 5000,
+}
+
+MERCH_CATEGORIES = ["T-Shirts", "Sweaters", "Hats", "Stickers", "Accessories"]
+PART_CATEGORIES = ["Engine", "Suspension", "Drivetrain", "Exterior", "Interior", "Brakes", "Other"]
+PART_CONDITIONS = ["new", "used-excellent", "used-good", "used-fair"]
+PART_MODELS = [
+    ("Nissan 240SX", "1989-1998"), ("Nissan 240SX S13", "1989-1994"), ("S14 / S15", "1995-2002"),
+    ("Nissan 350Z", "2003-2008"), ("Nissan Skyline R33", "1993-1998"), ("Mazda RX-7 FD", "1992-2002"),
+    ("Toyota Supra", "1993-1998"), ("BMW E36", "1992-1999"), ("Universal", "All"),
+]
+PART_WORDS = ["turbo", "coilover", "intercooler", "clutch", "flywheel", "bumper", "spoiler", "caliper",
+              "rotor", "seat", "wheel", "harness", "exhaust", "manifold", "radiator", "knuckle", "angle kit"]
+INQUIRY_TYPES = ["ticket", "order", "parts", "general"]
+INQUIRY_STATUSES = ["pending", "contacted", "completed", "cancelled"]
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class DisposableMongod:
+    """A throwaway mongod on a random port with its data in a temp directory."""
+
+    def __init__(self):
+        self.dbpath = tempfile.mkdtemp(prefix="tbr-bench-")
+        self.port = free_port()
+        self.process = None
+
+    @property
+    def url(self):
+        return f"mongodb://127.0.0.1:{self.port}"
+
+    def start(self, timeout=30):
+        self.process = subprocess.Popen(
+            ["mongod", "--dbpath", self.dbpath, "--port", str(self.port), "--bind_ip", "127.0.0.1", "--quiet"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        from pymongo import MongoClient
+        probe = MongoClient(self.url, serverSelectionTimeoutMS=500)
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                probe.admin.command("ping")
+                break
+            except Exception:
+                if self.process.poll() is not None or time.monotonic() > deadline:
+                    self.stop()
+                    raise RuntimeError("mongod did not start")
+                time.sleep(0.2)
+        probe.close()
+
+    def stop(self):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        shutil.rmtree(self.dbpath, ignore_errors=True)
+
+
+def iso_days_ago(rng, max_days):
+    moment = datetime.now(timezone.utc) - timedelta(days=rng.uniform(0, max_days))
+    return moment.isoformat()
+
+
+def merch_documents(rng, count):
+    """Merch documents as stored by the API (ISO created_at, no computed pricing)."""
+    docs = []
+    for i in range(count):
+        sizes = {s: rng.randint(0, 30) for s in ("S", "M", "L", "XL")} if rng.random() < 0.6 else None
+        docs.append({
+            "id": f"merch-{i}", "name": f"{rng.choice(PART_WORDS).title()} Logo Tee {i}",
+            "description": "Heavyweight cotton, screen printed in house. " * 3,
+            "price": round(rng.uniform(10, 90), 2),
+            "sale_percent": rng.choice([None, None, None, 10.0, 25.0]),
+            "image_urls": [f"/api/uploads/merch-{i}-{n}.webp" for n in range(rng.randint(1, 4))],
+            "category": rng.choice(MERCH_CATEGORIES),
+            "stock": sum(sizes.values()) if sizes else rng.randint(0, 50), "sizes": sizes,
+            "featured": rng.random() < 0.1, "created_at": iso_days_ago(rng, 730),
+        })
+    return docs
+
+
+def build_catalog(server, scale=1.0, seed=1):
+    """Generate catalog documents shaped exactly like the API writes them."""
+    rng = random.Random(seed)
+    size = {name: max(1, int(count * scale)) for name, count in CATALOG_SIZES.items()}
+    docs = {}
+
+    docs["merch"] = merch_documents(rng, size["merch"])
+
+    docs["parts"] = []
+    for i in range(size["parts"]):
+        car_model, year = rng.choice(PART_MODELS)
+        docs["parts"].append({
+            "id": f"part-{i}", "name": f"{car_model.split()[-1]} {rng.choice(PART_WORDS)} {i}",
+            "description": "Pulled from a running car, inspected and cleaned. " * 2,
+            "price": round(rng.uniform(15, 2500), 2), "car_model": car_model, "year": year,
+            "category": rng.choice(PART_CATEGORIES), "condition": rng.choice(PART_CONDITIONS),
+            "image_url": f"/api/uploads/part-{i}.webp", "stock": rng.choice([0, 1, 1, 1, 2, 4]),
+            "created_at": iso_days_ago(rng, 1095), "fitment": server.build_fitment(car_model, year),
+        })
+
+    docs["events"] = [{
+        "id": f"event-{i}", "name": f"Drift Day {i}", "description": "Open track, pro-am and tandem battles.",
+        "date": (datetime.now(timezone.utc) + timedelta(days=rng.randint(-365, 365))).date().isoformat(),
+        "location": rng.choice(["Evergreen Speedway", "Grange Motor Circuit", "PIR"]),
+        "image_url": f"/api/uploads/event-{i}.webp", "ticket_price": rng.choice([0, 20, 35, 60]),
+        "created_at": iso_days_ago(rng, 730),
+    } for i in range(size["events"])]
+
+    docs["drivers"] = [{
+        "id": f"driver-{i}", "name": f"Driver {i}", "bio": "Started on a stock S13 in 2012. " * 4,
+        "car_name": f"Car {i}", "image_url": f"/api/uploads/driver-{i}.webp",
+        "email": f"driver{i}@example.com", "created_at": iso_days_ago(rng, 730),
+    } for i in range(size["drivers"])]
+
+    docs["cars"] = []
+    for i in range(size["cars"]):
+        driver = rng.choice(docs["drivers"]) if rng.random() < 0.8 else None
+        docs["cars"].append({
+            "id": f"car-{i}", "name": f"Car {i}", "year": str(rng.randint(1989, 2008)), "make": "Nissan",
+            "model": rng.choice(["240SX", "350Z", "Silvia S15"]), "specs": "KA24DET, 450whp, Wisefab",
+            "image_url": f"/api/uploads/car-{i}.webp",
+            "driver_name": driver["name"] if driver else "Guest driver",
+            "driver_id": driver["id"] if driver else None,
+            "driver": server.driver_summary(driver) if driver else None,
+            "created_at": iso_days_ago(rng, 730),
+        })
+
+    docs["blog_posts"] = []
+    for i in range(size["blog_posts"]):
+        content = "\n\n".join(
+            f"## Section {n}\n\nWe swapped the {rng.choice(PART_WORDS)} and **finally** made it through "
+            f"round {n} without a tow. [Photos](https://example.com/{i}/{n}).\n\n- one\n- two\n- three"
+            for n in range(rng.randint(3, 12))
+        )
+        images = [f"/api/uploads/blog-{i}-{n}.webp" for n in range(rng.randint(0, 5))]
+        docs["blog_posts"].append({
+            "id": f"blog-{i}", "title": f"Build Log {i}: {rng.choice(PART_WORDS)} day", "content": content,
+            "category": rng.choice(["Build", "Events", "News"]), "images": images, "author": "Team",
+            "created_at": iso_days_ago(rng, 1095), **server.render_blog_derivatives(content, images),
+        })
+
+    docs["sponsors"] = [{
+        "id": f"sponsor-{i}", "name": f"Sponsor {i}", "logo_url": f"/api/uploads/sponsor-{i}.webp",
+        "website_url": f"https://sponsor{i}.example.com", "description": "Proud supporter.",
+        "created_at": iso_days_ago(rng, 730),
+    } for i in range(size["sponsors"])]
+
+    docs["inquiries"] = [{
+        "id": f"inquiry-{i}", "inquiry_type": rng.choice(INQUIRY_TYPES), "name": f"Customer {i}",
+        "email": f"customer{i}@example.com", "phone": "555-0100",
+        "message": f"Is the {rng.choice(PART_WORDS)} still available? Can you ship to {rng.choice(['WA', 'OR', 'CA'])}?",
+        "status": rng.choice(INQUIRY_STATUSES), "created_at": iso_days_ago(rng, 365),
+    } for i in range(size["inquiries"])]
+
+    docs["sales_settings"] = [{
+        "id": "sales_settings", "site_wide_sale": False, "site_wide_discount_percent": 0.0,
+        "category_sales": {"Sweaters": 15.0}, "updated_at": datetime.now(timezone.utc).isoformat(),
+    }]
+    return docs
+
+
+def build_scenarios(docs):
+    """Endpoint scenarios: (name, path factory, params, headers). Factories rotate through ids."""
+    def rotate(prefix, collection):
+        ids = [doc["id"] for doc in docs[collection]]
+        return lambda i: f"{prefix}/{ids[i % len(ids)]}"
+
+    def fixed(path):
+        return lambda i: path
+
+    return [
+        ("merch_list", fixed("/api/merch"), None, None),
+        ("merch_item", rotate("/api/merch", "merch"), None, None),
+        ("events", fixed("/api/events"), None, None),
+        ("drivers", fixed("/api/drivers"), None, None),
+        ("cars", fixed("/api/cars"), None, None),
+        ("sponsors", fixed("/api/sponsors"), None, None),
+        ("parts_browse", fixed("/api/parts"), {"page_size": 24}, None),
+        ("parts_filtered", fixed("/api/parts"),
+         {"car_model": "240sx", "category": "Engine", "in_stock": "true", "sort": "price_asc"}, None),
+        ("parts_fitment", fixed("/api/parts/fitment"), {"model": "240sx", "year": 1995}, None),
+        ("blog_list", fixed("/api/blog"), None, None),
+        ("blog_post", rotate("/api/blog", "blog_posts"), None, None),
+        ("home_page", fixed("/api/pages/home"), None, None),
+        ("about_page", fixed("/api/pages/about"), None, None),
+        ("search", fixed("/api/search"), {"q": "turbo coilover"}, None),
+        ("autocomplete", fixed("/api/autocomplete"), {"q": "inter"}, None),
+        ("admin_dashboard", fixed("/api/admin/dashboard"), None, ADMIN_HEADERS),
+        ("inquiries_inbox", fixed("/api/inquiries"), {"status": "pending", "limit": 50}, ADMIN_HEADERS),
+    ]
+
+
+async def run_scenario(client, server, scenario, requests, warmup, concurrency, cold):
+    name, path_for, params, headers = scenario
+    for i in range(warmup):
+        await client.get(path_for(i), params=params, headers=headers)
+
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        nonlocal errors
+        async with semaphore:
+            if cold:
+                server.response_cache.clear()
+            started = time.perf_counter()
+            response = await client.get(path_for(i), params=params, headers=headers)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "mean_ms": round(sum(latencies) / len(latencies), 3),
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "max_ms": round(latencies[-1], 3),
+        "throughput_rps": round(requests / elapsed, 1),
+    }
+
+
+async def benchmark(args, backend):
+    import logging
+    import httpx
+    import server
+
+    # Per-request log lines would swamp the table and time the terminal, not the app
+    for name in ("httpx", "access"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    if backend == "memory":
+        from mongomock_motor import AsyncMongoMockClient
+        server.db = AsyncMongoMockClient()[os.environ["DB_NAME"]]
+        server.catalog_db = server.db
+
+    docs = build_catalog(server, args.scale, args.seed)
+    for collection, items in docs.items():
+        await server.db[collection].insert_many([dict(doc) for doc in items])
+
+    if backend == "memory":
+        # No index builds or capped collections in the stand-in; only load the in-process indexes
+        await server.load_catalog_indexes()
+    else:
+        await server.app.router.startup()
+        while not server.warm_up_state.ready:
+            await asyncio.sleep(0.05)
+
+    scenarios = build_scenarios(docs)
+    if args.only:
+        wanted = set(args.only.split(","))
+        scenarios = [scenario for scenario in scenarios if scenario[0] in wanted]
+
+    results = {}
+    transport = httpx.ASGITransport(app=server.app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            for scenario in scenarios:
+                results[scenario[0]] = stats = await run_scenario(
+                    client, server, scenario, args.requests, args.warmup, args.concurrency, args.cold
+                )
+                print(format_row(scenario[0], stats), flush=True)
+    finally:
+        if backend != "memory":
+            await server.client.drop_database(os.environ["DB_NAME"])
+            await server.app.router.shutdown()
+
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "backend": backend,
+        "machine": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "settings": {
+            "requests": args.requests, "warmup": args.warmup, "concurrency": args.concurrency,
+            "cold": args.cold, "scale": args.scale, "seed": args.seed,
+            "catalog": {name: len(items) for name, items in docs.items()},
+        },
+        "results": results,
+    }
+
+
+HEADER = f"{'endpoint':<18}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}{'req/s':>10}{'errors':>8}"
+
+
+def format_row(name, stats):
+    return (f"{name:<18}{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}{stats['p99_ms']:>10.2f}"
+            f"{stats['max_ms']:>10.2f}{stats['throughput_rps']:>10.1f}{stats['errors']:>8}")
+
+
+def compare(report, baseline, threshold, metric, min_delta_ms):
+    """Print a per-endpoint comparison; return the endpoints that regressed past the threshold."""
+    if baseline["backend"] != report["backend"]:
+        print(f"warning: baseline ran on '{baseline['backend']}', this run on '{report['backend']}'")
+    if baseline["settings"] != report["settings"]:
+        print("warning: benchmark settings differ from the baseline")
+
+    regressions = []
+    print(f"\n{'endpoint':<18}{'baseline':>12}{'current':>12}{'change':>10}  ({metric})")
+    for name, stats in report["results"].items():
+        before = baseline["results"].get(name)
+        if not before:
+            print(f"{name:<18}{'-':>12}{stats[metric]:>12.2f}{'new':>10}")
+            continue
+        change = (stats[metric] - before[metric]) / before[metric] if before[metric] else 0.0
+        flag = ""
+        if change > threshold and stats[metric] - before[metric] > min_delta_ms:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<18}{before[metric]:>12.2f}{stats[metric]:>12.2f}{change:>+10.1%}{flag}")
+    return regressions
+
+
+def choose_backend(requested):
+    if requested != "auto":
+        return requested
+    return "mongod" if shutil.which("mongod") else "memory"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="In-process API latency/throughput benchmark")
+    parser.add_argument("--backend", choices=["auto", "mongod", "url", "memory"], default="auto")
+    parser.add_argument("--mongo-url", default=os.environ.get("MONGO_URL"), help="server for --backend url")
+    parser.add_argument("--requests", type=int, default=300, help="measured requests per endpoint")
+    parser.add_argument("--warmup", type=int, default=20, help="unmeasured requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplier for the seeded catalog sizes")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--cold", action="store_true", help="clear the response cache before every request")
+    parser.add_argument("--only", help="comma-separated endpoint names to run")
+    parser.add_argument("--output", help="write the JSON report to this path")
+    parser.add_argument("--save-baseline", metavar="NAME", help=f"store the report as {BASELINE_DIR.name}/NAME.json")
+    parser.add_argument("--compare", metavar="NAME", help="compare against a stored baseline")
+    parser.add_argument("--metric", default="p95_ms", choices=["p50_ms", "p95_ms", "p99_ms", "mean_ms"])
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed slowdown before failing (0.15 = 15%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0,
+                        help="ignore slowdowns smaller than this, so sub-millisecond jitter never fails a run")
+    args = parser.parse_args()
+
+    backend = choose_backend(args.backend)
+    mongod = None
+    os.environ["DB_NAME"] = f"benchmark_{os.getpid()}"
+    os.environ.setdefault("SLOW_QUERY_THRESHOLD_MS", "0")
+    if backend == "mongod":
+        mongod = DisposableMongod()
+        mongod.start()
+        os.environ["MONGO_URL"] = mongod.url
+    elif backend == "url":
+        if not args.mongo_url:
+            parser.error("--backend url needs --mongo-url or MONGO_URL")
+        os.environ["MONGO_URL"] = args.mongo_url
+    else:
+        # Never connected; the stand-in replaces the database handles after import
+        os.environ["MONGO_URL"] = "mongodb://127.0.0.1:1"
+    sys.path.insert(0, str(BACKEND_DIR))
+
+    print(f"backend: {backend}\n{HEADER}")
+    try:
+        report = asyncio.run(benchmark(args, backend))
+    finally:
+        if mongod:
+            mongod.stop()
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+    if args.save_baseline:
+        BASELINE_DIR.mkdir(exist_ok=True)
+        path = BASELINE_DIR / f"{args.save_baseline}.json"
+        path.write_text(json.dumps(report, indent=2))
+        print(f"\nbaseline saved to {path}")
+    if args.compare:
+        baseline = json.loads((BASELINE_DIR / f"{args.compare}.json").read_text())
+        regressions = compare(report, baseline, args.threshold, args.metric, args.min_delta_ms)
+        if regressions:
+            print(f"\n{len(regressions)} endpoint(s) regressed more than {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+        print("\nno regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the per-item CPU work behind GET /api/merch.
+
+Each group isolates one step of the request (discount resolution, rounding,
+ISO date parsing, MerchItem validation, JSON encoding, and the whole pipeline)
+and times several implementations of it side by side. The first implementation
+in every group is what server.py does today; the others are candidates, shown
+as a speed ratio against it plus whether they produce the same output.
+
+Examples:
+  python benchmarks/micro_benchmark.py
+  python benchmarks/micro_benchmark.py --groups discount,encode --sizes 1000,100000
+  python benchmarks/micro_benchmark.py --json micro.json
+  python benchmarks/micro_benchmark.py --compare micro.json   # before/after a change
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+from decimal import ROUND_HALF_EVEN, Decimal
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+# server.py builds its Motor client at import; nothing here ever connects
+os.environ.setdefault("MONGO_URL", "mongodb://127.0.0.1:1")
+os.environ.setdefault("DB_NAME", "micro_benchmark")
+os.environ.setdefault("SLOW_QUERY_THRESHOLD_MS", "0")
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+from api_benchmark import merch_documents  # noqa: E402
+from server import MerchItem, apply_sale_pricing, encode_json  # noqa: E402
+
+DEFAULT_SIZES = [10, 100, 1000, 10000, 100000]
+SALES_SETTINGS = {
+    "id": "sales_settings",
+    "site_wide_sale": True,
+    "site_wide_discount_percent": 10.0,
+    "category_sales": {"Sweaters": 15.0, "Hats": 20.0},
+}
+MERCH_LIST = TypeAdapter(List[MerchItem])
+DATETIME = TypeAdapter(datetime)
+DATETIME_LIST = TypeAdapter(List[datetime])
+CENT = Decimal("0.01")
+
+
+def copies(docs):
+    return [dict(doc) for doc in docs]
+
+
+def parsed(docs):
+    """Documents as get_merch has them just before validation."""
+    items = copies(docs)
+    for item in items:
+        item["created_at"] = datetime.fromisoformat(item["created_at"])
+        apply_sale_pricing(item, SALES_SETTINGS)
+    return items
+
+
+# Discount resolution
+
+def discount_current(items):
+    for item in items:
+        apply_sale_pricing(item, SALES_SETTINGS)
+    return [(item["effective_price"], item["discount_percent"]) for item in items]
+
+
+def discount_resolved_once(items):
+    """Resolve the category/site-wide discount once per category instead of per item."""
+    site_wide = SALES_SETTINGS["site_wide_discount_percent"] if SALES_SETTINGS.get("site_wide_sale") else 0
+    category_sales = SALES_SETTINGS.get("category_sales", {})
+    by_category = {}
+    for item in items:
+        discount = item.get("sale_percent")
+        if not discount or discount <= 0:
+            category = item["category"]
+            discount = by_category.get(category)
+            if discount is None:
+                discount = by_category[category] = category_sales.get(category) or site_wide
+        item["effective_price"] = round(item["price"] * (1 - discount / 100), 2)
+        item["discount_percent"] = discount
+    return [(item["effective_price"], item["discount_percent"]) for item in items]
+
+
+# Rounding
+
+def round_builtin(values):
+    return [round(value, 2) for value in values]
+
+
+def round_scaled_int(values):
+    return [int(value * 100 + 0.5) / 100 for value in values]
+
+
+def round_decimal(values):
+    return [float(Decimal(repr(value)).quantize(CENT, ROUND_HALF_EVEN)) for value in values]
+
+
+# ISO date parsing
+
+def parse_fromisoformat(values):
+    return [datetime.fromisoformat(value) for value in values]
+
+
+def parse_pydantic_each(values):
+    return [DATETIME.validate_python(value) for value in values]
+
+
+def parse_pydantic_list(values):
+    return DATETIME_LIST.validate_python(values)
+
+
+# MerchItem construction
+
+def construct_list_adapter(items):
+    return MERCH_LIST.validate_python(items)
+
+
+def construct_per_item(items):
+    return [MerchItem(**item) for item in items]
+
+
+def construct_model_validate(items):
+    return [MerchItem.model_validate(item) for item in items]
+
+
+def construct_unvalidated(items):
+    return [MerchItem.model_construct(**item) for item in items]
+
+
+# JSON encoding
+
+def encode_dump_json(models):
+    return MERCH_LIST.dump_json(models)
+
+
+def encode_fastapi_default(models):
+    """What FastAPI does for a plain response_model return: jsonable_encoder + json.dumps."""
+    return json.dumps(jsonable_encoder(models)).encode()
+
+
+def encode_model_dump(models):
+    return json.dumps([model.model_dump(mode="json") for model in models]).encode()
+
+
+# Whole get_merch CPU path after the Mongo read
+
+def pipeline_current(items):
+    for item in items:
+        if isinstance(item.get("created_at"), str):
+            item["created_at"] = datetime.fromisoformat(item["created_at"])
+        apply_sale_pricing(item, SALES_SETTINGS)
+    return encode_json(List[MerchItem], items)
+
+
+def pipeline_validator_parses_dates(items):
+    """Leave created_at as the stored ISO string and let validation parse it."""
+    for item in items:
+        apply_sale_pricing(item, SALES_SETTINGS)
+    return encode_json(List[MerchItem], items)
+
+
+def pipeline_fastapi_default(items):
+    for item in items:
+        if isinstance(item.get("created_at"), str):
+            item["created_at"] = datetime.fromisoformat(item["created_at"])
+        apply_sale_pricing(item, SALES_SETTINGS)
+    return json.dumps(jsonable_encoder(MERCH_LIST.validate_python(items))).encode()
+
+
+def dumped(models):
+    return [model.model_dump() for model in models]
+
+
+# group -> (setup(docs) building a fresh untimed input, normalize(output) for equality, [(name, fn)])
+GROUPS = {
+    "discount": (copies, None, [
+        ("apply_sale_pricing", discount_current),
+        ("resolved_once", discount_resolved_once),
+    ]),
+    "round": (lambda docs: [doc["price"] * 0.85 for doc in docs], None, [
+        ("round", round_builtin),
+        ("scaled_int", round_scaled_int),
+        ("decimal_half_even", round_decimal),
+    ]),
+    "parse_datetime": (lambda docs: [doc["created_at"] for doc in docs], None, [
+        ("fromisoformat", parse_fromisoformat),
+        ("pydantic_each", parse_pydantic_each),
+        ("pydantic_list", parse_pydantic_list),
+    ]),
+    "construct": (parsed, dumped, [
+        ("list_adapter", construct_list_adapter),
+        ("model_per_item", construct_per_item),
+        ("model_validate", construct_model_validate),
+        ("model_construct", construct_unvalidated),
+    ]),
+    "encode": (lambda docs: MERCH_LIST.validate_python(parsed(docs)), json.loads, [
+        ("adapter_dump_json", encode_dump_json),
+        ("fastapi_default", encode_fastapi_default),
+        ("model_dump_json_dumps", encode_model_dump),
+    ]),
+    "pipeline": (copies, json.loads, [
+        ("current", pipeline_current),
+        ("validator_parses_dates", pipeline_validator_parses_dates),
+        ("fastapi_default", pipeline_fastapi_default),
+    ]),
+}
+
+
+def measure(fn, setup, docs, min_repeat, min_time):
+    """Time fn on fresh inputs until both min_repeat runs and min_time seconds are reached."""
+    timings = []
+    output = None
+    while len(timings) < min_repeat or (sum(timings) < min_time and len(timings) < 1000):
+        data = setup(docs)
+        started = time.perf_counter()
+        output = fn(data)
+        timings.append(time.perf_counter() - started)
+    return timings, output
+
+
+def run(args):
+    sizes = [int(size) for size in args.sizes.split(",")]
+    groups = args.groups.split(",") if args.groups else list(GROUPS)
+    unknown = set(groups) - set(GROUPS)
+    if unknown:
+        sys.exit(f"unknown groups: {', '.join(sorted(unknown))} (choose from {', '.join(GROUPS)})")
+
+    rng = random.Random(args.seed)
+    all_docs = merch_documents(rng, max(sizes))
+    results = []
+    print(f"{'group':<16}{'size':>8}  {'implementation':<24}{'median ms':>12}{'ns/item':>10}{'vs current':>12}  same output")
+    for group in groups:
+        setup, normalize, implementations = GROUPS[group]
+        for size in sizes:
+            docs = all_docs[:size]
+            reference = None
+            current_median = None
+            for name, fn in implementations:
+                timings, output = measure(fn, setup, docs, args.repeat, args.min_time)
+                median = statistics.median(timings)
+                comparable = normalize(output) if normalize else output
+                if reference is None:
+                    reference, current_median = comparable, median
+                row = {
+                    "group": group,
+                    "size": size,
+                    "implementation": name,
+                    "runs": len(timings),
+                    "min_ms": round(min(timings) * 1000, 4),
+                    "median_ms": round(median * 1000, 4),
+                    "ns_per_item": round(median / size * 1e9, 1),
+                    "speedup": round(current_median / median, 3),
+                    "same_output": comparable == reference,
+                }
+                results.append(row)
+                print(f"{group:<16}{size:>8}  {name:<24}{row['median_ms']:>12.3f}{row['ns_per_item']:>10.1f}"
+                      f"{row['speedup']:>11.2f}x  {'yes' if row['same_output'] else 'NO'}", flush=True)
+    return {
+        "created_at": datetime.now().astimezone().isoformat(),
+        "machine": {"python": platform.python_version(), "platform": platform.platform()},
+        "settings": {"sizes": sizes, "repeat": args.repeat, "min_time": args.min_time, "seed": args.seed},
+        "results": results,
+    }
+
+
+def compare(report, previous):
+    """Per group/size/implementation change in median time against an earlier report."""
+    before = {(row["group"], row["size"], row["implementation"]): row for row in previous["results"]}
+    print(f"\n{'group':<16}{'size':>8}  {'implementation':<24}{'before ms':>12}{'after ms':>12}{'change':>10}")
+    for row in report["results"]:
+        old = before.get((row["group"], row["size"], row["implementation"]))
+        if not old:
+            continue
+        change = (row["median_ms"] - old["median_ms"]) / old["median_ms"] if old["median_ms"] else 0.0
+        print(f"{row['group']:<16}{row['size']:>8}  {row['implementation']:<24}"
+              f"{old['median_ms']:>12.3f}{row['median_ms']:>12.3f}{change:>+10.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for the merch listing hot loop")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in DEFAULT_SIZES),
+                        help="comma-separated catalog sizes")
+    parser.add_argument("--groups", help=f"comma-separated subset of: {', '.join(GROUPS)}")
+    parser.add_argument("--repeat", type=int, default=5, help="minimum timed runs per measurement")
+    parser.add_argument("--min-time", type=float, default=0.2, help="minimum seconds spent per measurement")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", metavar="PATH", help="write the results as JSON ('-' for stdout only)")
+    parser.add_argument("--compare", metavar="PATH", help="show the change against an earlier --json report")
+    args = parser.parse_args()
+
+    if args.json == "-":
+        # Keep stdout machine-readable
+        sys.stdout = sys.stderr
+    report = run(args)
+    if args.compare:
+        compare(report, json.loads(Path(args.compare).read_text()))
+    if args.json == "-":
+        sys.__stdout__.write(json.dumps(report, indent=2) + "\n")
+    elif args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -37,14 +37,11 @@ export default function AboutPage() {
 
   const fetchData = async () => {
     try {
-      const [driversRes, carsRes, sponsorsRes] = await Promise.all([
-        axios.get(`${API}/drivers`),
-        axios.get(`${API}/cars`),
-        axios.get(`${API}/sponsors`)
-      ]);
-      setDrivers(driversRes.data);
-      setCars(carsRes.data);
-      setSponsors(sponsorsRes.data);
+      // Drivers, cars and sponsors arrive in a single cached document
+      const response = await axios.get(`${API}/pages/about`);
+      setDrivers(response.data.drivers);
+      setCars(response.data.cars);
+      setSponsors(response.data.sponsors);
     } catch (error) {
       console.error('Error fetching data:', error);
       toast.error('Failed to load data');
@@ -232,7 +229,16 @@ export default function AboutPage() {
                     {car.name}
                   </h3>
                   <p className="text-blue-400 mb-2">{car.year} {car.make} {car.model}</p>
-                  {car.driver_name && (
+                  {car.driver ? (
+                    <div className="flex items-center gap-3 mb-3">
+                      <img
+                        src={getImageUrl(car.driver.image_url)}
+                        alt={car.driver.name}
+                        className="w-8 h-8 rounded-full object-cover"
+                      />
+                      <p className="text-gray-400">Driver: {car.driver.name}</p>
+                    </div>
+                  ) : car.driver_name && (
                     <p className="text-gray-400 mb-3">Driver: {car.driver_name}</p>
                   )}
                   <div className="bg-gray-800/50 p-4 rounded">
@@ -19,6 +19,21 @@ const getImageUrl = (imageUrl) => {
   return imageUrl;
 };
 
+const INQUIRY_STATUSES = ['pending', 'contacted', 'processing', 'shipped', 'completed', 'cancelled'];
+
+// Dashboard section loaded for each tab; orders and inquiries page through /inquiries
+const TAB_SECTIONS = {
+  merch: 'merch',
+  events: 'events',
+  parts: 'parts',
+  drivers: 'drivers',
+  cars: 'cars',
+  blog: 'blog',
+  sponsors: 'sponsors',
+  orders: 'inquiries',
+  inquiries: 'inquiries'
+};
+
 export default function AdminPage() {
   const [isLoggedIn, setIsLoggedIn] = useState(false);
   const [token, setToken] = useState(null);
@@ -29,6 +44,15 @@ export default function AdminPage() {
   const [events, setEvents] = useState([]);
   const [parts, setParts] = useState([]);
   const [inquiries, setInquiries] = useState([]);
+  const [dashboard, setDashboard] = useState(null);
+  const [activeTab, setActiveTab] = useState('merch');
+  const [sectionCursors, setSectionCursors] = useState({});
+  const [inquiryFilters, setInquiryFilters] = useState({ status: '', inquiry_type: '', q: '', sort: 'newest' });
+  const [inquirySearch, setInquirySearch] = useState('');
+  const [inquiryCounts, setInquiryCounts] = useState({});
+  const [driverOptions, setDriverOptions] = useState([]);
+  const [salesAnalytics, setSalesAnalytics] = useState(null);
+  const [analyticsRange, setAnalyticsRange] = useState({ start: '', end: '' });
   
   const [newMerch, setNewMerch] = useState({
     name: '',
@@ -109,6 +133,7 @@ export default function AdminPage() {
     make: '',
     model: '',
     specs: '',
+    driver_id: '',
     driver_name: ''
   });
   
@@ -171,37 +196,175 @@ export default function AdminPage() {
     toast.success('Logged out');
   };
 
-  const fetchAdminData = async (authToken) => {
+  const sectionSetters = {
+    merch: setMerchItems,
+    events: setEvents,
+    parts: setParts,
+    drivers: setDrivers,
+    cars: setCars,
+    blog: setBlogPosts,
+    sponsors: setSponsors,
+    inquiries: setInquiries
+  };
+
+  const inquiryParams = (tab, filters) => {
+    const params = { sort: filters.sort };
+    if (filters.status) params.status = filters.status;
+    if (filters.q) params.q = filters.q;
+    if (tab === 'orders') {
+      params.inquiry_type = 'order,parts';
+    } else if (filters.inquiry_type) {
+      params.inquiry_type = filters.inquiry_type;
+    }
+    return params;
+  };
+
+  const fetchSection = async (tab, authToken, cursor = null, filters = inquiryFilters) => {
+    const section = TAB_SECTIONS[tab];
+    const isInbox = section === 'inquiries';
+    const params = isInbox ? inquiryParams(tab, filters) : {};
+    if (cursor) params.cursor = cursor;
+    const response = await axios.get(isInbox ? `${API}/inquiries` : `${API}/admin/dashboard/${section}`, {
+      params,
+      headers: { Authorization: `Bearer ${authToken}` }
+    });
+    const setItems = sectionSetters[section];
+    setItems(items => cursor ? [...items, ...response.data.items] : response.data.items);
+    setSectionCursors(cursors => ({ ...cursors, [tab]: response.data.next_cursor }));
+    if (isInbox) setInquiryCounts(response.data.counts);
+  };
+
+  const fetchAdminData = async (authToken, tab = activeTab) => {
     try {
-      const [merchRes, eventsRes, partsRes, inquiriesRes, driversRes, carsRes, blogRes, sponsorsRes, salesRes] = await Promise.all([
-        axios.get(`${API}/merch`),
-        axios.get(`${API}/events`),
-        axios.get(`${API}/parts`),
-        axios.get(`${API}/inquiries`, {
+      const [dashboardRes] = await Promise.all([
+        axios.get(`${API}/admin/dashboard`, {
           headers: { Authorization: `Bearer ${authToken}` }
         }),
-        axios.get(`${API}/drivers`),
-        axios.get(`${API}/cars`),
-        axios.get(`${API}/blog`),
-        axios.get(`${API}/sponsors`),
-        axios.get(`${API}/sales-settings`)
+        TAB_SECTIONS[tab] ? fetchSection(tab, authToken) : null
       ]);
       
-      setMerchItems(merchRes.data);
-      setEvents(eventsRes.data);
-      setParts(partsRes.data);
-      setInquiries(inquiriesRes.data);
-      setDrivers(driversRes.data);
-      setCars(carsRes.data);
-      setBlogPosts(blogRes.data);
-      setSponsors(sponsorsRes.data);
-      setSalesSettings(salesRes.data);
+      setDashboard(dashboardRes.data);
+      setSalesSettings(dashboardRes.data.sales_settings);
     } catch (error) {
       console.error('Error fetching admin data:', error);
       toast.error('Failed to load data');
     }
   };
 
+  const fetchSalesAnalytics = async (authToken = token) => {
+    try {
+      const params = {};
+      if (analyticsRange.start) params.start = analyticsRange.start;
+      if (analyticsRange.end) params.end = analyticsRange.end;
+      const response = await axios.get(`${API}/admin/analytics/sales`, {
+        params,
+        headers: { Authorization: `Bearer ${authToken}` }
+      });
+      setSalesAnalytics(response.data);
+    } catch (error) {
+      console.error('Error fetching sales analytics:', error);
+      toast.error(error.response?.data?.detail || 'Failed to load sales analytics');
+    }
+  };
+
+  const handleTabChange = async (tab) => {
+    setActiveTab(tab);
+    if (tab === 'sales') {
+      fetchSalesAnalytics();
+      return;
+    }
+    if (tab === 'cars') {
+      axios.get(`${API}/drivers`)
+        .then(response => setDriverOptions(response.data))
+        .catch(error => console.error('Error fetching drivers:', error));
+    }
+    if (!TAB_SECTIONS[tab]) return;
+    try {
+      await fetchSection(tab, token);
+    } catch (error) {
+      console.error('Error fetching section:', error);
+      toast.error('Failed to load data');
+    }
+  };
+
+  const handleLoadMore = async () => {
+    try {
+      await fetchSection(activeTab, token, sectionCursors[activeTab]);
+    } catch (error) {
+      console.error('Error fetching section:', error);
+      toast.error('Failed to load data');
+    }
+  };
+
+  const updateInquiryFilters = async (changes) => {
+    const filters = { ...inquiryFilters, ...changes };
+    setInquiryFilters(filters);
+    try {
+      await fetchSection(activeTab, token, null, filters);
+    } catch (error) {
+      console.error('Error fetching inquiries:', error);
+      toast.error(error.response?.data?.detail || 'Failed to load inquiries');
+    }
+  };
+
+  const inquiryToolbar = (
+    <div className="drift-card p-4 rounded-lg space-y-4" data-testid="inquiry-filters">
+      <div className="flex flex-wrap gap-2">
+        <Button
+          onClick={() => updateInquiryFilters({ status: '' })}
+          className={`${inquiryFilters.status === '' ? 'bg-blue-600' : 'bg-gray-700'} hover:bg-blue-700 text-white text-sm`}
+        >
+          ALL ({Object.values(inquiryCounts).reduce((sum, count) => sum + count, 0)})
+        </Button>
+        {INQUIRY_STATUSES.map(status => (
+          <Button
+            key={status}
+            onClick={() => updateInquiryFilters({ status })}
+            className={`${inquiryFilters.status === status ? 'bg-blue-600' : 'bg-gray-700'} hover:bg-blue-700 text-white text-sm`}
+          >
+            {status.toUpperCase()} ({inquiryCounts[status] || 0})
+          </Button>
+        ))}
+      </div>
+      <form
+        className="flex flex-wrap gap-2"
+        onSubmit={(e) => {
+          e.preventDefault();
+          updateInquiryFilters({ q: inquirySearch.trim() });
+        }}
+      >
+        <Input
+          value={inquirySearch}
+          onChange={(e) => setInquirySearch(e.target.value)}
+          placeholder="Search name, email or message"
+          className="bg-gray-800 border-gray-700 text-white flex-1 min-w-[200px]"
+        />
+        {activeTab === 'inquiries' && (
+          <select
+            value={inquiryFilters.inquiry_type}
+            onChange={(e) => updateInquiryFilters({ inquiry_type: e.target.value })}
+            className="px-3 py-2 rounded bg-gray-800 border border-gray-700 text-white text-sm"
+          >
+            <option value="">ALL TYPES</option>
+            <option value="general">GENERAL</option>
+            <option value="ticket">TICKET</option>
+            <option value="order">ORDER</option>
+            <option value="parts">PARTS</option>
+          </select>
+        )}
+        <select
+          value={inquiryFilters.sort}
+          onChange={(e) => updateInquiryFilters({ sort: e.target.value })}
+          className="px-3 py-2 rounded bg-gray-800 border border-gray-700 text-white text-sm"
+        >
+          <option value="newest">NEWEST FIRST</option>
+          <option value="oldest">OLDEST FIRST</option>
+        </select>
+        <Button type="submit" className="bg-blue-600 hover:bg-blue-700 text-white">Search</Button>
+      </form>
+    </div>
+  );
+
   const handleImageUpload = async (file) => {
     if (!file) return null;
     
@@ -226,6 +389,32 @@ export default function AdminPage() {
       setUploadingImage(false);
     }
   };
+
+  // Upload a whole gallery in one request; URLs come back in the order the files were selected
+  const handleBatchImageUpload = async (files) => {
+    if (!files || files.length === 0) return [];
+    
+    setUploadingImage(true);
+    try {
+      const formData = new FormData();
+      files.forEach((file) => formData.append('files', file));
+      
+      const response = await axios.post(`${API}/upload/batch`, formData, {
+        headers: {
+          'Content-Type': 'multipart/form-data',
+          Authorization: `Bearer ${token}`
+        }
+      });
+      
+      return response.data.image_urls;
+    } catch (error) {
+      console.error('Error uploading images:', error);
+      toast.error(error.response?.data?.detail || 'Failed to upload images');
+      return null;
+    } finally {
+      setUploadingImage(false);
+    }
+  };
   
   const handleImageChange = (e) => {
     const files = Array.from(e.target.files);
@@ -342,14 +531,9 @@ export default function AdminPage() {
       
       // Upload new images if files are selected
       if (imageFiles.length > 0) {
-        setUploadingImage(true);
-        for (const file of imageFiles) {
-          const uploadedUrl = await handleImageUpload(file);
-          if (uploadedUrl) {
-            imageUrls.push(uploadedUrl);
-          }
-        }
-        setUploadingImage(false);
+        const uploadedUrls = await handleBatchImageUpload(imageFiles);
+        if (!uploadedUrls) return;
+        imageUrls.push(...uploadedUrls);
       }
       
       if (imageUrls.length === 0) {
@@ -560,7 +744,7 @@ export default function AdminPage() {
       });
       
       toast.success('Car added');
-      setNewCar({ name: '', year: '', make: '', model: '', specs: '', driver_name: '' });
+      setNewCar({ name: '', year: '', make: '', model: '', specs: '', driver_id: '', driver_name: '' });
       setCarImageFile(null);
       setCarImagePreview(null);
       fetchAdminData(token);
@@ -589,11 +773,8 @@ export default function AdminPage() {
     
     try {
       // Upload all images
-      const imageUrls = [];
-      for (const file of blogImageFiles) {
-        const url = await handleImageUpload(file);
-        if (url) imageUrls.push(url);
-      }
+      const imageUrls = await handleBatchImageUpload(blogImageFiles);
+      if (!imageUrls) return;
       
       await axios.post(`${API}/blog`, {
         ...newBlogPost,
@@ -830,7 +1011,31 @@ export default function AdminPage() {
           </Button>
         </div>
 
-        <Tabs defaultValue="merch" className="space-y-6">
+        {dashboard && (
+          <div className="grid grid-cols-2 md:grid-cols-4 gap-4 mb-8" data-testid="admin-dashboard-summary">
+            <div className="drift-card p-4 rounded-lg">
+              <p className="text-gray-400 text-sm">Pending Inquiries</p>
+              <p className="text-3xl font-bold text-blue-400">{dashboard.pending_inquiries}</p>
+            </div>
+            <div className="drift-card p-4 rounded-lg">
+              <p className="text-gray-400 text-sm">Merch / Parts</p>
+              <p className="text-3xl font-bold">{dashboard.counts.merch} / {dashboard.counts.parts}</p>
+            </div>
+            <div className="drift-card p-4 rounded-lg">
+              <p className="text-gray-400 text-sm">Events / Blog Posts</p>
+              <p className="text-3xl font-bold">{dashboard.counts.events} / {dashboard.counts.blog}</p>
+            </div>
+            <div className="drift-card p-4 rounded-lg">
+              <p className="text-gray-400 text-sm">Low Stock</p>
+              <p className="text-3xl font-bold text-red-400">{dashboard.low_stock.length}</p>
+              {dashboard.low_stock.slice(0, 3).map(item => (
+                <p key={`${item.type}-${item.id}`} className="text-xs text-gray-400 truncate">{item.name} ({item.stock})</p>
+              ))}
+            </div>
+          </div>
+        )}
+
+        <Tabs value={activeTab} onValueChange={handleTabChange} className="space-y-6">
           <TabsList className="bg-gray-800 border-2 border-gray-700">
             <TabsTrigger value="merch" data-testid="merch-tab" className="data-[state=active]:bg-blue-600">Merchandise</TabsTrigger>
             <TabsTrigger value="sales" data-testid="sales-tab" className="data-[state=active]:bg-blue-600">Sales</TabsTrigger>
@@ -1215,6 +1420,82 @@ export default function AdminPage() {
                 )}
               </div>
             </div>
+
+            {/* Sales Analytics */}
+            <div className="drift-card p-6 rounded-lg" data-testid="sales-analytics">
+              <h3 className="text-2xl font-bold mb-4" style={{ fontFamily: 'Bebas Neue, sans-serif' }}>Sales Analytics</h3>
+              <div className="flex flex-wrap items-end gap-4 mb-6">
+                <div>
+                  <Label>From</Label>
+                  <Input
+                    type="date"
+                    value={analyticsRange.start}
+                    onChange={(e) => setAnalyticsRange({...analyticsRange, start: e.target.value})}
+                    className="bg-gray-800 border-gray-700 text-white"
+                  />
+                </div>
+                <div>
+                  <Label>To</Label>
+                  <Input
+                    type="date"
+                    value={analyticsRange.end}
+                    onChange={(e) => setAnalyticsRange({...analyticsRange, end: e.target.value})}
+                    className="bg-gray-800 border-gray-700 text-white"
+                  />
+                </div>
+                <Button
+                  onClick={() => fetchSalesAnalytics()}
+                  className="bg-blue-600 hover:bg-blue-700 text-white"
+                >
+                  Apply
+                </Button>
+              </div>
+              {salesAnalytics && (
+                <>
+                  <p className="text-sm text-gray-400 mb-4">{salesAnalytics.start} to {salesAnalytics.end}</p>
+                  <div className="grid grid-cols-2 md:grid-cols-4 gap-4 mb-6">
+                    <div>
+                      <p className="text-gray-400 text-sm">Revenue</p>
+                      <p className="text-2xl font-bold text-blue-400">${salesAnalytics.totals.revenue.toFixed(2)}</p>
+                    </div>
+                    <div>
+                      <p className="text-gray-400 text-sm">Orders</p>
+                      <p className="text-2xl font-bold">{salesAnalytics.totals.orders}</p>
+                    </div>
+                    <div>
+                      <p className="text-gray-400 text-sm">Units (on sale)</p>
+                      <p className="text-2xl font-bold">{salesAnalytics.totals.units} ({salesAnalytics.totals.discounted_units})</p>
+                    </div>
+                    <div>
+                      <p className="text-gray-400 text-sm">Discounts Given</p>
+                      <p className="text-2xl font-bold text-green-400">${salesAnalytics.totals.discount_total.toFixed(2)}</p>
+                    </div>
+                  </div>
+                  {salesAnalytics.products.length === 0 ? (
+                    <p className="text-gray-400">No completed orders in this range</p>
+                  ) : (
+                    <div className="space-y-2">
+                      {salesAnalytics.products.map(product => (
+                        <div key={product.product_id} className="p-3 bg-gray-800 rounded flex justify-between gap-4">
+                          <div>
+                            <p className="font-bold">{product.product_name}</p>
+                            {Object.keys(product.units_by_size).length > 0 && (
+                              <p className="text-xs text-gray-400">
+                                {Object.entries(product.units_by_size).map(([size, units]) => `${size}: ${units}`).join(' · ')}
+                              </p>
+                            )}
+                          </div>
+                          <div className="text-right">
+                            <p className="font-bold">${product.revenue.toFixed(2)}</p>
+                            <p className="text-xs text-gray-400">{product.units} units, {product.discounted_units} on sale</p>
+                          </div>
+                        </div>
+                      ))}
+                    </div>
+                  )}
+                </>
+              )}
+            </div>
           </TabsContent>
 
           {/* Events Tab */}
@@ -1618,12 +1899,25 @@ export default function AdminPage() {
                   />
                 </div>
                 <div>
-                  <Label>Driver Name (Optional)</Label>
-                  <Input
-                    value={newCar.driver_name}
-                    onChange={(e) => setNewCar({...newCar, driver_name: e.target.value})}
-                    className="bg-gray-800 border-gray-700 text-white"
-                  />
+                  <Label>Driver (Optional)</Label>
+                  <select
+                    value={newCar.driver_id}
+                    onChange={(e) => setNewCar({...newCar, driver_id: e.target.value})}
+                    className="w-full px-3 py-2 rounded bg-gray-800 border border-gray-700 text-white"
+                  >
+                    <option value="">No driver profile</option>
+                    {driverOptions.map(driver => (
+                      <option key={driver.id} value={driver.id}>{driver.name}</option>
+                    ))}
+                  </select>
+                  {!newCar.driver_id && (
+                    <Input
+                      value={newCar.driver_name}
+                      onChange={(e) => setNewCar({...newCar, driver_name: e.target.value})}
+                      placeholder="Or type a driver name"
+                      className="bg-gray-800 border-gray-700 text-white mt-2"
+                    />
+                  )}
                 </div>
                 <div className="md:col-span-2">
                   <Label>Car Photo</Label>
@@ -1672,7 +1966,7 @@ export default function AdminPage() {
                   <div className="flex-1">
                     <h3 className="text-xl font-bold">{car.name}</h3>
                     <p className="text-blue-400">{car.year} {car.make} {car.model}</p>
-                    {car.driver_name && <p className="text-gray-400 text-sm">Driver: {car.driver_name}</p>}
+                    {(car.driver?.name || car.driver_name) && <p className="text-gray-400 text-sm">Driver: {car.driver?.name || car.driver_name}</p>}
                   </div>
                   <Button
                     onClick={() => handleDeleteCar(car.id)}
@@ -1771,8 +2065,8 @@ export default function AdminPage() {
               <h2 className="text-2xl font-bold" style={{ fontFamily: 'Bebas Neue, sans-serif' }}>Published Posts</h2>
               {blogPosts.map(post => (
                 <div key={post.id} className="drift-card p-4 rounded-lg flex gap-4">
-                  {post.images && post.images.length > 0 && (
-                    <img src={getImageUrl(post.images[0])} alt={post.title} className="w-24 h-24 object-cover rounded" />
+                  {post.cover_image && (
+                    <img src={getImageUrl(post.cover_image)} alt={post.title} className="w-24 h-24 object-cover rounded" />
                   )}
                   <div className="flex-1">
                     <span className="inline-block px-2 py-1 bg-blue-600 text-white text-xs rounded mb-2">{post.category}</span>
@@ -1913,13 +2207,13 @@ export default function AdminPage() {
           <TabsContent value="orders" className="space-y-4">
             <h2 className="text-2xl font-bold" style={{ fontFamily: 'Bebas Neue, sans-serif' }}>Order Management</h2>
             <p className="text-gray-400 mb-6">Track and manage merchandise and parts orders</p>
+            {inquiryToolbar}
             
-            {inquiries.filter(i => i.inquiry_type === 'order' || i.inquiry_type === 'parts').length === 0 ? (
+            {inquiries.length === 0 ? (
               <p className="text-gray-500">No orders yet</p>
             ) : (
               <div className="space-y-4">
                 {inquiries
-                  .filter(i => i.inquiry_type === 'order' || i.inquiry_type === 'parts')
                   .map(order => (
                     <div key={order.id} className="drift-card p-6 rounded-lg" data-testid={`order-${order.id}`}>
                       <div className="grid md:grid-cols-2 gap-6">
@@ -2021,6 +2315,7 @@ export default function AdminPage() {
           {/* Inquiries Tab */}
           <TabsContent value="inquiries" className="space-y-4">
             <h2 className="text-2xl font-bold" style={{ fontFamily: 'Bebas Neue, sans-serif' }}>Contact Inquiries & Orders</h2>
+            {inquiryToolbar}
             {inquiries.length === 0 ? (
               <p className="text-gray-500">No inquiries yet</p>
             ) : (
@@ -2091,6 +2386,19 @@ export default function AdminPage() {
             )}
           </TabsContent>
         </Tabs>
+
+        {sectionCursors[activeTab] && (
+          <div className="text-center mt-8">
+            <Button
+              data-testid="admin-load-more-btn"
+              onClick={handleLoadMore}
+              className="drift-button px-8 py-3 bg-transparent hover:bg-blue-600 text-white font-bold rounded-none border-2 border-blue-500"
+              style={{ fontFamily: 'Bebas Neue, sans-serif' }}
+            >
+              LOAD MORE
+            </Button>
+          </div>
+        )}
       </div>
     </div>
   );
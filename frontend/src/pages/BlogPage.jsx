@@ -102,9 +102,9 @@ export default function BlogPage() {
                 onClick={() => navigate(`/blog/${post.id}`)}
               >
                 {/* Featured Image */}
-                {post.images && post.images.length > 0 && (
+                {post.cover_image && (
                   <img 
-                    src={getImageUrl(post.images[0])} 
+                    src={getImageUrl(post.cover_image)} 
                     alt={post.title}
                     className="w-full h-48 object-cover"
                   />
@@ -126,7 +126,7 @@ export default function BlogPage() {
                   
                   {/* Excerpt */}
                   <p className="text-gray-400 mb-4 line-clamp-3">
-                    {post.content.substring(0, 150)}...
+                    {post.excerpt}
                   </p>
                   
                   {/* Meta Info */}
@@ -1,8 +1,6 @@
 import { useState, useEffect } from "react";
 import { useParams, useNavigate } from "react-router-dom";
 import axios from "axios";
-import ReactMarkdown from "react-markdown";
-import remarkGfm from "remark-gfm";
 import { Button } from "@/components/ui/button";
 import { toast } from "sonner";
 import { Calendar, User, ArrowLeft } from "lucide-react";
@@ -116,29 +114,12 @@ export default function BlogPostPage() {
           </div>
         )}
 
-        {/* Post Content - Markdown */}
+        {/* Post Content - rendered and sanitized server-side when the post was saved */}
         <div className="drift-card p-8 rounded-lg">
-          <div className="prose prose-invert prose-lg max-w-none">
-            <ReactMarkdown 
-              remarkPlugins={[remarkGfm]}
-              components={{
-                h1: ({node, ...props}) => <h1 className="text-4xl font-bold mb-4 mt-8" style={{ fontFamily: 'Bebas Neue, sans-serif' }} {...props} />,
-                h2: ({node, ...props}) => <h2 className="text-3xl font-bold mb-3 mt-6" style={{ fontFamily: 'Bebas Neue, sans-serif' }} {...props} />,
-                h3: ({node, ...props}) => <h3 className="text-2xl font-bold mb-2 mt-4" style={{ fontFamily: 'Bebas Neue, sans-serif' }} {...props} />,
-                p: ({node, ...props}) => <p className="text-gray-300 mb-4 leading-relaxed" {...props} />,
-                ul: ({node, ...props}) => <ul className="list-disc list-inside text-gray-300 mb-4 space-y-2" {...props} />,
-                ol: ({node, ...props}) => <ol className="list-decimal list-inside text-gray-300 mb-4 space-y-2" {...props} />,
-                a: ({node, ...props}) => <a className="text-blue-400 hover:text-blue-300 underline" {...props} />,
-                blockquote: ({node, ...props}) => <blockquote className="border-l-4 border-blue-500 pl-4 italic text-gray-400 my-4" {...props} />,
-                code: ({node, inline, ...props}) => 
-                  inline 
-                    ? <code className="bg-gray-800 px-2 py-1 rounded text-blue-400" {...props} />
-                    : <code className="block bg-gray-800 p-4 rounded my-4 overflow-x-auto" {...props} />,
-              }}
-            >
-              {post.content}
-            </ReactMarkdown>
-          </div>
+          <div
+            className="blog-content max-w-none"
+            dangerouslySetInnerHTML={{ __html: post.content_html }}
+          />
         </div>
       </div>
     </div>
@@ -24,9 +24,8 @@ export default function HomePage() {
 
   const fetchFeaturedProducts = async () => {
     try {
-      const response = await axios.get(`${API}/merch`);
-      const featured = response.data.filter(item => item.featured);
-      setFeaturedProducts(featured);
+      const response = await axios.get(`${API}/pages/home`);
+      setFeaturedProducts(response.data.featured_merch);
     } catch (error) {
       console.error('Error fetching featured products:', error);
     }
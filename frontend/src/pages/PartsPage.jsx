@@ -8,9 +8,14 @@ import { Search } from "lucide-react";
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
+const PAGE_SIZE = 48;
+const SEARCH_DELAY_MS = 300;
 
 export default function PartsPage() {
   const [parts, setParts] = useState([]);
+  const [totalParts, setTotalParts] = useState(0);
+  const [page, setPage] = useState(1);
+  const [categoryFacets, setCategoryFacets] = useState([]);
   const [loading, setLoading] = useState(true);
   const [selectedCategory, setSelectedCategory] = useState('all');
   const [searchQuery, setSearchQuery] = useState('');
@@ -18,13 +23,22 @@ export default function PartsPage() {
   const [selectedPart, setSelectedPart] = useState(null);
 
   useEffect(() => {
-    fetchParts();
-  }, []);
+    const timer = setTimeout(() => fetchParts(1), searchQuery ? SEARCH_DELAY_MS : 0);
+    return () => clearTimeout(timer);
+  }, [selectedCategory, searchQuery]);
 
-  const fetchParts = async () => {
+  // Search, filtering and paging happen server-side; the response also carries facet counts
+  const fetchParts = async (pageToLoad) => {
     try {
-      const response = await axios.get(`${API}/parts`);
-      setParts(response.data);
+      const params = { page: pageToLoad, page_size: PAGE_SIZE };
+      if (selectedCategory !== 'all') params.category = selectedCategory;
+      if (searchQuery.trim()) params.q = searchQuery.trim();
+      
+      const response = await axios.get(`${API}/parts`, { params });
+      setParts(prev => pageToLoad === 1 ? response.data.items : [...prev, ...response.data.items]);
+      setTotalParts(response.data.total);
+      setPage(pageToLoad);
+      setCategoryFacets(response.data.facets.category);
     } catch (error) {
       console.error('Error fetching parts:', error);
       toast.error('Failed to load parts');
@@ -33,17 +47,10 @@ export default function PartsPage() {
     }
   };
 
-  const categories = ['all', ...new Set(parts.map(part => part.category || 'Other'))];
-  
-  // Filter by category and search
-  const filteredParts = parts.filter(part => {
-    const matchesCategory = selectedCategory === 'all' || (part.category || 'Other') === selectedCategory;
-    const matchesSearch = searchQuery === '' || 
-      part.name.toLowerCase().includes(searchQuery.toLowerCase()) ||
-      part.description.toLowerCase().includes(searchQuery.toLowerCase()) ||
-      part.car_model.toLowerCase().includes(searchQuery.toLowerCase());
-    return matchesCategory && matchesSearch;
-  });
+  const categories = ['all', ...categoryFacets.map(facet => facet.value)];
+  // Keep the selected category visible even when the search leaves it no matches
+  if (!categories.includes(selectedCategory)) categories.push(selectedCategory);
+  const categoryCounts = Object.fromEntries(categoryFacets.map(facet => [facet.value, facet.count]));
 
   const getConditionBadge = (condition) => {
     const badges = {
@@ -115,18 +122,21 @@ export default function PartsPage() {
               style={{ fontFamily: 'Bebas Neue, sans-serif' }}
             >
               {category.toUpperCase()}
+              {categoryCounts[category] !== undefined && ` (${categoryCounts[category]})`}
             </Button>
           ))}
         </div>
 
         {/* Parts Grid */}
-        {filteredParts.length === 0 ? (
+        {parts.length === 0 ? (
           <div className="text-center py-20">
-            <p className="text-2xl text-gray-500">No parts available yet. Check back soon!</p>
+            <p className="text-2xl text-gray-500">
+              {searchQuery ? 'No parts match your search.' : 'No parts available yet. Check back soon!'}
+            </p>
           </div>
         ) : (
           <div className="grid grid-cols-1 sm:grid-cols-2 lg:grid-cols-3 gap-8">
-            {filteredParts.map(part => (
+            {parts.map(part => (
               <div key={part.id} className="drift-card rounded-lg overflow-hidden" data-testid={`part-item-${part.id}`}>
                 <div className="aspect-square bg-gray-800 relative overflow-hidden">
                   <img 
@@ -170,6 +180,19 @@ export default function PartsPage() {
             ))}
           </div>
         )}
+
+        {parts.length < totalParts && (
+          <div className="text-center mt-12">
+            <Button
+              data-testid="load-more-parts-btn"
+              onClick={() => fetchParts(page + 1)}
+              className="drift-button px-8 py-3 bg-transparent border-2 border-blue-500 text-white font-bold rounded-none hover:bg-blue-600"
+              style={{ fontFamily: 'Bebas Neue, sans-serif' }}
+            >
+              LOAD MORE
+            </Button>
+          </div>
+        )}
       </div>
 
       <ContactModal 
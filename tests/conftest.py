@@ -0,0 +1,12 @@
+"""Import backend/server.py for unit tests of its pure helpers.
+
+Motor connects lazily, so importing the module needs no running MongoDB; the
+tests here never touch the database.
+"""
+import os
+import sys
+from pathlib import Path
+
+os.environ.setdefault("MONGO_URL", "mongodb://127.0.0.1:1")
+os.environ.setdefault("DB_NAME", "unit_tests")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
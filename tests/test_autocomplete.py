@@ -0,0 +1,58 @@
+from server import PrefixIndex
+
+
+def texts(suggestions):
+    return [suggestion["text"] for suggestion in suggestions]
+
+
+def test_matches_any_word_start():
+    index = PrefixIndex()
+    index.upsert("parts", {"id": "p1", "name": "Turbo manifold", "car_model": "Nissan 240SX"})
+
+    assert texts(index.complete("240", 8)) == ["Nissan 240SX"]
+    assert texts(index.complete("mani", 8)) == ["Turbo manifold"]
+    assert index.complete("   ", 8) == []
+
+
+def test_shared_car_model_is_reference_counted():
+    index = PrefixIndex()
+    index.upsert("parts", {"id": "p1", "name": "Turbo manifold", "car_model": "Nissan 240SX"})
+    index.upsert("parts", {"id": "p2", "name": "Coilovers", "car_model": "nissan 240sx"})
+
+    index.remove("parts", "p1")
+    assert texts(index.complete("240", 8, {"car_model"})) == ["Nissan 240SX"]
+
+    index.remove("parts", "p2")
+    assert index.complete("240", 8) == []
+    assert index.keys == []
+
+
+def test_upsert_replaces_old_text():
+    index = PrefixIndex()
+    index.upsert("merch", {"id": "m1", "name": "Drift tee"})
+    index.upsert("merch", {"id": "m1", "name": "Smoke hoodie"})
+
+    assert index.complete("drift", 8) == []
+    assert [(s["text"], s["type"], s["id"]) for s in index.complete("smo", 8)] == [("Smoke hoodie", "merch", "m1")]
+
+
+def test_featured_and_viewed_suggestions_rank_first():
+    index = PrefixIndex()
+    index.upsert("merch", {"id": "m1", "name": "Drift hat"})
+    index.upsert("merch", {"id": "m2", "name": "Drift tee", "featured": True})
+    index.upsert("blog_posts", {"id": "b1", "title": "Drift day recap"})
+    for _ in range(3):
+        index.record_view("blog:b1")
+
+    assert texts(index.complete("drift", 8)) == ["Drift tee", "Drift day recap", "Drift hat"]
+    assert texts(index.complete("drift", 1, {"merch"})) == ["Drift tee"]
+
+
+def test_views_of_unknown_ids_are_ignored():
+    index = PrefixIndex()
+    index.upsert("merch", {"id": "m1", "name": "Drift tee"})
+
+    index.record_view("merch:m1")
+    index.record_view("merch:missing")
+
+    assert index.popularity == {"merch:m1": 1}
@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+import server
+from server import BackgroundJobs, job_handler
+
+
+@pytest.fixture
+def jobs(monkeypatch):
+    """A registry whose persisted jobs are collected in jobs.persisted instead of Mongo."""
+    monkeypatch.setattr(server, "JOB_HANDLERS", dict(server.JOB_HANDLERS))
+    registry = BackgroundJobs()
+    registry.persisted = []
+
+    async def persist(batch, delay=0.0):
+        registry.persisted.extend((job, delay) for job in batch)
+    monkeypatch.setattr(registry, "persist", persist)
+    return registry
+
+
+def test_built_in_handlers_are_registered():
+    assert server.JOB_HANDLERS["email"] is server.send_email_job
+    assert server.JOB_HANDLERS["stock"] is server.apply_order_stock
+
+
+def test_submitted_job_runs_and_leaves_the_registry(jobs):
+    seen = []
+
+    @job_handler("test")
+    async def handle(payload):
+        seen.append(payload)
+
+    async def scenario():
+        await jobs.submit("test", {"n": 1})
+        assert len(jobs.running) == 1
+        await asyncio.gather(*jobs.running)
+
+    asyncio.run(scenario())
+    assert seen == [{"n": 1}]
+    assert jobs.running == {}
+    assert jobs.persisted == []
+
+
+def test_failed_job_is_persisted_for_retry_with_backoff(jobs, monkeypatch):
+    monkeypatch.setattr(server, "JOB_POLL_INTERVAL_SECONDS", 10)
+
+    @job_handler("test")
+    async def handle(payload):
+        raise RuntimeError("provider down")
+
+    async def scenario():
+        await jobs.submit("test", {}, attempts=1)
+        await asyncio.gather(*jobs.running)
+
+    asyncio.run(scenario())
+    [(job, delay)] = jobs.persisted
+    assert (job["kind"], job["attempts"], delay) == ("test", 2, 40)
+
+
+def test_last_attempt_is_dropped(jobs):
+    @job_handler("test")
+    async def handle(payload):
+        raise RuntimeError("still down")
+
+    async def scenario():
+        await jobs.submit("test", {}, attempts=server.JOB_MAX_ATTEMPTS - 1)
+        await asyncio.gather(*jobs.running)
+
+    asyncio.run(scenario())
+    assert jobs.persisted == []
+
+
+def test_drain_persists_unfinished_and_later_submissions(jobs):
+    @job_handler("test")
+    async def handle(payload):
+        await asyncio.sleep(payload["seconds"])
+
+    async def scenario():
+        await jobs.submit("test", {"seconds": 0})
+        await jobs.submit("test", {"seconds": 60})
+        await jobs.drain(timeout=0.05)
+        await jobs.submit("test", {"seconds": 0})
+        return jobs.running
+
+    assert asyncio.run(scenario()) == {}
+    assert [job["payload"] for job, _ in jobs.persisted] == [{"seconds": 60}, {"seconds": 0}]
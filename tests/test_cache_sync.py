@@ -0,0 +1,37 @@
+import asyncio
+
+import server
+from server import changed_ids
+
+
+def log(*ids):
+    return [{"ids": list(entry) if entry is not None else None} for entry in ids]
+
+
+def test_changed_ids_unions_the_missed_entries():
+    doc = {"version": 5, "changes": log(["a"], ["b"], ["c", "d"])}
+
+    assert changed_ids(doc, 3) == {"b", "c", "d"}
+    assert changed_ids(doc, 5) == set()
+
+
+def test_changed_ids_is_unknown_past_the_log_or_for_bulk_writes():
+    doc = {"version": 5, "changes": log(["a"], None, ["c"])}
+
+    assert changed_ids(doc, 1) is None  # only the last three bumps are logged
+    assert changed_ids(doc, 3) is None  # the bump at version 4 had no ids
+    assert changed_ids(doc, 4) == {"c"}
+    assert changed_ids({"version": 2}, 0) is None
+
+
+def test_apply_shared_versions_marks_only_moved_collections_stale(monkeypatch):
+    monkeypatch.setattr(server, "shared_versions", {"events": 2, "sponsors": 4})
+    monkeypatch.setattr(server, "collection_versions", {"events": 7, "sponsors": 1})
+
+    asyncio.run(server.apply_shared_versions({
+        "events": {"version": 3, "changes": log(None)},
+        "sponsors": {"version": 4, "changes": log(["s1"])},
+    }))
+
+    assert server.shared_versions == {"events": 3, "sponsors": 4}
+    assert server.collection_versions == {"events": 8, "sponsors": 1}
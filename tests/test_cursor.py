@@ -0,0 +1,40 @@
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from server import cursor_sort, decode_cursor, encode_cursor
+
+CREATED_AT = datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)
+
+
+def test_round_trip_selects_rows_after_the_last_one_newest_first():
+    cursor = encode_cursor({"id": "abc", "created_at": CREATED_AT, "name": "ignored"})
+
+    assert decode_cursor(cursor) == {"$or": [
+        {"created_at": {"$lt": CREATED_AT.isoformat()}},
+        {"created_at": CREATED_AT.isoformat(), "id": {"$lt": "abc"}},
+    ]}
+
+
+def test_ascending_cursor_and_string_dates():
+    cursor = encode_cursor({"id": "abc", "created_at": "2024-05-01T12:30:00+00:00"})
+
+    assert decode_cursor(cursor, direction=1) == {"$or": [
+        {"created_at": {"$gt": "2024-05-01T12:30:00+00:00"}},
+        {"created_at": "2024-05-01T12:30:00+00:00", "id": {"$gt": "abc"}},
+    ]}
+    assert cursor_sort(1) == [("created_at", 1), ("id", 1)]
+
+
+def test_cursor_is_url_safe():
+    cursor = encode_cursor({"id": "??>>", "created_at": "~~~"})
+
+    assert set(cursor) <= set("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_=")
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "", "WzFd"])
+def test_invalid_cursor_is_a_400(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor)
+    assert error.value.status_code == 400
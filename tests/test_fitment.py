@@ -0,0 +1,47 @@
+import pytest
+
+from server import MAX_FITMENT_YEAR, MIN_FITMENT_YEAR, build_fitment, expand_model_key, parse_model_keys, parse_year_ranges
+
+ANY_YEAR = (MIN_FITMENT_YEAR, MAX_FITMENT_YEAR)
+
+
+@pytest.mark.parametrize("car_model, keys", [
+    ("Nissan 240SX S13/S14", ["240sx", "s13", "s14"]),
+    ("Toyota AE86 or Corolla", ["ae86", "corolla"]),
+    ("Mazda RX-7", ["rx7"]),
+    ("Universal", ["*"]),
+    ("", ["*"]),
+])
+def test_parse_model_keys(car_model, keys):
+    assert parse_model_keys(car_model) == keys
+
+
+@pytest.mark.parametrize("year, ranges", [
+    ("1995-1998", [(1995, 1998)]),
+    ("95-98", [(1995, 1998)]),
+    ("1997", [(1997, 1997)]),
+    ("2003+", [(2003, MAX_FITMENT_YEAR)]),
+    ("2015-present", [(2015, MAX_FITMENT_YEAR)]),
+    ("89-94/95-98", [(1989, 1994), (1995, 1998)]),
+    ("98-95", [(1995, 1998)]),
+    ("05-08", [(2005, 2008)]),
+    ("all", [ANY_YEAR]),
+    ("fits most", [ANY_YEAR]),
+])
+def test_parse_year_ranges(year, ranges):
+    assert parse_year_ranges(year) == ranges
+
+
+def test_build_fitment_crosses_models_and_ranges():
+    assert build_fitment("Nissan S13/S14", "89-94/95-98") == [
+        {"model": "s13", "year_start": 1989, "year_end": 1994},
+        {"model": "s13", "year_start": 1995, "year_end": 1998},
+        {"model": "s14", "year_start": 1989, "year_end": 1994},
+        {"model": "s14", "year_start": 1995, "year_end": 1998},
+    ]
+
+
+def test_expand_model_key_follows_aliases_both_ways():
+    assert expand_model_key("240sx") == ["240sx", "s13", "s14"]
+    assert set(expand_model_key("s15")) == {"s15", "200sx", "silvia"}
+    assert expand_model_key("universal") == []
@@ -0,0 +1,63 @@
+from collections import Counter
+
+from server import PART_FACETS, build_parts_filter, build_parts_pipeline
+
+PARTS = [
+    {"id": "1", "car_model": "240SX", "year": "1995", "category": "Engine", "condition": "new"},
+    {"id": "2", "car_model": "240SX", "year": "1997", "category": "Engine", "condition": "used-good"},
+    {"id": "3", "car_model": "AE86", "year": "1985", "category": "Suspension", "condition": "new"},
+    {"id": "4", "car_model": "240SX", "year": "1995", "category": "Interior", "condition": "new"},
+]
+
+
+def matches(doc, match):
+    """Equality and $in only: all the facet selections use."""
+    return all(doc.get(field) in value["$in"] if isinstance(value, dict) else doc.get(field) == value
+               for field, value in match.items())
+
+
+def facet_counts(selected):
+    facets = build_parts_pipeline({}, selected, "newest", 1, 24)[1]["$facet"]
+    counts = {}
+    for field in PART_FACETS:
+        match = facets[field][0]["$match"]
+        counts[field] = Counter(doc[field] for doc in PARTS if matches(doc, match))
+    total_match = facets["total"][0]["$match"]
+    return counts, sum(matches(doc, total_match) for doc in PARTS)
+
+
+def test_filter_splits_facet_selections_from_other_filters():
+    query, selected = build_parts_filter(None, ["1995"], ["Engine", "Interior"], None, 10, None, True)
+
+    assert query == {"price": {"$gte": 10}, "stock": {"$gt": 0}}
+    assert selected == {"year": "1995", "category": {"$in": ["Engine", "Interior"]}}
+
+
+def test_selected_category_keeps_other_categories_counted():
+    _, selected = build_parts_filter(None, None, ["Engine"], None, None, None, None)
+
+    counts, total = facet_counts(selected)
+
+    assert total == 2
+    assert counts["category"] == {"Engine": 2, "Suspension": 1, "Interior": 1}
+    assert counts["car_model"] == {"240SX": 2}
+    assert counts["condition"] == {"new": 1, "used-good": 1}
+
+
+def test_each_facet_applies_every_other_selection():
+    _, selected = build_parts_filter(["240SX"], None, None, ["new"], None, None, None)
+
+    counts, total = facet_counts(selected)
+
+    assert total == 2
+    assert counts["car_model"] == {"240SX": 2, "AE86": 1}
+    assert counts["condition"] == {"new": 2, "used-good": 1}
+    assert counts["category"] == {"Engine": 1, "Interior": 1}
+
+
+def test_items_page_uses_sort_and_offset():
+    items = build_parts_pipeline({"price": {"$lte": 50}}, {}, "price_asc", 3, 10)
+
+    assert items[0] == {"$match": {"price": {"$lte": 50}}}
+    stages = items[1]["$facet"]["items"]
+    assert stages[1:4] == [{"$sort": {"price": 1, "id": 1}}, {"$skip": 20}, {"$limit": 10}]
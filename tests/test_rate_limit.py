@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+import server
+from server import TokenBuckets, configured_rate_limit, parse_rate_limit
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(server.time, "monotonic", clock)
+    return clock
+
+
+@pytest.mark.parametrize("value, limit", [
+    ("5/300", (5.0, 5 / 300)),
+    ("10", (10.0, 10.0)),
+    ("5/", (5.0, 5.0)),
+    ("0/60", None),
+    ("", None),
+])
+def test_parse_rate_limit(value, limit):
+    assert parse_rate_limit(value) == limit
+
+
+@pytest.mark.parametrize("value", ["5/0", "5/-10", "5/abc", "abc"])
+def test_parse_rate_limit_rejects_bad_values(value):
+    with pytest.raises(ValueError):
+        parse_rate_limit(value)
+
+
+def test_invalid_setting_falls_back_to_the_default(monkeypatch):
+    monkeypatch.setenv("RATE_LIMIT_TEST_IP", "5/0")
+    assert configured_rate_limit("RATE_LIMIT_TEST_IP", "2/10") == (2.0, 0.2)
+    monkeypatch.setenv("RATE_LIMIT_TEST_IP", "4/8")
+    assert configured_rate_limit("RATE_LIMIT_TEST_IP", "2/10") == (4.0, 0.5)
+
+
+def test_burst_then_wait_for_refill(clock):
+    buckets = TokenBuckets(max_keys=10)
+    capacity, rate = 3, 1 / 10  # three requests, then one every ten seconds
+
+    assert [buckets.take("ip", capacity, rate) for _ in range(3)] == [0, 0, 0]
+    assert buckets.take("ip", capacity, rate) == pytest.approx(10)
+
+    clock.now += 4
+    assert buckets.take("ip", capacity, rate) == pytest.approx(6)
+
+    clock.now += 6
+    assert buckets.take("ip", capacity, rate) == 0
+
+
+def test_refill_is_capped_at_capacity(clock):
+    buckets = TokenBuckets(max_keys=10)
+    buckets.take("ip", 2, 1.0)
+
+    clock.now += 3600
+    waits = [buckets.take("ip", 2, 1.0) for _ in range(3)]
+    assert waits[:2] == [0, 0]
+    assert waits[2] == pytest.approx(1)
+
+
+def test_keys_are_independent_and_least_recently_used_are_evicted(clock):
+    buckets = TokenBuckets(max_keys=2)
+    buckets.take("a", 1, 0.01)
+    buckets.take("b", 1, 0.01)
+    assert buckets.take("a", 1, 0.01) > 0
+
+    buckets.take("c", 1, 0.01)
+
+    assert list(buckets.buckets) == ["a", "c"]
+    assert buckets.take("b", 1, 0.01) == 0
+
+
+def test_request_rejected_by_email_limit_keeps_its_ip_token(clock, monkeypatch):
+    monkeypatch.setattr(server, "RATE_LIMIT_STORE", "memory")
+    monkeypatch.setattr(server, "rate_limit_buckets", TokenBuckets(max_keys=10))
+    monkeypatch.setattr(server, "RATE_LIMITS", {"test": {"ip": (2.0, 0.01), "email": (1.0, 0.01)}})
+    request = Request({"type": "http", "client": ("198.51.100.7", 1234), "headers": []})
+
+    async def attempt(email):
+        try:
+            await server.enforce_rate_limit("test", request, email)
+        except HTTPException as error:
+            return error.status_code
+        return 200
+
+    async def scenario():
+        return [await attempt("a@example.com"), await attempt("a@example.com"), await attempt("b@example.com")]
+
+    # The second request is over the email limit; the IP token it took is given back
+    assert asyncio.run(scenario()) == [200, 429, 200]
+    assert server.rate_limit_buckets.buckets["test:ip:198.51.100.7"][0] == 0
@@ -0,0 +1,58 @@
+import server
+from server import SearchIndex, highlight, tokenize
+
+
+def part(doc_id, name, **fields):
+    return {"id": doc_id, "name": name, "car_model": "", "category": "", "description": "", **fields}
+
+
+def test_upsert_makes_documents_searchable_and_ranks_title_matches_first():
+    index = SearchIndex()
+    index.upsert("part", part("p1", "Coilover kit", description="fits turbo builds"))
+    index.upsert("part", part("p2", "Turbo manifold"))
+
+    hits = index.search("turbo")
+
+    assert [key for _, key in hits] == [("part", "p2"), ("part", "p1")]
+
+
+def test_upsert_replaces_previous_terms():
+    index = SearchIndex()
+    index.upsert("part", part("p1", "Turbo manifold"))
+    index.upsert("part", part("p1", "Exhaust manifold"))
+
+    assert index.search("turbo") == []
+    assert [key for _, key in index.search("exhaust")] == [("part", "p1")]
+    assert len(index.documents) == 1
+
+
+def test_remove_drops_postings_and_length():
+    index = SearchIndex()
+    index.upsert("part", part("p1", "Turbo manifold"))
+    index.upsert("merch", {"id": "m1", "name": "Turbo tee", "category": "T-Shirts", "description": ""})
+
+    index.remove("part", "p1")
+    index.remove("part", "missing")
+
+    assert [key for _, key in index.search("turbo")] == [("merch", "m1")]
+    assert "manifold" not in index.postings
+    assert index.total_length == index.doc_lengths[("merch", "m1")]
+
+
+def test_search_filters_by_kind_and_clear_removes_one_kind():
+    index = SearchIndex()
+    index.upsert("part", part("p1", "Turbo manifold"))
+    index.upsert("merch", {"id": "m1", "name": "Turbo tee", "category": "T-Shirts", "description": ""})
+
+    assert [key for _, key in index.search("turbo", {"merch"})] == [("merch", "m1")]
+    index.clear("part")
+    assert [key for _, key in index.search("turbo")] == [("merch", "m1")]
+
+
+def test_search_kinds_cover_every_indexed_collection():
+    assert set(server.SEARCH_COLLECTIONS) == set(server.SEARCH_FIELDS)
+    assert server.SEARCH_KIND_BY_COLLECTION["parts"] == "part"
+
+
+def test_highlight_escapes_and_marks_terms():
+    assert highlight("<b>Turbo</b> kit", set(tokenize("turbo"))) == "&lt;b&gt;<mark>Turbo</mark>&lt;/b&gt; kit"
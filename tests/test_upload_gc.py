@@ -0,0 +1,36 @@
+import os
+import time
+
+import server
+
+
+def test_extract_upload_names_from_strings_and_lists():
+    assert server._extract_upload_names("https://site.example/uploads/a.png") == ["a.png"]
+    assert server._extract_upload_names(["/uploads/b.jpg?v=2", 3, "https://cdn.example/c.png"]) == ["b.jpg"]
+    assert server._extract_upload_names(None) == []
+
+
+def test_sweep_keeps_referenced_and_recent_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(server, "UPLOAD_DIR", tmp_path)
+    old = time.time() - 3600
+    for name in ("kept.png", "orphan.png", "fresh.png"):
+        (tmp_path / name).write_bytes(b"x" * 10)
+    os.utime(tmp_path / "kept.png", (old, old))
+    os.utime(tmp_path / "orphan.png", (old, old))
+
+    scanned, deleted, reclaimed = server._sweep_upload_dir({"kept.png"}, time.time() - 60, dry_run=False)
+
+    assert (scanned, deleted, reclaimed) == (3, ["orphan.png"], 10)
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["fresh.png", "kept.png"]
+
+
+def test_sweep_dry_run_deletes_nothing(tmp_path, monkeypatch):
+    monkeypatch.setattr(server, "UPLOAD_DIR", tmp_path)
+    old = time.time() - 3600
+    (tmp_path / "orphan.png").write_bytes(b"x")
+    os.utime(tmp_path / "orphan.png", (old, old))
+
+    _, deleted, _ = server._sweep_upload_dir(set(), time.time(), dry_run=True)
+
+    assert deleted == ["orphan.png"]
+    assert (tmp_path / "orphan.png").exists()